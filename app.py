@@ -1,31 +1,86 @@
 import streamlit as st
 import numpy as np
 
-from sympy import isprime
-
 from core import (
     GaloisFieldExtension,
     GaloisFieldSimple,
-    find_irreducible_polynomials_batch,
+    sieve_irreducible_polynomials,
+    iter_random_irreducible,
+    iter_low_weight_irreducibles,
+    fastest_modulus,
+    iter_resumable_ranges,
+    count_irreducible_polynomials,
+    BackgroundSearch,
+    PolynomialBuffer,
+    SIEVE_MAX_CANDIDATES,
     format_polynomial,
+    is_prime,
     save_polynomials_to_db,
-    get_saved_polynomials,
+    count_saved_polynomials,
+    get_saved_polynomials_page,
+    iter_saved_polynomials,
+    get_catalog,
+    export_catalog,
+    CATALOG_PATH,
+    OperationLog,
+    LEVEL_OPERATION,
+    LEVEL_INFO,
+    LEVEL_ERROR,
     initialize_database,
     create_copy_button,
+    enable_memo,
+    get_memo,
+    memo_field_key,
+    compile_expression,
+    ExpressionError,
+    enable_timings,
+    get_timings,
+    Planner,
+    load_cost_model,
 )
 
 from datetime import datetime
+from contextlib import closing
+import random
+import os
+import io
+import csv
+import json
+from time import perf_counter
 
 field_extension_name = 'Работа с расширением поля'
 simple_field_name = 'Работа с простым полем'
 finding_poly_name = 'Поиск неприводимых многочленов'
 load_db_name = 'Загрузить многочлены из Базы Данных'
 
+lex_search_name = 'Перебор по порядку'
+random_search_name = 'Случайный поиск'
+primitive_search_name = 'Примитивные многочлены'
+low_weight_search_name = 'Многочлены малого веса'
+
 BATCH_SIZE = 300
+OPERATION_LOG_CAPACITY = 1000
+PAGE_SIZES = (20, 50, 100, 500)
+RANDOM_BATCH_COUNT = 5
+LEX_RESULTS_COUNT = 20
+MEMO_MAX_ENTRIES = 4096
+MEMO_MAX_BYTES = 16 * 1024 * 1024
+
+# В интерфейсе одни и те же операции часто повторяются при перезапусках скрипта, поэтому кэш результатов
+# арифметики включён для всего процесса (в библиотеке он по умолчанию выключен)
+enable_memo(MEMO_MAX_ENTRIES, MEMO_MAX_BYTES)
+# Длительности операций (арифметика, создание полей, порции поиска, запросы к базе данных) собираются
+# в гистограммы для панели диагностики; замер стоит доли микросекунды на вызов
+enable_timings()
 
 
 def reset_field_state(p, modulus_coeffs, operating_mode):
     """Функция для сброса состояния поля при изменении параметров."""
+    # Результаты операций в прежнем поле больше не понадобятся - освобождаем их в кэше
+    memo = get_memo()
+    if memo is not None and st.session_state['field_p'] is not None:
+        memo.invalidate(memo_field_key(st.session_state['field_p'], st.session_state['field_modulus_coeffs']))
+
     st.session_state['field_p'] = p
     st.session_state['field_modulus_coeffs'] = modulus_coeffs
     st.session_state['operating_mode'] = operating_mode
@@ -37,12 +92,338 @@ def reset_field_state(p, modulus_coeffs, operating_mode):
     st.session_state['last_inverse_result_element'] = None
     st.session_state['last_inverse_result_polynomial'] = None
     st.session_state['last_evaluation_result'] = None
+    st.session_state['last_expression_result'] = None
     return True
 
 
-def log_operation(operation_log, entry):
-    operation_log.append(entry)
-    st.session_state['operation_log'] = operation_log
+def search_plan(p, n, search_mode):
+    """
+    План одного шага поиска в выбранном режиме: оценка времени и памяти и решение о допуске.
+    Если шаг не укладывается в бюджет планировщика, число многочленов в плане (count) уменьшено.
+    """
+    if search_mode == random_search_name:
+        return get_planner().plan_search(p, n, 'random', RANDOM_BATCH_COUNT)
+    if search_mode == low_weight_search_name:
+        return get_planner().plan_search(p, n, 'low-weight', p * n)
+    mode = 'primitive' if search_mode == primitive_search_name else 'lex'
+    return get_planner().plan_search(p, n, mode, LEX_RESULTS_COUNT)
+
+
+def search_steps():
+    """
+    Возвращает итератор шагов поиска в выбранном режиме (для BackgroundSearch) и число находок,
+    после которого поиск останавливается.
+
+    Итератор ленивый: вся работа выполняется в фоновом потоке.
+    """
+    p = st.session_state['p_irreducible']
+    n = st.session_state['n_irreducible']
+    offset = st.session_state['offset']
+    search_mode = st.session_state['search_mode']
+    # Размер шага - по плану: урезанный план ищет меньше многочленов, чтобы уложиться в бюджет
+    count = search_plan(p, n, search_mode).count
+
+    if search_mode == random_search_name:
+        # Каждый запуск использует своё зерно, а повторы уже найденных многочленов отбрасываются.
+        # Шаг - одна порция случайных кандидатов, поэтому отмена останавливает поиск между порциями
+        seen = {tuple(poly) for poly in st.session_state['irreducible_pols']}
+        seed = st.session_state['random_seed'] + offset
+
+        def steps():
+            found = 0
+            with closing(iter_random_irreducible(p, n, count=count, seed=seed)) as chunks:
+                for hits, tested in chunks:
+                    new_polys = []
+                    for poly in hits:
+                        if tuple(poly) not in seen and found + len(new_polys) < count:
+                            seen.add(tuple(poly))
+                            new_polys.append(poly)
+                    found += len(new_polys)
+                    yield new_polys, tested
+
+        return steps(), count
+
+    if search_mode == low_weight_search_name:
+        def steps():
+            with closing(iter_low_weight_irreducibles(p, n, count, offset)) as batches:
+                yield from batches
+
+        return steps(), None
+
+    # Перебор по порядку и поиск примитивных многочленов выдают находки по мере проверки диапазонов
+    # и останавливаются после LEX_RESULTS_COUNT находок. Ход перебора сохраняется в базе данных:
+    # уже проверенные кандидаты не проверяются повторно. Примитивные многочлены сразу сохраняются
+    # в каталог с отметкой о примитивности
+    mode = "primitive" if search_mode == primitive_search_name else "lex"
+
+    def steps():
+        position = offset
+        remaining = count
+        with closing(iter_resumable_ranges(p, n, start=offset, mode=mode, chunk_hits=count)) as ranges:
+            for scanned_to, hits in ranges:
+                # Проверенный диапазон может содержать больше находок, чем осталось до count: лишние
+                # не показываются, и следующий поиск продолжается сразу за последней показанной
+                if 0 < remaining <= len(hits):
+                    hits = hits[:remaining]
+                    scanned_to = hits[-1][0] + 1
+                remaining -= len(hits)
+                polys = [coeffs for _, coeffs in hits]
+                if mode == "primitive":
+                    save_polynomials_to_db(polys, p, n, datetime.now(), primitive=True)
+                yield polys, scanned_to - position
+                position = scanned_to
+
+    return steps(), count
+
+
+def start_background_search():
+    """Запускает поиск очередной порции многочленов в фоновом потоке, привязанном к сессии."""
+    steps, target_hits = search_steps()
+    st.session_state['background_search'] = BackgroundSearch(steps, target_hits=target_hits).start()
+
+
+def cancel_background_search():
+    """Останавливает фоновый поиск (например, при смене параметров поиска) без сохранения его результатов."""
+    search = st.session_state.get('background_search')
+    if search is not None:
+        search.cancel()
+    st.session_state['background_search'] = None
+
+
+def finish_background_search(search):
+    """Переносит результаты завершённого фонового поиска в сессию и сдвигает позицию поиска."""
+    irreducible_polys, tested = search.snapshot()
+    st.session_state['irreducible_pols'].extend(irreducible_polys)
+    st.session_state['background_search'] = None
+
+    if st.session_state['search_mode'] == random_search_name:
+        st.session_state['offset'] += 1
+    else:
+        st.session_state['offset'] += tested
+
+    if search.error is not None:
+        st.toast(f"Ошибка при поиске: {search.error}")
+    elif search.cancelled:
+        st.toast(f"Поиск отменён, найдено {len(irreducible_polys)} многочленов.")
+    elif irreducible_polys:
+        st.toast(f"Найдено {len(irreducible_polys)} неприводимых многочленов.")
+    else:
+        st.toast("Больше неприводимых многочленов не найдено.")
+
+
+@st.fragment(run_every=0.5)
+def show_background_search():
+    """
+    Показывает ход фонового поиска. Фрагмент перерисовывается сам, не блокируя остальную страницу;
+    когда поиск завершается, страница перезапускается с найденными многочленами.
+    """
+    search = st.session_state.get('background_search')
+    if search is None:
+        return
+
+    if not search.running:
+        finish_background_search(search)
+        st.rerun()
+
+    irreducible_polys, tested = search.snapshot()
+    if search.target_hits:
+        st.progress(min(len(irreducible_polys) / search.target_hits, 1.0))
+    st.caption(f"Поиск... Проверено кандидатов: {tested}, найдено: {len(irreducible_polys)}, "
+               f"скорость: {search.throughput:.0f} кандидатов/с")
+
+    if st.button("Отменить поиск", key='cancel_search', disabled=search.cancelled):
+        search.cancel()
+
+
+def log_operation(operation_log, entry, op=None, operands=None, result=None, duration=None):
+    """
+    Добавляет запись в журнал операций сессии (см. OperationLog).
+
+    Уровень записи определяется по началу сообщения: повторяющиеся на каждой перерисовке информационные
+    сообщения не дублируются, а только увеличивают счётчик повторений.
+    """
+    if entry.startswith("Информация"):
+        level = LEVEL_INFO
+    elif entry.lower().startswith(("ошибка", "неизвестная ошибка")):
+        level = LEVEL_ERROR
+    else:
+        level = LEVEL_OPERATION
+
+    operation_log.log(entry.rstrip("\n"), level, op, operands, result, duration)
+
+
+# Streamlit выполняет скрипт заново при каждом действии пользователя, поэтому всё, что зависит только от
+# параметров поля, кэшируется между перезапусками: объекты полей - в st.cache_resource (один объект на процесс,
+# общий для всех сессий), строковые представления и запросы к каталогу - в st.cache_data.
+@st.cache_resource(max_entries=32, show_spinner=False)
+def get_field(p, modulus_coeffs=None):
+    """
+    Возвращает поле GF(p) (если модуль не задан) или GF(p^n) с модулем modulus_coeffs.
+
+    Проверка простоты p и неприводимости модуля выполняется один раз для каждой пары (p, модуль);
+    ошибки (ValueError) не кэшируются.
+
+    :param p: Характеристика поля.
+    :param modulus_coeffs: Кортеж коэффициентов модуля (от старшей степени к младшей) или None.
+    """
+    if modulus_coeffs is None:
+        return GaloisFieldSimple(p)
+    return GaloisFieldExtension(p, list(modulus_coeffs))
+
+
+@st.cache_resource(show_spinner="Калибровка модели стоимости...")
+def get_planner():
+    """
+    Планировщик операций. Постоянные модели стоимости замеряются на этой машине один раз
+    и сохраняются в базе данных; после этого операции с элементами выбирают алгоритмы по замерам.
+    """
+    load_cost_model()
+    return Planner()
+
+
+@st.cache_data(max_entries=10000, show_spinner=False)
+def polynomial_string(coeffs):
+    """Читаемая строка многочлена по кортежу коэффициентов (от старшей степени к младшей)."""
+    return format_polynomial(np.poly1d(list(coeffs)))
+
+
+def catalog_version():
+    """Версия файла каталога (время изменения и размер) для ключей кэша или None, если файла нет."""
+    try:
+        stat = os.stat(CATALOG_PATH)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def catalog_page(p, n, primitive_only, start, stop, version):
+    """
+    Многочлены раздела каталога с номерами [start, stop) в виде пар строк (многочлен, коэффициенты через запятую).
+
+    :param version: Версия файла каталога (см. catalog_version): после новой выгрузки кэш не используется.
+    """
+    return [(polynomial_string(tuple(coeffs)), ", ".join(map(str, coeffs)))
+            for coeffs in get_catalog().polynomials(p, n, start, stop, primitive_only=primitive_only)]
+
+
+def saved_polynomials_page(p, n, primitive_only, first, page_size, saved_count):
+    """
+    Страница сохранённых многочленов из базы данных: пары (коэффициенты, время сохранения).
+
+    Последний многочлен каждой показанной страницы запоминается в сессии, поэтому соседние страницы
+    читаются выборкой по ключу, а не пропуском first строк. Запомненные границы привязаны к числу
+    сохранённых многочленов saved_count: после сохранения новых многочленов номера строк сдвигаются,
+    и границы строятся заново.
+    """
+    key = (p, n, primitive_only, saved_count)
+    boundaries = st.session_state['load_page_boundaries'].setdefault(key, {0: None})
+    start = max(row for row in boundaries if row <= first)
+    page = get_saved_polynomials_page(p, n, after=boundaries[start], limit=page_size,
+                                      primitive_only=primitive_only, offset=first - start)
+    if page:
+        boundaries[first + len(page)] = page[-1][0]
+    return page
+
+
+@st.cache_data(max_entries=1024, show_spinner=False)
+def catalog_contains(p, coeffs, version):
+    """Проверка многочлена по каталогу (см. CatalogFile.contains) с кэшированием по версии файла каталога."""
+    return get_catalog().contains(p, list(coeffs))
+
+
+def choose_page(key, total):
+    """
+    Виджеты выбора страницы таблицы многочленов.
+
+    :param key: Префикс ключей виджетов.
+    :param total: Число многочленов в таблице.
+    :return: Пара (номер первого многочлена страницы, размер страницы).
+    """
+    cols = st.columns(2)
+    with cols[0]:
+        page_size = st.selectbox("Многочленов на странице", PAGE_SIZES, key=f'{key}_page_size')
+
+    pages = max(1, -(-total // page_size))
+    if st.session_state.get(f'{key}_page', 1) > pages:
+        st.session_state[f'{key}_page'] = pages
+    with cols[1]:
+        page = st.number_input("Страница", min_value=1, max_value=pages, step=1, key=f'{key}_page')
+    st.caption(f"Страница {int(page)} из {pages}")
+
+    return (int(page) - 1) * page_size, page_size
+
+
+def show_polynomial_table(rows, first, key, with_dates=False):
+    """
+    Показывает страницу многочленов одной таблицей (вместо отдельной строки виджетов на каждый многочлен)
+    и одну общую кнопку копирования коэффициентов всех многочленов страницы.
+
+    :param rows: Тройки (строка многочлена, коэффициенты через запятую, время сохранения или None).
+    :param first: Номер первого многочлена страницы (для нумерации строк).
+    :param key: Префикс ключей виджетов.
+    :param with_dates: Показывать ли столбец со временем сохранения.
+    :return: Номера выбранных в таблице строк (на странице).
+    """
+    table = {
+        "№": list(range(first + 1, first + len(rows) + 1)),
+        "Многочлен": [polynomial_str for polynomial_str, _, _ in rows],
+        "Коэффициенты": [coeffs_str for _, coeffs_str, _ in rows],
+    }
+    if with_dates:
+        table["Сохранён"] = [str(date) for _, _, date in rows]
+
+    event = st.dataframe(table, hide_index=True, use_container_width=True, on_select="rerun",
+                         selection_mode="multi-row", key=f'{key}_table')
+
+    st.caption("Коэффициенты всех многочленов страницы (по многочлену на строку):")
+    create_copy_button("\n".join(coeffs_str for _, coeffs_str, _ in rows), f'{key}_page')
+
+    return list(event.selection.rows)
+
+
+def export_files(polynomials):
+    """
+    Собирает файлы CSV и JSON со всеми многочленами.
+
+    :param polynomials: Итератор пар (коэффициенты от старшей степени к младшей, время сохранения или None).
+    :return: Пара строк (CSV, JSON).
+    """
+    csv_file = io.StringIO()
+    writer = csv.writer(csv_file)
+    writer.writerow(["polynomial", "coefficients", "saved"])
+
+    records = []
+    for coeffs, date in polynomials:
+        polynomial_str = format_polynomial(np.poly1d(coeffs))
+        writer.writerow([polynomial_str, ", ".join(map(str, coeffs)), "" if date is None else str(date)])
+        records.append({"polynomial": polynomial_str, "coefficients": [int(c) for c in coeffs],
+                        "saved": None if date is None else str(date)})
+
+    return csv_file.getvalue(), json.dumps(records, ensure_ascii=False)
+
+
+def show_export(key, version, polynomials, file_name):
+    """
+    Выгрузка всех многочленов таблицы в CSV и JSON.
+
+    Файлы собираются только по нажатию кнопки (а не при каждой перерисовке страницы) и показываются,
+    пока не изменилась version (например, число многочленов в таблице).
+
+    :param polynomials: Функция без аргументов, возвращающая итератор пар (коэффициенты, время сохранения).
+    """
+    if st.button("Подготовить выгрузку всех многочленов", key=f'{key}_prepare_export'):
+        st.session_state[f'{key}_export'] = (version,) + export_files(polynomials())
+
+    export = st.session_state.get(f'{key}_export')
+    if export is not None and export[0] == version:
+        cols = st.columns(2)
+        with cols[0]:
+            st.download_button("Скачать все (CSV)", export[1], file_name=f'{file_name}.csv', mime='text/csv',
+                               key=f'{key}_download_csv')
+        with cols[1]:
+            st.download_button("Скачать все (JSON)", export[2], file_name=f'{file_name}.json',
+                               mime='application/json', key=f'{key}_download_json')
 
 
 # Словарь с инициализацией переменных и значений по умолчанию
@@ -58,12 +439,18 @@ default_session_state = {
     'last_inverse_result_element': None,
     'last_inverse_result_polynomial': None,
     'last_evaluation_result': None,
-    'operation_log': [],
-    'irreducible_pols': [],
+    'last_expression_result': None,
+    'operation_log': OperationLog(capacity=OPERATION_LOG_CAPACITY),
+    'irreducible_pols': PolynomialBuffer(),
     'offset': 0,
     'batch_size': BATCH_SIZE,
     'p_irreducible': None,
-    'n_irreducible': None
+    'n_irreducible': None,
+    'search_mode': lex_search_name,
+    'random_seed': 0,
+    'background_search': None,
+    'load_request': None,
+    'load_page_boundaries': {}
 }
 
 for key, default_value in default_session_state.items():
@@ -81,7 +468,7 @@ def main_galois():
 
         p = st.number_input("Введите характеристику p (простое число):", min_value=2, max_value=1000, value=2, step=1)
 
-        if not isprime(p):
+        if not is_prime(p):
             st.error(f"{p} не является простым числом! Пожалуйста, введите простое число.")
             entry = f"Ошибка: Некорректная характеристика поля p={p} (непростое число)."
             log_operation(st.session_state['operation_log'], entry)
@@ -92,9 +479,16 @@ def main_galois():
     initialize_database()
 
     if operating_mode == field_extension_name:
+        with st.expander("Подобрать модуль с самым быстрым приведением"):
+            n_fastest = st.number_input("Степень расширения n:", min_value=2, max_value=200, value=8, step=1,
+                                        key='n_fastest_input')
+            if p and st.button("Подобрать модуль"):
+                with st.spinner("Поиск многочлена малого веса..."):
+                    st.session_state['suggested_modulus'] = ",".join(map(str, fastest_modulus(p, int(n_fastest))))
+
         coeffs_input = st.text_input(
             "Введите коэффициенты неприводимого многочлена (от старшей степени к младшей), через запятую:",
-            value="1,0,1"
+            value=st.session_state.get('suggested_modulus', "1,0,1")
         )
         modulus_file = st.file_uploader("Или загрузите коэффициенты из файла:", type=["txt"], key="modulus_file")
 
@@ -129,12 +523,24 @@ def main_galois():
                 entry = f"Ошибка: Многочлен степени {len(modulus_coeffs)-1} недостаточно высок для расширения поля GF({p}^n). Коэффициенты: {modulus_coeffs}"
                 log_operation(st.session_state['operation_log'], entry)
             else:
+                # Проверка модуля тестом Бен-Ора оценивается заранее: слишком долгая проверка не запускается
+                planner = get_planner()
+                n_field = len(modulus_coeffs) - 1
+                known = (catalog_contains(p, tuple(modulus_coeffs), catalog_version())
+                         if get_catalog() is not None else None)
+                field_plan = planner.plan_field(p, modulus_coeffs, known)
                 try:
-                    field = GaloisFieldExtension(p, modulus_coeffs)
+                    planner.admit(field_plan)
+                    field = get_field(p, tuple(modulus_coeffs))
                     st.success(f"Поле {field} успешно создано.")
 
                     st.write("**Многочлен, задающий поле:**")
                     st.write(format_polynomial(field.modulus_polynomial))
+
+                    weight = sum(1 for c in modulus_coeffs if c)
+                    st.caption(f"Проверка модуля - {field_plan.describe()}. "
+                               f"Умножение - {planner.plan_multiplication(p, n_field, weight).describe()}. "
+                               f"Обращение - {planner.plan_inversion(p, n_field, weight).describe()}.")
                 except ValueError as e:
                     st.error(str(e))
 
@@ -167,7 +573,7 @@ def main_galois():
 
         if p:
             try:
-                field = GaloisFieldSimple(p)
+                field = get_field(p)
                 st.success(f"Поле {field} успешно создано.")
             except Exception as e:
                 st.error("Ошибка при создании простого поля.")
@@ -190,139 +596,214 @@ def main_galois():
         n_irreducible = st.number_input("Введите степень многочлена n:", min_value=1, max_value=200, value=3, step=1,
                                         key='n_irreducible_input')
 
+        search_mode = st.radio("Режим поиска", (lex_search_name, random_search_name, primitive_search_name,
+                                                low_weight_search_name),
+                               key='search_mode_input',
+                               help="Случайный поиск быстро находит многочлены больших степеней, "
+                                    "перебор выдаёт их по порядку, примитивные многочлены ищутся среди унитарных, "
+                                    "многочлены малого веса (триномы, пентаномы) дают самое быстрое приведение.")
+
         # Проверка на корректность простого числа
-        if not isprime(p_irreducible):
+        if not is_prime(p_irreducible):
             st.error(f"{p_irreducible} не является простым числом! Пожалуйста, введите простое число.")
             p_irreducible = None
 
+        step_plan = None
+        if p_irreducible is not None:
+            monic_count = count_irreducible_polynomials(int(p_irreducible), int(n_irreducible))
+            st.caption(f"Всего неприводимых многочленов степени {int(n_irreducible)}: "
+                       f"{(int(p_irreducible) - 1) * monic_count} (из них унитарных: {monic_count}).")
+
+            # Оценка шага поиска показывается до запуска; шаг, не укладывающийся в бюджет, не запускается
+            step_plan = search_plan(int(p_irreducible), int(n_irreducible), search_mode)
+            if step_plan.admitted:
+                st.caption(f"Оценка шага поиска: {step_plan.describe()}")
+            else:
+                st.warning(f"Поиск недоступен: {step_plan.describe()}")
+
         # Инициализация состояния при изменении p или n
         if ('p_irreducible' not in st.session_state or 'n_irreducible' not in st.session_state or
-            st.session_state.get('p_irreducible') != p_irreducible or st.session_state.get('n_irreducible') != n_irreducible):
+            st.session_state.get('p_irreducible') != p_irreducible or st.session_state.get('n_irreducible') != n_irreducible or
+            st.session_state['search_mode'] != search_mode):
+
+            st.session_state['search_mode'] = search_mode
+            st.session_state['random_seed'] = random.randrange(2 ** 32)
+            cancel_background_search()
 
             if p_irreducible is not None:
                 st.session_state['p_irreducible'] = int(p_irreducible)
                 st.session_state['n_irreducible'] = int(n_irreducible)
                 st.session_state['offset'] = 0
-                st.session_state['irreducible_pols'] = []
+                st.session_state['irreducible_pols'] = PolynomialBuffer(int(p_irreducible), int(n_irreducible))
                 st.session_state['batch_size'] = int(p_irreducible) * int(n_irreducible)
                 print(st.session_state['batch_size'])
             else:
                 st.session_state['p_irreducible'] = None
                 st.session_state['n_irreducible'] = None
                 st.session_state['offset'] = 0
-                st.session_state['irreducible_pols'] = []
+                st.session_state['irreducible_pols'] = PolynomialBuffer()
                 st.session_state['batch_size'] = 0  # чтобы не было дальнейших запросов
 
             st.session_state['generator_initialized'] = False  # Флаг, показывающий, что генератор нужно инициализировать заново
 
-        # Кнопка "Поиск неприводимых многочленов"
-        if not st.session_state['irreducible_pols'] and st.button("Поиск неприводимых многочленов"):
+        search_running = st.session_state['background_search'] is not None
+
+        # Кнопка "Поиск неприводимых многочленов": поиск идёт в фоне, страница остаётся доступной
+        if (not st.session_state['irreducible_pols'] and not search_running and
+                st.button("Поиск неприводимых многочленов", disabled=step_plan is not None and not step_plan.admitted)):
 
             if p_irreducible is None:
                 st.error("Введите корректное простое число p.")
             else:
-                with st.spinner("Поиск неприводимых многочленов..."):
-
-                    # Инициализация генератора при первом запуске
-                    if not st.session_state.get('generator_initialized', False):
-                        st.session_state['generator_initialized'] = True
-                        st.session_state['offset'] = 0  # Сброс offset при первом поиске
-                        st.session_state['irreducible_pols'] = []
-
-                    irreducible_polys = find_irreducible_polynomials_batch(
-                        st.session_state['p_irreducible'],
-                        st.session_state['n_irreducible'],
-                        st.session_state['batch_size'],
-                        st.session_state['offset']
-                    )
-
-                    # Добавление найденных многочленов
-                    st.session_state['irreducible_pols'].extend(irreducible_polys)
-                    st.session_state['offset'] += st.session_state['batch_size']
-
-                    if irreducible_polys:
-                        st.success(f"Найдено {len(irreducible_polys)} неприводимых многочленов.")
-                    else:
-                        st.warning("Больше неприводимых многочленов не найдено.")
+                # Инициализация генератора при первом запуске
+                if not st.session_state.get('generator_initialized', False):
+                    st.session_state['generator_initialized'] = True
+                    st.session_state['offset'] = 0  # Сброс offset при первом поиске
+                    st.session_state['irreducible_pols'] = PolynomialBuffer(st.session_state['p_irreducible'],
+                                                                            st.session_state['n_irreducible'])
+
+                start_background_search()
+                search_running = True
+
+        # Полный перебор решетом доступен, только если все кандидаты помещаются в память
+        # и планировщик выбрал решето (оно укладывается в бюджет времени и памяти)
+        all_plan = None
+        if p_irreducible is not None and p_irreducible ** n_irreducible <= SIEVE_MAX_CANDIDATES:
+            all_plan = get_planner().plan_search(int(p_irreducible), int(n_irreducible), 'all')
+            st.caption(f"Оценка поиска всех унитарных многочленов: {all_plan.describe()}")
+
+        if (all_plan is not None and
+                st.button("Найти все унитарные неприводимые многочлены",
+                          disabled=search_running or all_plan.algorithm != 'sieve' or all_plan.downgraded)):
+
+            with st.spinner("Просеивание многочленов..."):
+                irreducible_polys = sieve_irreducible_polynomials(
+                    st.session_state['p_irreducible'],
+                    st.session_state['n_irreducible']
+                )
 
-                    st.rerun()  # Перезагружаем интерфейс для обновления найденных многочленов
+                st.session_state['generator_initialized'] = True
+                st.session_state['irreducible_pols'] = PolynomialBuffer(st.session_state['p_irreducible'],
+                                                                        st.session_state['n_irreducible'])
+                st.session_state['irreducible_pols'].extend(irreducible_polys)
+                # Все кандидаты уже просмотрены, кнопка "Ещё" больше ничего не найдёт
+                st.session_state['offset'] = (p_irreducible - 1) * p_irreducible ** n_irreducible
 
-        # Вывод найденных неприводимых многочленов
-        if st.session_state['irreducible_pols']:
-            st.write(f"Найдено {len(st.session_state['irreducible_pols'])} неприводимых многочленов:")
-            for idx, poly_coeffs in enumerate(st.session_state['irreducible_pols']):
-                curr_irr_p = st.session_state['p_irreducible']
-                poly_coeffs = [coef % curr_irr_p for coef in poly_coeffs]
-                degree = len(poly_coeffs) - 1
-                poly = np.poly1d(poly_coeffs)
-                polynomial_str = format_polynomial(poly)
-                cols = st.columns([4, 2])
+                st.rerun()
 
-                with cols[0]:
-                    st.write(polynomial_str)
+        # Вывод найденных неприводимых многочленов: показывается только текущая страница,
+        # строки многочленов берутся из кэша буфера
+        if st.session_state['irreducible_pols']:
+            found_polys = st.session_state['irreducible_pols']
+            curr_irr_p = st.session_state['p_irreducible']
+            degree = st.session_state['n_irreducible']
+            primitive = True if st.session_state['search_mode'] == primitive_search_name else None
+
+            st.write(f"Найдено {len(found_polys)} неприводимых многочленов:")
+
+            first, page_size = choose_page('found', len(found_polys))
+            page = range(first, min(first + page_size, len(found_polys)))
+            selected = show_polynomial_table(
+                [(found_polys.formatted(idx), found_polys.coefficients_string(idx), None) for idx in page], first, 'found')
+
+            # Многочлены сохраняются одной транзакцией
+            cols = st.columns(3)
+            with cols[0]:
+                save_selected = st.button("Сохранить выбранные", disabled=not selected)
+            with cols[1]:
+                save_page = st.button("Сохранить страницу")
+            with cols[2]:
+                save_all = st.button("Сохранить все")
+
+            if save_selected or save_page or save_all:
+                if save_all:
+                    to_save = found_polys
+                else:
+                    to_save = [found_polys[page[row]] for row in (selected if save_selected else range(len(page)))]
 
-                with cols[1]:
-                    create_copy_button(", ".join(map(str, poly_coeffs)), f"{idx}_{curr_irr_p}_{degree}")
-                    save_button = st.button(f"Сохранить {polynomial_str}")
+                time = datetime.now()
+                save_polynomials_to_db(to_save, curr_irr_p, degree, time, primitive=primitive)
+                st.success(f"Сохранено {len(to_save)} многочленов в {time.strftime('%Y-%m-%d %H:%M:%S')}")
 
-                    if save_button:
-                        time = datetime.now()
-                        save_polynomials_to_db([poly], st.session_state['p_irreducible'], st.session_state['n_irreducible'], time)
-                        st.success(f"Многочлен сохранён: {polynomial_str} в {time.strftime('%Y-%m-%d %H:%M:%S')}")
+            show_export('found', (curr_irr_p, degree, len(found_polys)),
+                        lambda: ((coeffs, None) for coeffs in found_polys), f'irreducible_{curr_irr_p}_{degree}')
 
             # Кнопка "Ещё"
-            if st.button("Ещё"):
+            if not search_running and st.button("Ещё", disabled=step_plan is not None and not step_plan.admitted):
+                start_background_search()
+                search_running = True
 
-                with st.spinner("Поиск следующего неприводимого многочлена..."):
-
-                    irreducible_polys = find_irreducible_polynomials_batch(
-                        st.session_state['p_irreducible'],
-                        st.session_state['n_irreducible'],
-                        st.session_state['batch_size'],
-                        st.session_state['offset']
-                    )
-
-                    if irreducible_polys:
-                        st.session_state['irreducible_pols'].extend(irreducible_polys)
-                        st.session_state['offset'] += st.session_state['batch_size']
-                    else:
-                        st.write("Больше неприводимых многочленов не найдено.")
-
-                    st.rerun()  # Перезагружаем интерфейс для обновления найденных многочленов
+        if search_running:
+            show_background_search()
 
     elif operating_mode == load_db_name:
         st.header("Загрузить многочлены из Базы Данных")
 
         p_load = st.number_input("Введите характеристику p:", min_value=2, max_value=100, step=1, key='p_load_input')
         n_load = st.number_input("Введите степень многочлена n:", min_value=1, max_value=200,  step=1, key='n_load_input')
+        primitive_only = st.checkbox("Только примитивные", key='primitive_only_input')
+
+        catalog = get_catalog()
 
         if st.button("Загрузить многочлены"):
             if p_load is None or n_load is None:
                 st.error("Введите корректные значения для p и n.")
             else:
-                saved_polys = get_saved_polynomials(p=int(p_load), n=int(n_load))
-
-                if saved_polys:
-                    st.write(f"Найдено {len(saved_polys)} многочленов с p={int(p_load)} и n={int(n_load)}:")
-                    for idx, record in enumerate(saved_polys):
-                        p_val, n_val, coeffs_str, date = record
-                        coeffs = list(map(int, coeffs_str.split(',')))
-                        poly_np = np.poly1d(coeffs)
-
-                        terms = []
-                        degree = len(poly_np.coeffs) - 1
+                st.session_state['load_request'] = (int(p_load), int(n_load), primitive_only)
+                st.session_state['load_page_boundaries'] = {}
+
+        # Загруженная таблица остаётся на странице при перелистывании, пока не изменились p, n и фильтр
+        request = st.session_state['load_request']
+        if request is not None and request == (int(p_load), int(n_load), primitive_only):
+            p_req, n_req, _ = request
+
+            # Если многочлены есть в файле каталога, они берутся из отображённого в память файла без обращения к базе
+            use_catalog = catalog is not None and catalog.has_section(p_req, n_req)
+            if use_catalog:
+                saved_count = catalog.count(p_req, n_req, primitive_only=primitive_only)
+            else:
+                saved_count = count_saved_polynomials(p_req, n_req, primitive_only=primitive_only)
+
+            if saved_count:
+                st.write(f"Найдено {saved_count} многочленов с p={p_req} и n={n_req}:")
+                if use_catalog:
+                    st.caption(f"Многочлены взяты из файла каталога {CATALOG_PATH}.")
+
+                first, page_size = choose_page('load', saved_count)
+                if use_catalog:
+                    rows = [(polynomial_str, coeffs_str, None) for polynomial_str, coeffs_str in
+                            catalog_page(p_req, n_req, primitive_only, first, first + page_size, catalog_version())]
+                    polynomials = lambda: ((coeffs, None) for coeffs in
+                                           catalog.polynomials(p_req, n_req, primitive_only=primitive_only))
+                else:
+                    rows = [(polynomial_string(tuple(coeffs)), ", ".join(map(str, coeffs)), date) for coeffs, date in
+                            saved_polynomials_page(p_req, n_req, primitive_only, first, page_size, saved_count)]
+                    polynomials = lambda: iter_saved_polynomials(p_req, n_req, primitive_only=primitive_only)
 
-                        polynomial_str = format_polynomial(poly_np)
+                show_polynomial_table(rows, first, 'load', with_dates=not use_catalog)
+                show_export('load', request + (saved_count, use_catalog), polynomials, f'saved_{p_req}_{n_req}')
+            else:
+                st.write("Нет сохраненных многочленов для заданных p и n.")
 
-                        cols = st.columns([4, 2])
-                        with cols[0]:
-                            st.write(polynomial_str)
-                            st.write(date)
-                        with cols[1]:
-                            create_copy_button(coeffs_str, f"{idx}_{p_load}_{n_load}")
+        with st.expander("Файл каталога"):
+            if catalog is not None:
+                check_input = st.text_input("Проверить многочлен по каталогу (коэффициенты от старшей степени, "
+                                            "через запятую):", key='catalog_check_input')
+                if check_input:
+                    try:
+                        known = catalog_contains(int(p_load), tuple(int(c) for c in check_input.split(',')), catalog_version())
+                        if known is None:
+                            st.info("В каталоге нет сведений об этом многочлене.")
+                        elif known:
+                            st.success("Многочлен неприводим (есть в каталоге).")
+                        else:
+                            st.warning("Многочлен приводим (в каталоге есть все неприводимые многочлены этой степени).")
+                    except ValueError:
+                        st.error("Коэффициенты должны быть целыми числами через запятую.")
 
-                else:
-                    st.write("Нет сохраненных многочленов для заданных p и n.")
+            if st.button("Выгрузить базу данных в файл каталога"):
+                exported = export_catalog()
+                st.success(f"В файл {CATALOG_PATH} выгружено {exported} многочленов.")
 
     if field:
         st.header("Элементы поля")
@@ -389,7 +870,7 @@ def main_galois():
             for name, element in st.session_state['field_elements_simple'].items():
                 cols = st.columns([4, 1])
                 with cols[0]:
-                    st.write(f"{format_polynomial(element.poly)}")
+                    st.write(name)
                 with cols[1]:
                     if st.button("Удалить", key=f"del_{name}"):
                         del st.session_state['field_elements_simple'][name]
@@ -456,7 +937,7 @@ def main_galois():
                 for name, poly in st.session_state['polynomials_simple'].items():
                     cols = st.columns([4, 1])
                     with cols[0]:
-                        st.write(f"{format_polynomial(poly.poly)}")
+                        st.write(name)
                     with cols[1]:
                         if st.button("Удалить", key=f"del_poly_{name}"):
                             del st.session_state['polynomials_simple'][name]
@@ -465,6 +946,39 @@ def main_galois():
                             log_operation(st.session_state['operation_log'], entry)
                             st.rerun()
 
+            if st.session_state['polynomials_simple']:
+                st.subheader("Разложение на неприводимые множители")
+                factor_poly_name = st.selectbox("Выберите многочлен для разложения",
+                                                list(st.session_state['polynomials_simple'].keys()), key="factor_poly")
+                factor_poly = st.session_state['polynomials_simple'][factor_poly_name]
+
+                if st.button("Разложить на множители", key="factor_poly_button"):
+                    try:
+                        start = perf_counter()
+                        lead, factors = factor_poly.factor()
+                        duration = perf_counter() - start
+
+                        parts = [str(lead)] if lead != 1 or not factors else []
+                        for factor, multiplicity in factors:
+                            part = f"({format_polynomial(factor.poly)})" if len(factors) > 1 or lead != 1 or multiplicity > 1 \
+                                else format_polynomial(factor.poly)
+                            parts.append(f"{part}^{multiplicity}" if multiplicity > 1 else part)
+                        factorization = " · ".join(parts)
+
+                        st.write(f"{format_polynomial(factor_poly.poly)} = {factorization}")
+                        if len(factors) == 1 and factors[0][1] == 1:
+                            st.success("Многочлен неприводим.")
+
+                        entry = f"Операция: Разложение на множители над GF({p})\nМногочлен: {format_polynomial(factor_poly.poly)}\nРезультат: {factorization}\n"
+                        log_operation(st.session_state['operation_log'], entry, op="Разложение на множители",
+                                      operands=[format_polynomial(factor_poly.poly)], result=factorization,
+                                      duration=duration)
+                    except ValueError as e:
+                        st.error(str(e))
+
+                        entry = f"Ошибка при разложении многочлена {format_polynomial(factor_poly.poly)} на множители: {str(e)}"
+                        log_operation(st.session_state['operation_log'], entry)
+
             st.header("Операции с многочленами над GF(p)")
 
             if st.session_state['polynomials_simple']:
@@ -486,6 +1000,7 @@ def main_galois():
 
                     if st.button("Выполнить операцию", key="compute_poly_operation"):
                         try:
+                            start = perf_counter()
                             if poly_operation == "Сложение":
                                 result_poly = poly1 + poly2
                                 operation_desc = "Сложение"
@@ -501,12 +1016,15 @@ def main_galois():
                             elif poly_operation == "Деление":
                                 result_poly, remainder_poly = poly1 / poly2
                                 operation_desc = "Деление"
+                            duration = perf_counter() - start
+                            operands = [format_polynomial(poly1.poly), format_polynomial(poly2.poly)]
 
                             if poly_operation != "Деление":
                                 st.write(f"Результат: {format_polynomial(result_poly.poly)}")
 
                                 entry = f"Операция: {operation_desc}\nМногочлен 1: {format_polynomial(poly1.poly)}\nМногочлен 2: {format_polynomial(poly2.poly)}\nРезультат: {format_polynomial(result_poly.poly)}\n"
-                                log_operation(st.session_state['operation_log'], entry)
+                                log_operation(st.session_state['operation_log'], entry, op=operation_desc, operands=operands,
+                                              result=format_polynomial(result_poly.poly), duration=duration)
 
                                 st.session_state['last_operation_result_polynomial'] = result_poly
                             else:
@@ -515,7 +1033,9 @@ def main_galois():
 
                                 entry = f"Операция: {operation_desc}\nМногочлен 1: {format_polynomial(poly1.poly)}\nМногочлен 2: {format_polynomial(poly2.poly)}\nЧастное: {format_polynomial(result_poly.poly)}\nОстаток: {format_polynomial(remainder_poly.poly)}\n"
 
-                                log_operation(st.session_state['operation_log'], entry)
+                                log_operation(st.session_state['operation_log'], entry, op=operation_desc, operands=operands,
+                                              result=f"{format_polynomial(result_poly.poly)}, остаток {format_polynomial(remainder_poly.poly)}",
+                                              duration=duration)
                                 st.session_state['last_operation_result'] = None  # Остаток уже выведен
                         except ZeroDivisionError:
                             st.error("Деление на ноль.")
@@ -571,6 +1091,7 @@ def main_galois():
             if st.button("Вычислить"):
                 result = None
                 try:
+                    start = perf_counter()
                     if operation == "Сложение":
                         result = el1 + el2
                     elif operation == "Вычитание":
@@ -579,16 +1100,20 @@ def main_galois():
                         result = el1 * el2
                     elif operation == "Деление":
                         result = el1 / el2
+                    duration = perf_counter() - start
                     if result:
                         st.session_state['last_operation_result_element'] = result
                         if operating_mode == field_extension_name:
                             st.write(f"Результат: {format_polynomial(result.poly)}")
                             entry = f"Операция: {operation}\nПоле: {field}\n{el1_name}: {format_polynomial(el1.poly)}\n{el2_name}: {format_polynomial(el2.poly)}\nРезультат: {format_polynomial(result.poly)}\n"
+                            operands, result_str = [el1_name, el2_name], format_polynomial(result.poly)
                         else:
                             st.write(f"Результат: {result.value}")
                             entry = f"Операция: {operation}\nПоле: {field}\n{el1_name}: {el1.value}\n{el2_name}: {el2.value}\nРезультат: {result.value}\n"
+                            operands, result_str = [el1.value, el2.value], result.value
 
-                        log_operation(st.session_state['operation_log'], entry)
+                        log_operation(st.session_state['operation_log'], entry, op=f"{operation} в {field}",
+                                      operands=operands, result=result_str, duration=duration)
                 except ZeroDivisionError:
                     st.error("Деление на ноль.")
 
@@ -619,6 +1144,76 @@ def main_galois():
                     st.session_state['last_operation_result_element'] = None
                     st.rerun()
 
+        st.header("Вычисление выражения")
+
+        expression_input = st.text_input("Введите выражение от переменных, например (a*b + c)/(a - d)^3:",
+                                         key="expression_input")
+        if expression_input.strip():
+            expression = None
+            try:
+                expression = compile_expression(expression_input, field)
+            except ExpressionError as e:
+                st.error(f"Ошибка в выражении: {e}")
+
+            if expression is not None:
+                counts = expression.counts()
+                st.caption(f"Операций в плане: {counts['operations']} (в записи выражения: {counts['requested']}), "
+                           f"обращений: {counts['inversions']}, выполняемых за {counts['inversion_batches']} проход(а)")
+                with st.expander("План вычисления"):
+                    st.code(expression.describe(), language=None)
+
+                element_names = list(st.session_state['field_elements_simple'].keys())
+                if expression.variables and not element_names:
+                    st.info("Добавьте элементы поля, чтобы задать значения переменных.")
+                else:
+                    bindings = {name: st.selectbox(f"Значение переменной {name}", element_names, key=f"expr_var_{name}")
+                                for name in expression.variables}
+
+                    if st.button("Вычислить выражение"):
+                        values = {name: st.session_state['field_elements_simple'][element_name]
+                                  for name, element_name in bindings.items()}
+                        operands = [f"{name} = {element_name}" for name, element_name in bindings.items()]
+                        try:
+                            start = perf_counter()
+                            result = expression.evaluate(values)
+                            duration = perf_counter() - start
+
+                            if operating_mode == field_extension_name:
+                                result_str = format_polynomial(result.poly)
+                            else:
+                                result_str = result.value
+                            st.session_state['last_expression_result'] = result
+                            st.write(f"Результат: {result_str}")
+
+                            entry = f"Операция: Вычисление выражения {expression_input}\nПоле: {field}\n" + \
+                                    "\n".join(operands) + f"\nРезультат: {result_str}\n"
+                            log_operation(st.session_state['operation_log'], entry, op=f"Выражение в {field}",
+                                          operands=[expression_input] + operands, result=result_str,
+                                          duration=duration)
+                        except ZeroDivisionError:
+                            st.error("Деление на ноль.")
+
+                            entry = f"Ошибка: Деление на ноль при вычислении выражения {expression_input} ({', '.join(operands)})."
+                            log_operation(st.session_state['operation_log'], entry)
+
+                    if st.session_state.get('last_expression_result') is not None:
+                        if st.button("Сохранить значение выражения как новый элемент", key="save_expression_result"):
+                            result = st.session_state['last_expression_result']
+
+                            if operating_mode == field_extension_name:
+                                element_name = format_polynomial(result.poly)
+                            else:
+                                element_name = result.value
+
+                            st.session_state['field_elements_simple'][element_name] = result
+                            st.success(f"Результат сохранен как {element_name}")
+
+                            entry = f"Сохранение значения выражения как нового элемента: {element_name}"
+                            log_operation(st.session_state['operation_log'], entry)
+
+                            st.session_state['last_expression_result'] = None
+                            st.rerun()
+
         st.header("Обратные элементы")
 
         if operating_mode == field_extension_name:
@@ -635,11 +1230,14 @@ def main_galois():
 
                 if st.button("Найти обратный"):
                     try:
+                        start = perf_counter()
                         inverse_el = el_inv.inverse()
+                        duration = perf_counter() - start
                         st.session_state['last_inverse_result_polynomial'] = inverse_el
                         st.write(f"Обратный элемент для {el_inv_name}: {format_polynomial(inverse_el.poly)}")
                         entry = f"Операция: Нахождение обратного элемента\nПоле: {field}\nЭлемент: {format_polynomial(el_inv.poly)}\nОбратный элемент: {format_polynomial(inverse_el.poly)}\n"
-                        log_operation(st.session_state['operation_log'], entry)
+                        log_operation(st.session_state['operation_log'], entry, op=f"Обратный элемент в {field}",
+                                      operands=[el_inv_name], result=format_polynomial(inverse_el.poly), duration=duration)
                     except Exception as e:
                         st.error("Этот элемент не имеет обратного.")
 
@@ -677,14 +1275,17 @@ def main_galois():
 
                 if st.button("Найти обратный"):
                     try:
+                        start = perf_counter()
                         inverse_el = el_inv.inverse()
+                        duration = perf_counter() - start
 
                         st.session_state['last_inverse_result_element'] = inverse_el
                         st.write(f"Обратный элемент для {el_inv_name}: {inverse_el.value}")
 
                         entry = f"Операция: Нахождение обратного элемента\nПоле: {field}\nЭлемент: {el_inv.value}\nОбратный элемент: {inverse_el.value}\n"
 
-                        log_operation(st.session_state['operation_log'], entry)
+                        log_operation(st.session_state['operation_log'], entry, op=f"Обратный элемент в {field}",
+                                      operands=[el_inv.value], result=inverse_el.value, duration=duration)
                     except Exception as e:
                         st.error("Этот элемент не имеет обратного.")
 
@@ -742,14 +1343,18 @@ def main_galois():
                             st.warning(
                                 f"Максимальная степень элемента поля: {len(field.modulus_polynomial.coeffs) - 2}. Привожу многочлен по модулю.")
                         x_element = field.create_element(x_coeffs)
+                        start = perf_counter()
                         result = el_eval.calculate_value(x_element)
+                        duration = perf_counter() - start
 
                         st.session_state['last_evaluation_result'] = result
                         st.write(
                             f"Значение {format_polynomial(el_eval.poly)} при {format_polynomial(x_element.poly)}: {format_polynomial(result.poly)}")
 
                         entry = f"Операция: Вычисление значения многочлена\nПоле: {field}\nМногочлен: {format_polynomial(el_eval.poly)}\nЗначение: {format_polynomial(x_element.poly)}\nРезультат: {format_polynomial(result.poly)}\n"
-                        log_operation(st.session_state['operation_log'], entry)
+                        log_operation(st.session_state['operation_log'], entry, op=f"Значение многочлена в {field}",
+                                      operands=[format_polynomial(el_eval.poly), format_polynomial(x_element.poly)],
+                                      result=format_polynomial(result.poly), duration=duration)
                     except Exception as e:
                         st.error("Некорректный ввод значения для вычисления.")
 
@@ -780,13 +1385,17 @@ def main_galois():
 
                 if st.button("Вычислить значение"):
                     try:
+                        start = perf_counter()
                         result = selected_poly.calculate_value(selected_element)
+                        duration = perf_counter() - start
 
                         st.write(
                             f"При x = {selected_element.value}, значение {format_polynomial(selected_poly.poly)} = {result.value}")
                         entry = f"Операция: Вычисление значения многочлена над GF({p})\nМногочлен: {format_polynomial(selected_poly.poly)}\nЭлемент для подстановки: {selected_element.value}\nРезультат: {result.value}\n"
 
-                        log_operation(st.session_state['operation_log'], entry)
+                        log_operation(st.session_state['operation_log'], entry, op=f"Значение многочлена над GF({p})",
+                                      operands=[format_polynomial(selected_poly.poly), selected_element.value],
+                                      result=result.value, duration=duration)
                     except Exception as e:
                         print(e)
                         st.error("Ошибка при вычислении значения многочлена.")
@@ -799,9 +1408,71 @@ def main_galois():
         entry = "Информация: Необходимо определить поле Галуа для продолжения работы."
         log_operation(st.session_state['operation_log'], entry)
 
-    if st.session_state['operation_log']:
-        operation_log_str = "\n".join(st.session_state['operation_log'])
-        st.download_button("Скачать лог операций", operation_log_str, file_name="operation_log.txt")
+    # Фоновый поиск продолжается, пока пользователь работает с полем: его ход виден на боковой панели
+    if operating_mode != finding_poly_name and st.session_state['background_search'] is not None:
+        with st.sidebar:
+            show_background_search()
+
+    memo = get_memo()
+    if operating_mode in [field_extension_name, simple_field_name] and memo is not None:
+        with st.expander("Кэш результатов операций"):
+            stats = memo.stats()
+            st.write(f"Попаданий: {stats['hits']}, промахов: {stats['misses']} "
+                     f"(доля попаданий {stats['hit_rate']:.0%}).")
+            st.write(f"Записей: {stats['entries']}, объём: {stats['bytes'] / 1024:.1f} КБ, "
+                     f"вытеснено: {stats['evictions']}.")
+            if st.button("Очистить кэш", key='clear_memo'):
+                memo.invalidate()
+                st.rerun()
+
+    timings = get_timings()
+    if timings is not None:
+        with st.expander("Диагностика: длительность операций"):
+            summary = timings.summary()
+            if not summary:
+                st.write("Замеров пока нет.")
+            else:
+                def milliseconds(seconds):
+                    return None if seconds is None else round(seconds * 1000, 3)
+
+                st.dataframe([{
+                    'Операция': op,
+                    'Вызовов': stats['count'],
+                    'Среднее, мс': milliseconds(stats['mean']),
+                    'p50, мс': milliseconds(stats['p50']),
+                    'p95, мс': milliseconds(stats['p95']),
+                    'p99, мс': milliseconds(stats['p99']),
+                    'Максимум, мс': milliseconds(stats['max']),
+                } for op, stats in summary.items()], hide_index=True)
+                st.caption("Перцентили оцениваются по корзинам гистограмм (от 1 мкс до 10 с).")
+
+                cols = st.columns(3)
+                with cols[0]:
+                    st.download_button("Скачать (JSON)", timings.export_json(), file_name="timings.json",
+                                       key='download_timings_json')
+                with cols[1]:
+                    st.download_button("Скачать (Prometheus)", timings.export_prometheus(), file_name="timings.prom",
+                                       key='download_timings_prometheus')
+                with cols[2]:
+                    if st.button("Сбросить замеры", key='reset_timings'):
+                        timings.reset()
+                        st.rerun()
+
+    # Выгрузка журнала собирается только по запросу, а не при каждой перерисовке
+    operation_log = st.session_state['operation_log']
+    if operation_log:
+        if st.button("Подготовить лог операций", key='prepare_operation_log'):
+            st.session_state['operation_log_export'] = (operation_log.version, operation_log.export(),
+                                                        operation_log.export('jsonl'))
+
+        export = st.session_state.get('operation_log_export')
+        if export is not None and export[0] == operation_log.version:
+            _, log_text, log_jsonl = export
+            cols = st.columns(2)
+            with cols[0]:
+                st.download_button("Скачать лог операций", log_text, file_name="operation_log.txt")
+            with cols[1]:
+                st.download_button("Скачать лог операций (JSON Lines)", log_jsonl, file_name="operation_log.jsonl")
 
 if __name__ == "__main__":
     try:
@@ -2,15 +2,10 @@ from __future__ import annotations
 
 import numpy as np
 
-import sys
-import os
+from .elements import GaloisFieldExtensionElement, is_irreducible_benor, is_prime
+from .elements.timing import instrumented
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '.')))
-
-from elements import GaloisFieldExtensionElement, is_irreducible_benor
-
-from sympy import isprime, Poly
-from sympy.abc import x
+from .catalog_file import get_catalog
 
 from typing import List
 
@@ -19,6 +14,7 @@ class GaloisFieldExtension:
     """
     Класс, представляющий поле Галуа GF(p^n).
     """
+    @instrumented('field.create')
     def __init__(self, p: int, modulus_coeffs: List[int]) -> None:
         """
         Инициализация поля Галуа GF(p^n).
@@ -26,16 +22,37 @@ class GaloisFieldExtension:
         :param p: Простое число, характеристика поля.
         :param modulus_coeffs: Коэффициенты неприводимого многочлена, задающего расширение поля.
         """
-        if not isprime(p):
+        if not is_prime(p):
             raise ValueError(f"Число {p} не является простым!")
 
-        if not is_irreducible_benor((p, modulus_coeffs)):
+        # Известные модули проверяются по файлу каталога двоичным поиском, остальные - тестом Бен-Ора
+        catalog = get_catalog()
+        known = catalog.contains(p, modulus_coeffs) if catalog is not None else None
+
+        if known is False or (known is None and not is_irreducible_benor((p, modulus_coeffs))):
             raise ValueError(f"Многочлен {modulus_coeffs} не является неприводимым над полем GF({p})")
                 
         self.p = p
         self.modulus_polynomial = np.poly1d([coef % p for coef in modulus_coeffs])
 
 
+    @classmethod
+    def with_fastest_modulus(cls, p: int, n: int) -> GaloisFieldExtension:
+        """
+        Создает поле GF(p^n), задаваемое самым дешёвым для приведения известным модулем
+        (трином, пентаном или другой неприводимый многочлен наименьшего веса).
+
+        :param p: Простое число, характеристика поля.
+        :param n: Степень расширения.
+        :return: Поле Галуа GF(p^n).
+        """
+        from .find_irreducible_poly import fastest_modulus
+
+        if not is_prime(p):
+            raise ValueError(f"Число {p} не является простым!")
+
+        return cls(p, fastest_modulus(p, n))
+
     def create_element(self, coeffs: List[int]) -> GaloisFieldExtensionElement:
         """
         Создает элемент поля GF(p^n).
@@ -1,5 +1,5 @@
 
-from elements import GaloisFieldSimpleElement, GaloisFieldSimplePolynom
+from .elements import GaloisFieldSimpleElement, GaloisFieldSimplePolynom
 
 class GaloisFieldSimple:
     """
@@ -1,22 +1,141 @@
 from .GaloisFieldExtension import GaloisFieldExtension
 from .GaloisFieldSimple import GaloisFieldSimple
-from elements import format_polynomial
-from .find_irreducible_poly import find_irreducible_polynomials_batch
-from .db import save_polynomials_to_db, initialize_database, get_saved_polynomials
+from .elements import format_polynomial, is_prime, is_primitive, count_irreducible_polynomials, factor_polynomial
+from .elements import OperationMemo, memo_field_key, enable_memo, disable_memo, get_memo, memoized
+from .elements import BatchField, evaluate_batch
+from .elements import OperationTimings, enable_timings, disable_timings, get_timings, instrumented, timed
+from .elements import CostModel, get_cost_model, set_cost_model
+from .find_irreducible_poly import (
+    find_irreducible_polynomials_batch,
+    iter_irreducible,
+    iter_primitive,
+    iter_resumable,
+    iter_resumable_ranges,
+    sieve_irreducible_polynomials,
+    random_irreducible,
+    iter_random_irreducible,
+    find_primitive_polynomials_batch,
+    order_factorization,
+    find_low_weight_irreducible,
+    find_low_weight_irreducibles_batch,
+    iter_low_weight_irreducibles,
+    fastest_modulus,
+    check_polynomial,
+    SIEVE_MAX_CANDIDATES,
+)
+from .search_progress import SearchProgress
+from .search_pool import SearchWorkerPool, get_search_pool
+from .background_search import BackgroundSearch
+from .polynomial_buffer import PolynomialBuffer
+from .operation_log import OperationLog, LogEntry, LEVEL_OPERATION, LEVEL_INFO, LEVEL_ERROR
+from .catalog_file import CatalogFile, export_catalog, import_catalog, get_catalog, CATALOG_PATH
+from .sharded_search import (
+    create_manifest,
+    claim_shard,
+    run_shard_worker,
+    merge_shards,
+    shard_status,
+    run_local_sharded_search,
+)
+from .db import (
+    save_polynomials_to_db,
+    initialize_database,
+    get_saved_polynomials,
+    count_saved_polynomials,
+    get_saved_polynomials_page,
+    iter_saved_polynomials,
+    pack_coefficients,
+    unpack_coefficients,
+    get_connection,
+    close_connections,
+)
+from .expression import CompiledExpression, ExpressionError, compile_expression
+from .service import FieldService, ServiceError, run_service
+from .planner import Plan, Planner, PlanError, load_cost_model, calibrate_cost_model
 from .button import create_copy_button
 
-import sys
-import os
-
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 __all__ = (
     "GaloisFieldExtension",
     "GaloisFieldSimple",
     "format_polynomial",
+    "is_prime",
+    "is_primitive",
+    "factor_polynomial",
+    "OperationMemo",
+    "memo_field_key",
+    "enable_memo",
+    "disable_memo",
+    "get_memo",
+    "memoized",
+    "BatchField",
+    "evaluate_batch",
+    "OperationTimings",
+    "enable_timings",
+    "disable_timings",
+    "get_timings",
+    "instrumented",
+    "timed",
+    "CostModel",
+    "get_cost_model",
+    "set_cost_model",
     "find_irreducible_polynomials_batch",
+    "iter_irreducible",
+    "iter_primitive",
+    "iter_resumable",
+    "iter_resumable_ranges",
+    "sieve_irreducible_polynomials",
+    "random_irreducible",
+    "iter_random_irreducible",
+    "find_primitive_polynomials_batch",
+    "order_factorization",
+    "find_low_weight_irreducible",
+    "find_low_weight_irreducibles_batch",
+    "iter_low_weight_irreducibles",
+    "fastest_modulus",
+    "check_polynomial",
+    "SearchProgress",
+    "SearchWorkerPool",
+    "get_search_pool",
+    "BackgroundSearch",
+    "PolynomialBuffer",
+    "OperationLog",
+    "LogEntry",
+    "LEVEL_OPERATION",
+    "LEVEL_INFO",
+    "LEVEL_ERROR",
+    "CatalogFile",
+    "export_catalog",
+    "import_catalog",
+    "get_catalog",
+    "CATALOG_PATH",
+    "create_manifest",
+    "claim_shard",
+    "run_shard_worker",
+    "merge_shards",
+    "shard_status",
+    "run_local_sharded_search",
+    "count_irreducible_polynomials",
+    "SIEVE_MAX_CANDIDATES",
     "save_polynomials_to_db",
     "initialize_database",
     "get_saved_polynomials",
+    "count_saved_polynomials",
+    "get_saved_polynomials_page",
+    "iter_saved_polynomials",
+    "pack_coefficients",
+    "unpack_coefficients",
+    "get_connection",
+    "close_connections",
+    "CompiledExpression",
+    "ExpressionError",
+    "compile_expression",
+    "FieldService",
+    "ServiceError",
+    "run_service",
+    "Plan",
+    "Planner",
+    "PlanError",
+    "load_cost_model",
+    "calibrate_cost_model",
     "create_copy_button"
 )
\ No newline at end of file
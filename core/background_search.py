@@ -0,0 +1,99 @@
+import threading
+from contextlib import closing
+from time import perf_counter
+
+from .elements.timing import timed
+
+
+class BackgroundSearch:
+    """
+    Поиск многочленов в фоновом потоке.
+
+    Поиск задаётся итератором шагов: каждый шаг - пара (список найденных многочленов, число проверенных
+    кандидатов). Поток забирает шаги, пока итератор не закончится, не будет найдено target_hits многочленов
+    или поиск не будет отменён; найденное можно читать по ходу поиска через snapshot.
+    При остановке итератор закрывается, поэтому ещё не начатые задания в пуле процессов отменяются.
+    """
+    def __init__(self, steps, target_hits=None):
+        """
+        :param steps: Итератор шагов поиска (например, генератор).
+        :param target_hits: После скольких находок остановить поиск (по умолчанию - не останавливать).
+        """
+        self.target_hits = target_hits
+        self.results = []
+        self.tested = 0
+        self.exhausted = False
+        self.error = None
+        self._steps = steps
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._started = None
+        self._finished = None
+
+    def start(self):
+        """Запускает поиск и сразу возвращает управление."""
+        self._started = perf_counter()
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            with closing(self._steps):
+                while True:
+                    # Каждый шаг - порция поиска; его длительность попадает в гистограмму search.step
+                    with timed('search.step'):
+                        step = next(self._steps, None)
+                    if step is None:
+                        break
+
+                    polynomials, tested = step
+                    with self._lock:
+                        self.results.extend(polynomials)
+                        self.tested += tested
+
+                    if self._cancelled.is_set():
+                        return
+                    if self.target_hits is not None and len(self.results) >= self.target_hits:
+                        return
+
+            self.exhausted = True
+        except Exception as e:
+            self.error = e
+        finally:
+            self._finished = perf_counter()
+
+    def cancel(self):
+        """Просит поиск остановиться после текущего шага."""
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def join(self, timeout=None):
+        """Ждёт завершения поиска; возвращает True, если поиск завершён."""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    @property
+    def elapsed(self):
+        """Время с начала поиска (до его завершения, если поиск уже завершён) в секундах."""
+        if self._started is None:
+            return 0.0
+        return (self._finished or perf_counter()) - self._started
+
+    @property
+    def throughput(self):
+        """Скорость поиска, кандидатов в секунду."""
+        elapsed = self.elapsed
+        return self.tested / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self):
+        """Возвращает копию найденного к текущему моменту и число проверенных кандидатов."""
+        with self._lock:
+            return list(self.results), self.tested
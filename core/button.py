@@ -1,7 +1,10 @@
-import streamlit.components.v1 as components
+import html
 
 
 def create_copy_button(text, button_id):
+    # Streamlit нужен только интерфейсу: импорт внутри функции не тянет его в библиотеку и рабочие процессы
+    import streamlit.components.v1 as components
+
     copy_button_html = f"""
     <style>
     .copy-button {{
@@ -29,7 +32,7 @@ def create_copy_button(text, button_id):
     <button class="copy-button" onclick="copyToClipboard('poly_{button_id}', this)">
         📋 <span>Скопировать</span>
     </button>
-    <input type="hidden" value="{text}" id="poly_{button_id}">
+    <input type="hidden" value="{html.escape(text)}" id="poly_{button_id}">
     <script>
     function copyToClipboard(elementId, btn) {{
         var copyText = document.getElementById(elementId).value;
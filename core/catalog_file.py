@@ -0,0 +1,332 @@
+import os
+import mmap
+import struct
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+
+from .db import (
+    _code_width,
+    SAVED_PAGE_SIZE,
+    initialize_database,
+    get_saved_degrees,
+    iter_saved_codes,
+    is_enumeration_complete,
+    mark_enumeration_complete,
+    save_packed_polynomials,
+    pack_coefficients,
+    unpack_coefficients,
+)
+
+# Формат файла каталога (все числа little-endian):
+#   заголовок: сигнатура CATALOG_MAGIC, версия формата, число разделов;
+#   таблица разделов: для каждой пары (p, n) - ширина записи, флаги раздела, число многочленов
+#   и смещения массива записей и массива флагов примитивности;
+#   данные разделов: упакованные записи многочленов фиксированной ширины (как в базе данных, см. pack_coefficients),
+#   отсортированные по возрастанию (то есть в лексикографическом порядке коэффициентов), и по байту флага
+#   примитивности на многочлен. Массивы выровнены на 8 байт.
+CATALOG_MAGIC = b'GFCATALG'
+CATALOG_VERSION = 1
+CATALOG_PATH = 'irreducible_catalog.gfc'
+
+_HEADER = struct.Struct('<8sII')
+_SECTION = struct.Struct('<IIIIQQQ')
+
+# Флаг раздела: в разделе есть все унитарные неприводимые многочлены степени n над GF(p)
+SECTION_COMPLETE = 1
+
+# Значения байта флага примитивности
+PRIMITIVE_UNKNOWN = 0
+PRIMITIVE_YES = 1
+PRIMITIVE_NO = 2
+
+CatalogSection = namedtuple('CatalogSection', 'p n width flags count records_offset flags_offset')
+
+
+def _align(f, alignment=8):
+    padding = -f.tell() % alignment
+    f.write(b'\0' * padding)
+    return f.tell()
+
+
+def export_catalog(path=CATALOG_PATH, p_range=None, n_range=None, db_path='irreducible_polynomials.db'):
+    """
+    Выгружает многочлены из базы данных в файл каталога.
+
+    Записи каждого раздела читаются из базы постранично уже упорядоченными и пишутся в файл потоком.
+    Файл сначала пишется рядом под временным именем и затем атомарно заменяет прежний, поэтому
+    процессы, уже открывшие прежний файл, продолжают работать с ним.
+
+    :param path: Путь к файлу каталога.
+    :param p_range: Какие характеристики выгружать (например, range(2, 10)); по умолчанию - все.
+    :param n_range: Какие степени выгружать; по умолчанию - все.
+    :param db_path: Путь к базе данных.
+    :return: Число выгруженных многочленов.
+    """
+    initialize_database(db_path)
+    degrees = [(p, n) for p, n in get_saved_degrees(db_path=db_path)
+               if (p_range is None or p in p_range) and (n_range is None or n in n_range)]
+
+    sections = []
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(b'\0' * (_HEADER.size + _SECTION.size * len(degrees)))
+
+        for p, n in degrees:
+            records_offset = _align(f)
+            primitive_flags = bytearray()
+            for code, primitive in iter_saved_codes(p, n, db_path=db_path):
+                f.write(code)
+                primitive_flags.append(PRIMITIVE_UNKNOWN if primitive is None else
+                                       PRIMITIVE_YES if primitive else PRIMITIVE_NO)
+
+            flags_offset = _align(f)
+            f.write(primitive_flags)
+
+            flags = SECTION_COMPLETE if is_enumeration_complete(p, n, db_path=db_path) else 0
+            sections.append(CatalogSection(p, n, _code_width(p, n), flags, len(primitive_flags),
+                                           records_offset, flags_offset))
+
+        f.seek(0)
+        f.write(_HEADER.pack(CATALOG_MAGIC, CATALOG_VERSION, len(sections)))
+        for section in sections:
+            f.write(_SECTION.pack(*section))
+
+    os.replace(tmp_path, path)
+
+    return sum(section.count for section in sections)
+
+
+def import_catalog(path=CATALOG_PATH, db_path='irreducible_polynomials.db'):
+    """
+    Загружает многочлены из файла каталога в базу данных (вместе с флагами примитивности и отметками
+    о полном переборе).
+
+    :return: Число загруженных многочленов.
+    """
+    initialize_database(db_path)
+    time = datetime.now()
+    flag_values = {PRIMITIVE_UNKNOWN: None, PRIMITIVE_YES: 1, PRIMITIVE_NO: 0}
+
+    total = 0
+    with CatalogFile(path) as catalog:
+        for p, n, count, complete in catalog.sections():
+            rows = catalog.records(p, n)
+            primitive_flags = catalog.primitive_flags(p, n)
+
+            for start in range(0, count, SAVED_PAGE_SIZE):
+                stop = min(start + SAVED_PAGE_SIZE, count)
+                save_packed_polynomials(p, n, [(rows[i].tobytes(), flag_values[int(primitive_flags[i])])
+                                               for i in range(start, stop)], time, db_path=db_path)
+
+            if complete:
+                mark_enumeration_complete(p, n, catalog.index_position(p, n, p ** n), time, db_path=db_path)
+            total += count
+
+    return total
+
+
+class CatalogFile:
+    """
+    Файл каталога неприводимых многочленов, отображённый в память.
+
+    Записи каждого раздела доступны как массивы NumPy поверх отображения (без копирования), проверка
+    принадлежности - двоичный поиск по отсортированным записям за O(log N).
+    """
+    def __init__(self, path=CATALOG_PATH):
+        """
+        :param path: Путь к файлу каталога.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, section_count = _HEADER.unpack_from(self._mmap, 0)
+        if magic != CATALOG_MAGIC:
+            self.close()
+            raise ValueError(f"Файл {path} не является файлом каталога многочленов")
+        if version != CATALOG_VERSION:
+            self.close()
+            raise ValueError(f"Неподдерживаемая версия файла каталога {version} (ожидалась {CATALOG_VERSION})")
+
+        self._sections = {}
+        self._primitive_positions = {}
+        for i in range(section_count):
+            section = CatalogSection(*_SECTION.unpack_from(self._mmap, _HEADER.size + i * _SECTION.size))
+            self._sections[(section.p, section.n)] = section
+
+    def close(self):
+        """Закрывает отображение; если ещё живы массивы NumPy поверх него, оно освободится вместе с ними."""
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def sections(self):
+        """Возвращает список четвёрок (p, n, число многочленов, есть ли все унитарные неприводимые)."""
+        return [(s.p, s.n, s.count, bool(s.flags & SECTION_COMPLETE)) for s in self._sections.values()]
+
+    def has_section(self, p, n):
+        return (p, n) in self._sections
+
+    def is_complete(self, p, n):
+        """Есть ли в каталоге все унитарные неприводимые многочлены степени n над GF(p)."""
+        section = self._sections.get((p, n))
+        return section is not None and bool(section.flags & SECTION_COMPLETE)
+
+    def count(self, p, n, primitive_only=False):
+        section = self._sections.get((p, n))
+        if section is None:
+            return 0
+        if primitive_only:
+            return len(self.primitive_positions(p, n))
+        return section.count
+
+    def codes(self, p, n):
+        """Отсортированные упакованные записи раздела как массив байтовых строк NumPy (без копирования)."""
+        section = self._sections[(p, n)]
+        return np.frombuffer(self._mmap, dtype=f'S{section.width}', count=section.count,
+                             offset=section.records_offset)
+
+    def records(self, p, n):
+        """Записи раздела как массив байтов NumPy формы (число многочленов, ширина записи) (без копирования)."""
+        section = self._sections[(p, n)]
+        return np.frombuffer(self._mmap, dtype=np.uint8, count=section.count * section.width,
+                             offset=section.records_offset).reshape(section.count, section.width)
+
+    def primitive_flags(self, p, n):
+        """Флаги примитивности раздела (PRIMITIVE_UNKNOWN, PRIMITIVE_YES, PRIMITIVE_NO) (без копирования)."""
+        section = self._sections[(p, n)]
+        return np.frombuffer(self._mmap, dtype=np.uint8, count=section.count, offset=section.flags_offset)
+
+    def index_position(self, p, n, index):
+        """Позиция в разделе первого многочлена с номером кандидата не меньше index."""
+        section = self._sections[(p, n)]
+        if index >= (p - 1) * p ** n:
+            return section.count
+        key = np.array([index.to_bytes(section.width, 'big')], dtype=f'S{section.width}')
+        return int(np.searchsorted(self.codes(p, n), key)[0])
+
+    def _position(self, p, coeffs):
+        """Позиция многочлена в разделе или None, если его там нет."""
+        n = len(coeffs) - 1
+        if (p, n) not in self._sections:
+            return None
+
+        try:
+            packed = pack_coefficients(coeffs, p)
+        except ValueError:
+            return None
+
+        codes = self.codes(p, n)
+        position = int(np.searchsorted(codes, np.array([packed], dtype=codes.dtype))[0])
+        if position < len(codes) and self.records(p, n)[position].tobytes() == packed:
+            return position
+        return None
+
+    def contains(self, p, coeffs):
+        """
+        Проверяет по каталогу, является ли многочлен (коэффициенты от старшей степени к младшей) неприводимым.
+
+        :return: True, если многочлен (или ассоциированный с ним унитарный) есть в каталоге; False, если его нет,
+                 но в каталоге есть все унитарные неприводимые многочлены этой степени; None, если каталог
+                 ответа не даёт.
+        """
+        coeffs = [int(c) % p for c in coeffs]
+        while coeffs and coeffs[0] == 0:
+            coeffs = coeffs[1:]
+        if len(coeffs) < 2:
+            return None
+
+        if self._position(p, coeffs) is not None:
+            return True
+
+        inverse = pow(coeffs[0], p - 2, p)
+        monic = [c * inverse % p for c in coeffs]
+        if self._position(p, monic) is not None:
+            return True
+
+        return False if self.is_complete(p, len(coeffs) - 1) else None
+
+    def is_primitive(self, p, coeffs):
+        """Возвращает сохранённый в каталоге флаг примитивности многочлена (True, False или None)."""
+        position = self._position(p, [int(c) % p for c in coeffs])
+        if position is None:
+            return None
+        flag = int(self.primitive_flags(p, len(coeffs) - 1)[position])
+        return None if flag == PRIMITIVE_UNKNOWN else flag == PRIMITIVE_YES
+
+    def primitive_positions(self, p, n):
+        """Позиции примитивных многочленов раздела (вычисляются один раз на раздел)."""
+        positions = self._primitive_positions.get((p, n))
+        if positions is None:
+            positions = np.flatnonzero(self.primitive_flags(p, n) == PRIMITIVE_YES)
+            self._primitive_positions[(p, n)] = positions
+        return positions
+
+    def polynomials(self, p, n, start=0, stop=None, primitive_only=False):
+        """
+        Возвращает многочлены раздела с номерами [start, stop) (коэффициенты от старшей степени к младшей).
+
+        При primitive_only номера отсчитываются в списке только примитивных многочленов, поэтому
+        страница любого номера выбирается без просмотра предыдущих.
+        """
+        if (p, n) not in self._sections:
+            return []
+
+        rows = self.records(p, n)
+        if primitive_only:
+            rows = rows[self.primitive_positions(p, n)[start:stop]]
+        else:
+            rows = rows[start:stop]
+
+        return [unpack_coefficients(row.tobytes(), p, n) for row in rows]
+
+    def iter_range(self, p, n, start, stop):
+        """Выдаёт пары (номер кандидата, коэффициенты) многочленов раздела с номерами кандидатов из [start, stop)."""
+        rows = self.records(p, n)[self.index_position(p, n, start):self.index_position(p, n, stop)]
+        for row in rows:
+            code = row.tobytes()
+            yield int.from_bytes(code, 'big'), unpack_coefficients(code, p, n)
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(path=CATALOG_PATH):
+    """
+    Возвращает открытый файл каталога или None, если файла нет.
+
+    Файл открывается один раз на процесс и переоткрывается, если был заменён (например, новой выгрузкой).
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    key = os.path.abspath(path)
+    version = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    with _catalogs_lock:
+        cached = _catalogs.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        try:
+            catalog = CatalogFile(path)
+        except (OSError, ValueError) as e:
+            print(f"Ошибка при открытии файла каталога {path}: {e}")
+            return None
+
+        # Прежнее отображение не закрывается: его ещё могут читать другие потоки
+        _catalogs[key] = (version, catalog)
+        return catalog
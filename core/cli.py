@@ -0,0 +1,767 @@
+"""
+Командная строка для пакетных заданий без интерфейса Streamlit: python -m core <команда> ...
+
+Команды:
+- search - поиск неприводимых (примитивных, малого веса, случайных) многочленов;
+- verify - проверка многочленов на неприводимость и примитивность;
+- arith - арифметика в полях GF(p) и GF(p^n) по записям из файла JSON Lines или CSV;
+- catalog - выгрузка базы данных в файл каталога, загрузка каталога в базу и список его разделов;
+- expr - значения выражения (например, "(a*b + c)/(a - d)^3") для наборов значений переменных из файла;
+- serve - локальный HTTP/JSON-сервис арифметики (см. core.service).
+
+Ввод читается и вывод пишется построчно, поэтому файлы любого размера обрабатываются в постоянной памяти.
+По окончании (и, если задан --progress, периодически) в stderr выводится статистика пропускной способности.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import re
+import sys
+from contextlib import closing, contextmanager
+from datetime import datetime
+from functools import lru_cache
+from itertools import count as count_from, islice
+from time import perf_counter
+
+import numpy as np
+
+from .GaloisFieldExtension import GaloisFieldExtension
+from .GaloisFieldSimple import GaloisFieldSimple
+from .catalog_file import CatalogFile, export_catalog, import_catalog, CATALOG_PATH
+from .db import initialize_database, save_polynomials_to_db
+from .elements import format_polynomial, is_prime
+from .elements import enable_memo
+from .expression import compile_expression, ExpressionError
+from .find_irreducible_poly import (
+    iter_irreducible,
+    iter_primitive,
+    iter_resumable,
+    random_irreducible,
+    find_low_weight_irreducibles_batch,
+    low_weight_candidates,
+    check_polynomial,
+    sieve_irreducible_polynomials,
+    MAX_LOW_WEIGHT,
+)
+from .planner import Planner, load_cost_model, format_seconds
+
+DB_PATH = 'irreducible_polynomials.db'
+
+SEARCH_MODES = ('lex', 'primitive', 'random', 'low-weight')
+SEARCH_BATCH = 1000  # Сколько кандидатов малого веса или случайных многочленов запрашивается за раз
+SAVE_BATCH = 1000  # Сколько найденных многочленов копится перед записью в базу данных
+EXPR_CHUNK = 4096  # Сколько наборов значений переменных выражения вычисляется за один векторизованный проход
+
+EXTENSION_OPS = ('add', 'sub', 'mul', 'div', 'inv', 'eval')
+POLYNOMIAL_OPS = ('add', 'sub', 'mul', 'divmod', 'factor', 'eval')
+SCALAR_OPS = ('add', 'sub', 'mul', 'div', 'inv')
+
+
+class CliError(Exception):
+    """Ошибка в аргументах команды или во входной записи."""
+
+
+class Throughput:
+    """Счётчик обработанных записей и ошибок с выводом пропускной способности в stderr."""
+    def __init__(self, label, fmt='text', interval=None, stream=None):
+        """
+        :param label: Что считается (например, "Многочленов" или "Записей").
+        :param fmt: Формат статистики: 'text', 'json' или 'none'.
+        :param interval: Раз в сколько секунд выводить промежуточную статистику (None - только итоговую).
+        :param stream: Куда выводить статистику (по умолчанию sys.stderr).
+        """
+        self.label = label
+        self.fmt = fmt
+        self.interval = interval
+        self.stream = stream
+        self.count = 0
+        self.errors = 0
+        self.start = perf_counter()
+        self._last_report = self.start
+
+    def add(self, error=False):
+        self.count += 1
+        if error:
+            self.errors += 1
+        if self.interval is not None and perf_counter() - self._last_report >= self.interval:
+            self.report()
+
+    def stats(self):
+        elapsed = perf_counter() - self.start
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'seconds': round(elapsed, 3),
+            'per_second': round(self.count / elapsed, 1) if elapsed > 0 else None,
+        }
+
+    def report(self, final=False):
+        self._last_report = perf_counter()
+        if self.fmt == 'none':
+            return
+
+        stats = self.stats()
+        if self.fmt == 'json':
+            line = json.dumps(dict(stats, final=final))
+        else:
+            rate = f"{stats['per_second']:.1f}" if stats['per_second'] is not None else "-"
+            line = (f"{'Готово. ' if final else ''}{self.label}: {stats['count']} за {stats['seconds']:.2f} с "
+                    f"({rate} в секунду), ошибок: {stats['errors']}")
+        print(line, file=self.stream or sys.stderr, flush=True)
+
+
+def parse_coeffs(value):
+    """
+    Коэффициенты (от старшей степени к младшей) из списка JSON или строки "1, 0, 1" / "1 0 1".
+
+    :raise CliError: Если значение не удаётся разобрать.
+    """
+    if isinstance(value, list):
+        try:
+            return [int(c) for c in value]
+        except (TypeError, ValueError):
+            raise CliError(f"Некорректные коэффициенты: {value}")
+
+    if isinstance(value, int):
+        return [value]
+
+    parts = [part for part in re.split(r'[\s,;]+', str(value).strip()) if part]
+    if not parts:
+        raise CliError("Пустой список коэффициентов")
+    try:
+        return [int(part) for part in parts]
+    except ValueError:
+        raise CliError(f"Некорректные коэффициенты: '{value}'")
+
+
+def _parse_int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise CliError(f"Поле '{name}' должно быть целым числом, получено: {value!r}")
+
+
+def _is_scalar(value):
+    """Операнд задан одним числом (элемент GF(p)), а не списком коэффициентов."""
+    if isinstance(value, int):
+        return True
+    return isinstance(value, str) and re.fullmatch(r'\s*-?\d+\s*', value) is not None
+
+
+def _coeffs_string(coeffs):
+    return ",".join(map(str, coeffs))
+
+
+def _format_coeffs(coeffs):
+    """Запись многочлена с коэффициентами coeffs (от старшей степени к младшей)."""
+    return format_polynomial(np.poly1d(coeffs))
+
+
+@contextmanager
+def _open(path, mode='r'):
+    """Открывает файл или, если путь "-", отдаёт stdin/stdout (не закрывая их)."""
+    if path == '-':
+        stream = sys.stdin if mode == 'r' else sys.stdout
+        yield stream
+        if mode != 'r':
+            stream.flush()
+        return
+    with open(path, mode, encoding='utf-8', newline='') as f:
+        yield f
+
+
+def _input_format(args):
+    if args.format != 'auto':
+        return args.format
+    return 'csv' if args.input.endswith('.csv') else 'jsonl'
+
+
+def _read_records(stream, fmt):
+    """Построчно читает записи (словари) из JSON Lines или CSV."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {'_error': f"Строка {line_number}: некорректный JSON ({e.msg})"}
+            continue
+        yield record if isinstance(record, dict) else {'_error': f"Строка {line_number}: ожидался объект JSON"}
+
+
+class _RecordWriter:
+    """Пишет записи построчно в JSON Lines или CSV (заголовок CSV - по первой записи)."""
+    def __init__(self, stream, fmt, fieldnames=None):
+        self.stream = stream
+        self.fmt = fmt
+        self.fieldnames = fieldnames
+        self._writer = None
+
+    def write(self, record):
+        if self.fmt == 'jsonl':
+            self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+            return
+
+        if self._writer is None:
+            self._writer = csv.DictWriter(self.stream, self.fieldnames or list(record), extrasaction='ignore')
+            self._writer.writeheader()
+        self._writer.writerow({key: _coeffs_string(value) if isinstance(value, list) else value
+                               for key, value in record.items()})
+
+
+@lru_cache(maxsize=128)
+def _extension_field(p, modulus):
+    return GaloisFieldExtension(p, list(modulus))
+
+
+def _field_prime(p):
+    if not is_prime(p):
+        raise CliError(f"Число {p} не является простым!")
+    return p
+
+
+def evaluate_record(record):
+    """
+    Выполняет операцию из записи и возвращает результат.
+
+    Поля записи: p - характеристика, modulus - коэффициенты модуля (для GF(p^n), иначе GF(p)), op - операция,
+    a и b - операнды. В GF(p^n) операнды - списки коэффициентов, операции: add, sub, mul, div, inv, eval
+    (значение многочлена a в точке b). В GF(p) операнды-числа - элементы поля (add, sub, mul, div, inv),
+    операнды-списки - многочлены над GF(p) (add, sub, mul, divmod, factor, eval с числом b).
+
+    :return: Словарь с результатом: result (число или коэффициенты от старшей степени к младшей)
+             и polynomial (запись многочлена); для divmod - ещё remainder, для factor - lead и factors.
+    :raise CliError: Если запись некорректна.
+    """
+    if '_error' in record:
+        raise CliError(record['_error'])
+
+    p = _field_prime(_parse_int(record.get('p'), 'p'))
+    op = str(record.get('op', '')).strip().lower()
+    a, b = record.get('a'), record.get('b')
+    if a is None or a == '':
+        raise CliError("Не задан операнд 'a'")
+    modulus = record.get('modulus')
+
+    if modulus not in (None, '', []):
+        if op not in EXTENSION_OPS:
+            raise CliError(f"Неизвестная операция в GF(p^n): '{op}' (допустимы: {', '.join(EXTENSION_OPS)})")
+        field = _extension_field(p, tuple(parse_coeffs(modulus)))
+        x = field.create_element(parse_coeffs(a))
+        if op == 'inv':
+            result = x.inverse()
+        else:
+            if b is None or b == '':
+                raise CliError(f"Для операции '{op}' нужен операнд 'b'")
+            y = field.create_element(parse_coeffs(b))
+            result = {'add': x.__add__, 'sub': x.__sub__, 'mul': x.__mul__, 'div': x.__truediv__,
+                      'eval': x.calculate_value}[op](y)
+        return {'result': [int(c) for c in result.poly.coeffs], 'polynomial': format_polynomial(result.poly)}
+
+    field = GaloisFieldSimple(p)
+    if _is_scalar(a) and (b is None or b == '' or _is_scalar(b)):
+        if op not in SCALAR_OPS:
+            raise CliError(f"Неизвестная операция в GF(p): '{op}' (допустимы: {', '.join(SCALAR_OPS)})")
+        x = field.create_element(_parse_int(a, 'a'))
+        if op != 'inv' and (b is None or b == ''):
+            raise CliError(f"Для операции '{op}' нужен операнд 'b'")
+        if (op == 'inv' and x.value == 0) or (op == 'div' and _parse_int(b, 'b') % p == 0):
+            raise CliError("Деление на ноль")
+        if op == 'inv':
+            result = x.inverse()
+        else:
+            y = field.create_element(_parse_int(b, 'b'))
+            result = {'add': x.__add__, 'sub': x.__sub__, 'mul': x.__mul__, 'div': x.__truediv__}[op](y)
+        return {'result': int(result.value), 'polynomial': str(result.value)}
+
+    if op not in POLYNOMIAL_OPS:
+        raise CliError(f"Неизвестная операция с многочленами над GF(p): '{op}' "
+                       f"(допустимы: {', '.join(POLYNOMIAL_OPS)})")
+    f = field.create_polynom(parse_coeffs(a))
+    if op == 'factor':
+        lead, factors = f.factor()
+        return {
+            'result': [int(c) for c in f.poly.coeffs],
+            'polynomial': format_polynomial(f.poly),
+            'lead': int(lead),
+            'factors': [[[int(c) for c in g.poly.coeffs], multiplicity] for g, multiplicity in factors],
+        }
+    if b is None or b == '':
+        raise CliError(f"Для операции '{op}' нужен операнд 'b'")
+    if op == 'eval':
+        result = f.calculate_value(field.create_element(_parse_int(b, 'b')))
+        return {'result': int(result.value), 'polynomial': str(result.value)}
+
+    g = field.create_polynom(parse_coeffs(b))
+    if op == 'divmod':
+        if not any(g.poly.coeffs):
+            raise CliError("Деление на ноль")
+        quotient, remainder = f / g
+        return {'result': [int(c) for c in quotient.poly.coeffs], 'polynomial': format_polynomial(quotient.poly),
+                'remainder': [int(c) for c in remainder.poly.coeffs]}
+    result = {'add': f.__add__, 'sub': f.__sub__, 'mul': f.__mul__}[op](g)
+    return {'result': [int(c) for c in result.poly.coeffs], 'polynomial': format_polynomial(result.poly)}
+
+
+def run_arith(args):
+    if args.memo:
+        enable_memo()
+
+    fmt = _input_format(args)
+    out_fmt = fmt if args.output_format == 'auto' else args.output_format
+    throughput = Throughput("Записей", args.stats, args.progress)
+
+    with _open(args.input) as source, _open(args.output, 'w') as target:
+        records = _read_records(source, fmt)
+        fieldnames = None
+        if out_fmt == 'csv':
+            fieldnames = ['id', 'p', 'modulus', 'op', 'a', 'b', 'result', 'polynomial', 'remainder', 'error']
+        writer = _RecordWriter(target, out_fmt, fieldnames)
+
+        for number, record in enumerate(records, 1):
+            output = {'id': record.get('id', number)}
+            try:
+                output.update(evaluate_record(record))
+            except (CliError, ValueError, ArithmeticError) as e:
+                output['error'] = str(e)
+            if out_fmt == 'csv':
+                output.update({key: record.get(key) for key in ('p', 'modulus', 'op', 'a', 'b')})
+            writer.write(output)
+            throughput.add(error='error' in output)
+
+            if args.fail_fast and 'error' in output:
+                break
+
+    throughput.report(final=True)
+    return 1 if throughput.errors else 0
+
+
+def _verify_record(record, default_p, check_primitive, catalog_path, order_factors):
+    if '_error' in record:
+        raise CliError(record['_error'])
+
+    p = _field_prime(_parse_int(record.get('p', default_p), 'p'))
+    coeffs = [c % p for c in parse_coeffs(record.get('coeffs'))]
+    while len(coeffs) > 1 and coeffs[0] == 0:
+        coeffs.pop(0)
+
+    irreducible, primitive = check_polynomial(p, coeffs, check_primitive, catalog_path, order_factors)
+    result = {'p': p, 'coeffs': coeffs, 'polynomial': _format_coeffs(coeffs), 'irreducible': irreducible}
+    if check_primitive:
+        result['primitive'] = primitive
+
+    return result
+
+
+def _verify_records(source, fmt, default_p):
+    if fmt != 'text':
+        yield from _read_records(source, fmt)
+        return
+
+    for line in source:
+        if line.strip():
+            yield {'p': default_p, 'coeffs': line.strip()}
+
+
+def run_verify(args):
+    if args.format == 'text' and args.p is None:
+        raise CliError("Для текстового ввода нужно указать характеристику: --p P")
+
+    fmt = _input_format(args)
+    out_fmt = args.output_format if args.output_format != 'auto' else ('jsonl' if fmt == 'text' else fmt)
+    catalog_path = None if args.no_catalog else args.catalog
+    order_factors = {}
+    throughput = Throughput("Многочленов", args.stats, args.progress)
+
+    fieldnames = ['p', 'coeffs', 'polynomial', 'irreducible'] + (['primitive'] if args.primitive else []) + ['error']
+    with _open(args.input) as source, _open(args.output, 'w') as target:
+        writer = _RecordWriter(target, out_fmt, fieldnames)
+        for record in _verify_records(source, fmt, args.p):
+            try:
+                output = _verify_record(record, args.p, args.primitive, catalog_path, order_factors)
+            except (CliError, ValueError) as e:
+                output = {'coeffs': record.get('coeffs'), 'error': str(e)}
+            writer.write(output)
+            throughput.add(error='error' in output)
+
+    throughput.report(final=True)
+    return 1 if throughput.errors else 0
+
+
+def iter_search(p, n, mode, start=0, count=None, seed=None, resumable=False, db_path=DB_PATH):
+    """
+    Генератор найденных многочленов (коэффициенты от старшей степени к младшей) в выбранном режиме поиска.
+
+    :param mode: 'lex' - перебор по порядку, 'primitive' - примитивные многочлены, 'random' - случайный поиск,
+                 'low-weight' - многочлены малого веса.
+    :param start: Номер первого кандидата (для перебора по порядку и многочленов малого веса).
+    :param count: Сколько многочленов нужно (для случайного поиска - чтобы не искать лишнего).
+    :param seed: Начальное значение для случайного поиска.
+    :param resumable: Сохранять ход перебора в базе данных и продолжать с сохранённого места.
+    """
+    if mode in ('lex', 'primitive'):
+        if resumable:
+            yield from iter_resumable(p, n, start, mode, db_path=db_path)
+        elif mode == 'lex':
+            yield from iter_irreducible(p, n, start)
+        else:
+            yield from iter_primitive(p, n, start, db_path=db_path)
+        return
+
+    if mode == 'low-weight':
+        for offset in count_from(start, SEARCH_BATCH):
+            found = find_low_weight_irreducibles_batch(p, n, SEARCH_BATCH, offset)
+            yield from found
+            # Кандидатов малого веса конечное число: пустое окно после последнего кандидата означает конец
+            if not found and next(islice(low_weight_candidates(p, n), offset + SEARCH_BATCH, None), None) is None:
+                return
+        return
+
+    # Случайный поиск: порции различных многочленов с разными seed, повторы между порциями отбрасываются
+    seen = set()
+    for batch in count_from():
+        size = SEARCH_BATCH if count is None else min(SEARCH_BATCH, count - len(seen))
+        if size <= 0:
+            return
+        found = random_irreducible(p, n, count=size, seed=None if seed is None else seed + batch)
+        new = [coeffs for coeffs in found if tuple(coeffs) not in seen]
+        if not new:
+            return
+        seen.update(tuple(coeffs) for coeffs in new)
+        yield from new
+
+
+def iter_sieved(p, n, db_path=DB_PATH, use_db=False):
+    """
+    Все неприводимые многочлены степени n в порядке номеров кандидатов (как iter_irreducible), найденные решетом.
+
+    Многочлен со старшим коэффициентом c неприводим тогда и только тогда, когда неприводим унитарный
+    многочлен, полученный делением на c, поэтому для каждого c достаточно умножить унитарные многочлены
+    на c и упорядочить по коэффициентам.
+    """
+    monic = sieve_irreducible_polynomials(p, n, db_path=db_path, use_db=use_db)
+    yield from monic
+    for leading in range(2, p):
+        yield from sorted([c * leading % p for c in coeffs] for coeffs in monic)
+
+
+def _search_plan(args, p, n):
+    """
+    План поиска (см. Planner.plan_search) для аргументов команды search; без --count - поиск всех.
+    В режиме low-weight план считает проверяемых кандидатов: неприводим примерно каждый n-й.
+    """
+    planner = Planner(time_budget=args.budget, memory_budget=None)
+    if args.mode == 'low-weight':
+        # Кандидатов веса w не больше C(n - 1, w - 2) * (p - 1)^(w - 1)
+        candidates = sum(math.comb(n - 1, weight - 2) * (p - 1) ** (weight - 1)
+                         for weight in range(2, MAX_LOW_WEIGHT + 1))
+        if args.count is not None:
+            candidates = min(candidates, args.count * n)
+        return planner.plan_search(p, n, 'low-weight', candidates)
+    if args.count is not None:
+        return planner.plan_search(p, n, args.mode, args.count)
+    return planner.plan_search(p, n, 'all')
+
+
+def run_search(args):
+    p, n = _field_prime(args.p), args.n
+    if n < 1:
+        raise CliError("Степень многочлена должна быть не меньше 1.")
+    if args.mode == 'random' and args.count is None:
+        raise CliError("Для случайного поиска нужно указать --count")
+
+    # Оценка по модели стоимости (с --estimate и --budget постоянные замеряются на этой машине один раз
+    # и хранятся в базе данных, иначе используются постоянные по умолчанию)
+    if args.estimate or args.budget is not None:
+        load_cost_model(args.db)
+    plan = _search_plan(args, p, n)
+    if args.estimate:
+        print(f"Оценка: {plan.describe()}", file=sys.stderr)
+        return 0
+    if args.budget is not None:
+        if not plan.admitted:
+            raise CliError(f"Поиск отклонён: {plan.reason}")
+        if plan.downgraded:
+            # Случайная выборка заменяет только перебор всех неприводимых: примитивность она не проверяет
+            if plan.algorithm == 'random' and args.mode not in ('lex', 'random'):
+                raise CliError(f"Поиск отклонён: перебор всех кандидатов займёт ~"
+                               f"{format_seconds(min(plan.alternatives.values()))}, это больше бюджета")
+            print(f"Поиск урезан: {plan.reason}", file=sys.stderr)
+            if plan.algorithm == 'random':
+                args.mode = 'random'
+            args.count = max(plan.count // n, 1) if args.mode == 'low-weight' else plan.count
+    # Все неприводимые многочлены по порядку решето находит быстрее перебора, если кандидаты помещаются в память
+    sieve = (plan.algorithm == 'sieve' and args.mode == 'lex' and args.count is None and args.start == 0
+             and not args.resumable)
+
+    throughput = Throughput("Многочленов", args.stats, args.progress)
+    if args.save or args.resumable:
+        initialize_database(args.db)
+
+    pending = []
+
+    def save_pending():
+        save_polynomials_to_db(pending, p, n, datetime.now(), db_path=args.db,
+                               primitive=True if args.mode == 'primitive' else None)
+        pending.clear()
+
+    with _open(args.output, 'w') as target:
+        writer = None if args.output_format == 'text' else _RecordWriter(target, args.output_format,
+                                                                         ['p', 'n', 'coeffs', 'polynomial'])
+        if sieve:
+            found = iter_sieved(p, n, args.db, use_db=args.save)
+        else:
+            found = iter_search(p, n, args.mode, args.start, args.count, args.seed, args.resumable, args.db)
+        with closing(found):
+            for coeffs in found:
+                coeffs = [int(c) for c in coeffs]
+                if writer is None:
+                    target.write(_coeffs_string(coeffs) + '\n')
+                else:
+                    writer.write({'p': p, 'n': n, 'coeffs': coeffs, 'polynomial': _format_coeffs(coeffs)})
+
+                if args.save:
+                    pending.append(coeffs)
+                    if len(pending) >= SAVE_BATCH:
+                        save_pending()
+                throughput.add()
+                if args.count is not None and throughput.count >= args.count:
+                    break
+        if pending:
+            save_pending()
+
+    throughput.report(final=True)
+    return 0
+
+
+def _parse_range(value):
+    """Диапазон целых из строки "2,3,5" или "2-7" (None - без ограничения)."""
+    if value is None:
+        return None
+    numbers = set()
+    for part in value.split(','):
+        part = part.strip()
+        if '-' in part:
+            low, high = part.split('-', 1)
+            numbers.update(range(int(low), int(high) + 1))
+        elif part:
+            numbers.add(int(part))
+    return numbers
+
+
+def run_catalog(args):
+    start = perf_counter()
+    if args.action == 'export':
+        total = export_catalog(args.path, _parse_range(args.p), _parse_range(args.n), db_path=args.db)
+        action = "Выгружено"
+    elif args.action == 'import':
+        total = import_catalog(args.path, db_path=args.db)
+        action = "Загружено"
+    else:
+        with CatalogFile(args.path) as catalog:
+            for p, n, count, complete in sorted(catalog.sections()):
+                print(f"GF({p}), степень {n}: {count} многочленов{' (все)' if complete else ''}")
+        return 0
+
+    elapsed = perf_counter() - start
+    if args.stats == 'json':
+        print(json.dumps({'count': total, 'seconds': round(elapsed, 3)}), file=sys.stderr)
+    elif args.stats == 'text':
+        print(f"{action} многочленов: {total} за {elapsed:.2f} с", file=sys.stderr)
+    return 0
+
+
+def _expr_bindings(record, variables, scalar):
+    """Значения переменных выражения из записи: числа для GF(p), списки коэффициентов для GF(p^n)."""
+    if '_error' in record:
+        raise CliError(record['_error'])
+
+    values = []
+    for name in variables:
+        value = record.get(name)
+        if value is None or value == '':
+            raise CliError(f"Не задано значение переменной '{name}'")
+        if scalar:
+            if not _is_scalar(value):
+                raise CliError(f"Значение переменной '{name}' должно быть числом: {value!r}")
+            values.append(_parse_int(value, name))
+        else:
+            values.append(parse_coeffs(value))
+    return values
+
+
+def run_expr(args):
+    p = _field_prime(args.p)
+    field = _extension_field(p, tuple(parse_coeffs(args.modulus))) if args.modulus else GaloisFieldSimple(p)
+    try:
+        expression = compile_expression(args.expression, field)
+    except ExpressionError as e:
+        raise CliError(f"Некорректное выражение '{args.expression}': {e}")
+    variables = expression.variables
+    if args.plan:
+        print(expression.describe(), file=sys.stderr)
+
+    fmt = _input_format(args)
+    out_fmt = fmt if args.output_format == 'auto' else args.output_format
+    throughput = Throughput("Записей", args.stats, args.progress)
+
+    with _open(args.output, 'w') as target:
+        writer = _RecordWriter(target, out_fmt, ['id', 'result', 'polynomial', 'error'])
+
+        def flush(chunk):
+            # Корректные записи вычисляются одним векторизованным проходом, ошибочные выводятся на своих местах
+            valid = [values for _, values in chunk if not isinstance(values, str)]
+            columns = {name: [values[k] for values in valid] for k, name in enumerate(variables)}
+            results = iter(expression.evaluate_batch(columns) if valid else [])
+            for record_id, values in chunk:
+                result = values if isinstance(values, str) else next(results)
+                if isinstance(result, str):
+                    writer.write({'id': record_id, 'error': result})
+                else:
+                    writer.write({'id': record_id, 'result': result[0], 'polynomial': result[1]})
+                throughput.add(error=isinstance(result, str))
+
+        if not variables:
+            flush([(1, [])])
+        else:
+            with _open(args.input) as source:
+                chunk = []
+                for number, record in enumerate(_read_records(source, fmt), 1):
+                    try:
+                        values = _expr_bindings(record, variables, args.modulus is None)
+                    except CliError as e:
+                        values = str(e)
+                    chunk.append((record.get('id', number), values))
+                    if len(chunk) >= EXPR_CHUNK:
+                        flush(chunk)
+                        chunk = []
+                flush(chunk)
+
+    throughput.report(final=True)
+    return 1 if throughput.errors else 0
+
+
+def run_serve(args):
+    from .service import run_service
+
+    run_service(args.host, args.port, batch_delay=args.batch_delay / 1000, max_batch=args.max_batch,
+                max_pending=args.max_pending)
+    return 0
+
+
+def _add_common(parser, with_input=True):
+    if with_input:
+        parser.add_argument('-i', '--input', default='-', help="Входной файл (по умолчанию stdin)")
+        parser.add_argument('--format', choices=('auto', 'jsonl', 'csv'), default='auto',
+                            help="Формат ввода (по умолчанию - по расширению файла, иначе JSON Lines)")
+    parser.add_argument('-o', '--output', default='-', help="Выходной файл (по умолчанию stdout)")
+    parser.add_argument('--stats', choices=('text', 'json', 'none'), default='text',
+                        help="Формат статистики пропускной способности в stderr")
+    parser.add_argument('--progress', type=float, default=None, metavar='SECONDS',
+                        help="Выводить промежуточную статистику раз в SECONDS секунд")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m core', description="Пакетные вычисления в полях Галуа GF(p^n)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    search = commands.add_parser('search', help="Поиск неприводимых многочленов")
+    search.add_argument('p', type=int, help="Характеристика поля")
+    search.add_argument('n', type=int, help="Степень многочленов")
+    search.add_argument('--mode', choices=SEARCH_MODES, default='lex', help="Режим поиска")
+    search.add_argument('-c', '--count', type=int, default=None, help="Сколько многочленов найти (по умолчанию все)")
+    search.add_argument('--start', type=int, default=0, help="Номер первого кандидата")
+    search.add_argument('--seed', type=int, default=None, help="Начальное значение для случайного поиска")
+    search.add_argument('--save', action='store_true', help="Сохранять найденные многочлены в базу данных")
+    search.add_argument('--resumable', action='store_true',
+                        help="Сохранять ход перебора в базе и продолжать с сохранённого места (lex, primitive)")
+    search.add_argument('--db', default=DB_PATH, help="Путь к базе данных")
+    search.add_argument('--budget', type=float, default=None, metavar='SECONDS',
+                        help="Бюджет времени: поиск с большей оценкой урезается или отклоняется до запуска")
+    search.add_argument('--estimate', action='store_true',
+                        help="Только вывести оценку времени и памяти и выбранный алгоритм в stderr")
+    search.add_argument('--output-format', choices=('text', 'jsonl', 'csv'), default='text', help="Формат вывода")
+    _add_common(search, with_input=False)
+    search.set_defaults(handler=run_search)
+
+    verify = commands.add_parser('verify', help="Проверка многочленов на неприводимость и примитивность")
+    verify.add_argument('-i', '--input', default='-', help="Входной файл (по умолчанию stdin)")
+    verify.add_argument('--format', choices=('auto', 'text', 'jsonl', 'csv'), default='auto',
+                        help="Формат ввода: text - коэффициенты по строке (нужен --p), jsonl или csv с полями p, coeffs")
+    verify.add_argument('--p', type=int, default=None, help="Характеристика по умолчанию")
+    verify.add_argument('--primitive', action='store_true', help="Проверять и примитивность")
+    verify.add_argument('--catalog', default=CATALOG_PATH, help="Файл каталога для быстрой проверки")
+    verify.add_argument('--no-catalog', action='store_true', help="Не использовать каталог")
+    verify.add_argument('--output-format', choices=('auto', 'jsonl', 'csv'), default='auto', help="Формат вывода")
+    _add_common(verify, with_input=False)
+    verify.set_defaults(handler=run_verify)
+
+    arith = commands.add_parser('arith', help="Арифметика в полях по записям из JSON Lines или CSV")
+    arith.add_argument('--output-format', choices=('auto', 'jsonl', 'csv'), default='auto', help="Формат вывода")
+    arith.add_argument('--memo', action='store_true', help="Кэшировать результаты повторяющихся операций")
+    arith.add_argument('--fail-fast', action='store_true', help="Остановиться на первой ошибочной записи")
+    _add_common(arith)
+    arith.set_defaults(handler=run_arith)
+
+    catalog = commands.add_parser('catalog', help="Файл каталога неприводимых многочленов")
+    catalog.add_argument('action', choices=('export', 'import', 'list'),
+                         help="export - база в каталог, import - каталог в базу, list - разделы каталога")
+    catalog.add_argument('--path', default=CATALOG_PATH, help="Путь к файлу каталога")
+    catalog.add_argument('--db', default=DB_PATH, help="Путь к базе данных")
+    catalog.add_argument('--p', default=None, help="Характеристики для выгрузки, например 2,3 или 2-7")
+    catalog.add_argument('--n', default=None, help="Степени для выгрузки, например 1-16")
+    catalog.add_argument('--stats', choices=('text', 'json', 'none'), default='text',
+                         help="Формат статистики в stderr")
+    catalog.set_defaults(handler=run_catalog)
+
+    expr = commands.add_parser('expr', help="Значения выражения над полем для наборов значений переменных")
+    expr.add_argument('expression', help="Выражение, например \"(a*b + c)/(a - d)^3\"")
+    expr.add_argument('--p', type=int, required=True, help="Характеристика поля")
+    expr.add_argument('--modulus', default=None, help="Коэффициенты модуля GF(p^n), например 1,0,0,0,1,1,0,1,1")
+    expr.add_argument('--plan', action='store_true', help="Вывести план вычисления в stderr")
+    expr.add_argument('--output-format', choices=('auto', 'jsonl', 'csv'), default='auto', help="Формат вывода")
+    _add_common(expr)
+    expr.set_defaults(handler=run_expr)
+
+    serve = commands.add_parser('serve', help="Локальный HTTP/JSON-сервис арифметики в полях")
+    serve.add_argument('--host', default='127.0.0.1', help="Адрес (по умолчанию только локальные соединения)")
+    serve.add_argument('--port', type=int, default=8765, help="Порт")
+    serve.add_argument('--batch-delay', type=float, default=2.0, metavar='MS',
+                       help="Сколько миллисекунд набирать порцию одновременных запросов к одному полю")
+    serve.add_argument('--max-batch', type=int, default=512, help="Наибольший размер порции")
+    serve.add_argument('--max-pending', type=int, default=1024,
+                       help="Сколько запросов выполнять одновременно; остальные получают ответ 503")
+    serve.set_defaults(handler=run_serve)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Точка входа командной строки.
+
+    :return: Код выхода: 0 - успех, 1 - были ошибочные записи, 2 - ошибка в аргументах.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except CliError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        # Вывод передан в программу, которая закрыла его раньше (например, head): остаток вывода отбрасывается
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (OSError, ValueError) as e:
+        # Недоступные файлы и некорректный файл каталога
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        return 130
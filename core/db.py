@@ -1,55 +1,345 @@
+import os
+import atexit
 import sqlite3
+import threading
+from contextlib import contextmanager
+
+from .elements.timing import instrumented
+
+# Настройки каждого соединения: журнал WAL позволяет читать базу одновременно с записью из других процессов
+# (сессии приложения, воркеры поиска), а synchronous=NORMAL в режиме WAL сохраняет целостность базы
+# при гораздо более быстрой записи
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 30000",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+)
+
+# Число подготовленных запросов, которые соединение держит в кэше и переиспользует
+STATEMENT_CACHE_SIZE = 256
+
+_connections = {}
+_connections_lock = threading.Lock()
+_initialized = set()
+
+
+def get_connection(db_path='irreducible_polynomials.db'):
+    """
+    Возвращает общее для процесса соединение с базой данных и блокировку, под которой с ним можно работать.
+
+    Соединение создаётся один раз на процесс (после fork дочерний процесс открывает своё)
+    и переиспользуется всеми потоками, поэтому подготовленные запросы берутся из его кэша.
+    """
+    key = (os.getpid(), os.path.abspath(db_path))
+
+    with _connections_lock:
+        entry = _connections.get(key)
+        if entry is None:
+            conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+            for pragma in SQLITE_PRAGMAS:
+                conn.execute(pragma)
+            entry = _connections[key] = (conn, threading.RLock())
+
+    return entry
+
+
+@contextmanager
+def _connection(db_path, write=False):
+    """
+    Даёт курсор общего соединения в монопольное пользование потока.
+
+    При write=True всё, что сделано внутри блока, выполняется одной транзакцией: она сразу захватывает
+    блокировку записи (BEGIN IMMEDIATE) и откатывается, если в блоке возникло исключение.
+    """
+    conn, lock = get_connection(db_path)
+    with lock:
+        cursor = conn.cursor()
+        try:
+            if not write:
+                yield cursor
+                return
+
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+        finally:
+            cursor.close()
+
+
+def close_connections(db_path=None):
+    """Закрывает соединения этого процесса (со всеми базами или только с db_path)."""
+    with _connections_lock:
+        for key in list(_connections):
+            pid, path = key
+            if pid == os.getpid() and (db_path is None or path == os.path.abspath(db_path)):
+                conn, lock = _connections.pop(key)
+                with lock:
+                    conn.close()
+                _initialized.discard(path)
+
+
+def _acquire_connections_before_fork():
+    # fork не должен прийтись на середину транзакции: иначе дочерний процесс унаследует
+    # внутреннее состояние блокировок SQLite и не сможет работать с той же базой
+    _connections_lock.acquire()
+    for _, lock in _connections.values():
+        lock.acquire()
+
+
+def _release_connections_after_fork_in_parent():
+    for _, lock in _connections.values():
+        lock.release()
+    _connections_lock.release()
+
+
+def _forget_connections_after_fork_in_child():
+    # Соединения SQLite нельзя использовать в дочернем процессе: он откроет свои. Унаследованные соединения
+    # не закрываются (это затронуло бы родителя), а только откладываются
+    global _connections_lock
+    _inherited_connections.extend(_connections.values())
+    _connections.clear()
+    _initialized.clear()
+    _connections_lock = threading.Lock()
+
+
+_inherited_connections = []
+atexit.register(close_connections)
+os.register_at_fork(before=_acquire_connections_before_fork,
+                    after_in_parent=_release_connections_after_fork_in_parent,
+                    after_in_child=_forget_connections_after_fork_in_child)
 
 
 def initialize_database(db_path='irreducible_polynomials.db'):
     """
     Создает базу данных и таблицу, если они не существуют.
+
+    В каждом процессе схема проверяется один раз на базу.
+    """
+    if os.path.abspath(db_path) in _initialized:
+        if os.path.exists(db_path):
+            return
+        # Файл базы удалён: соединение с ним больше не годится
+        close_connections(db_path)
+
+    with _connection(db_path, write=True) as cursor:
+        _create_schema(cursor)
+
+    _initialized.add(os.path.abspath(db_path))
+
+
+# Каталог хранит коэффициенты упакованными: многочлен записывается своим номером среди кандидатов
+# (как в find_irreducible_polynomials_batch) - целым big-endian числом фиксированной для (p, n) ширины.
+# Сравнение таких записей совпадает с лексикографическим сравнением коэффициентов от старшей степени,
+# а таблица без rowid хранится упорядоченной по (p, n, code), поэтому выборка в порядке коэффициентов -
+# это последовательное чтение по первичному ключу
+CATALOG_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS irreducible_polynomials (
+        p INTEGER NOT NULL,
+        n INTEGER NOT NULL,
+        code BLOB NOT NULL,
+        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+        is_primitive INTEGER,
+        PRIMARY KEY(p, n, code)
+    ) WITHOUT ROWID
+'''
+
+# Сколько строк каталога читается за один запрос при постраничной выборке
+SAVED_PAGE_SIZE = 1000
+
+
+def _code_width(p, n):
+    """Ширина (в байтах) упакованной записи многочлена степени n над GF(p)."""
+    return max(1, (((p - 1) * p ** n - 1).bit_length() + 7) // 8)
+
+
+def pack_coefficients(coeffs, p):
+    """
+    Упаковывает коэффициенты многочлена (от старшей степени к младшей) в его номер среди кандидатов
+    той же степени - число фиксированной ширины в байтах (big-endian).
     """
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
+    coeffs = [int(c) for c in coeffs]
+    n = len(coeffs) - 1
+    if not 0 < coeffs[0] < p or any(not 0 <= c < p for c in coeffs):
+        raise ValueError(f"Коэффициенты {coeffs} не задают многочлен степени {n} над GF({p})")
+
+    rest = 0
+    for c in coeffs[1:]:
+        rest = rest * p + c
+
+    return ((coeffs[0] - 1) * p ** n + rest).to_bytes(_code_width(p, n), 'big')
+
+
+def unpack_coefficients(code, p, n):
+    """Восстанавливает коэффициенты многочлена (от старшей степени к младшей) по упакованной записи."""
+    leading_coeff, rest = divmod(int.from_bytes(code, 'big'), p ** n)
+
+    if p == 2:
+        return [leading_coeff + 1] + [int(bit) for bit in format(rest, f'0{n}b')] if n else [leading_coeff + 1]
+
+    digits = []
+    for _ in range(n):
+        rest, c = divmod(rest, p)
+        digits.append(c)
+
+    return [leading_coeff + 1] + digits[::-1]
+
+
+def _migrate_text_coefficients(cursor, columns):
+    """
+    Переводит каталог из прежнего формата (коэффициенты строкой "1, 0, 1, 1") в упакованный.
+    Строки, которые не удаётся разобрать, пропускаются с сообщением.
+    """
+    cursor.execute("DROP INDEX IF EXISTS idx_irreducible_p_n")
+    cursor.execute("DROP INDEX IF EXISTS idx_irreducible_p_n_timestamp")
+    cursor.execute("ALTER TABLE irreducible_polynomials RENAME TO irreducible_polynomials_text")
+    cursor.execute(CATALOG_TABLE_SQL)
+
+    primitive = "is_primitive" if "is_primitive" in columns else "NULL"
+    rows = cursor.connection.cursor()
+    rows.execute(f"SELECT p, n, coefficients, timestamp, {primitive} FROM irreducible_polynomials_text")
+
+    while True:
+        batch = rows.fetchmany(SAVED_PAGE_SIZE)
+        if not batch:
+            break
+
+        packed = []
+        for p, n, coeffs_str, timestamp, is_primitive in batch:
+            try:
+                packed.append((p, n, pack_coefficients(coeffs_str.split(','), p), timestamp, is_primitive))
+            except ValueError as e:
+                print(f"Ошибка при переносе многочлена {coeffs_str} (p={p}, n={n}): {e}")
+
+        cursor.executemany('''
+            INSERT OR IGNORE INTO irreducible_polynomials (p, n, code, timestamp, is_primitive)
+            VALUES (?, ?, ?, ?, ?)
+        ''', packed)
+
+    rows.close()
+    cursor.execute("DROP TABLE irreducible_polynomials_text")
+
+
+def _create_schema(cursor):
+    cursor.execute(CATALOG_TABLE_SQL)
+    # Базы прежнего формата хранили коэффициенты строкой
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(irreducible_polynomials)")]
+    if 'coefficients' in columns:
+        _migrate_text_coefficients(cursor, columns)
     cursor.execute('''
-        CREATE TABLE IF NOT EXISTS irreducible_polynomials (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
+        CREATE TABLE IF NOT EXISTS complete_enumerations (
             p INTEGER NOT NULL,
             n INTEGER NOT NULL,
-            coefficients TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY(p, n)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS search_checkpoints (
+            p INTEGER NOT NULL,
+            n INTEGER NOT NULL,
+            mode TEXT NOT NULL,
+            scanned_to TEXT NOT NULL,
             timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-            UNIQUE(p, n, coefficients)
+            PRIMARY KEY(p, n, mode)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS search_hits (
+            p INTEGER NOT NULL,
+            n INTEGER NOT NULL,
+            mode TEXT NOT NULL,
+            idx TEXT NOT NULL,
+            coefficients TEXT NOT NULL,
+            PRIMARY KEY(p, n, mode, idx)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS fastest_moduli (
+            p INTEGER NOT NULL,
+            n INTEGER NOT NULL,
+            coefficients TEXT NOT NULL,
+            PRIMARY KEY(p, n)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS order_factorizations (
+            p INTEGER NOT NULL,
+            n INTEGER NOT NULL,
+            factors TEXT NOT NULL,
+            PRIMARY KEY(p, n)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cost_calibrations (
+            machine TEXT PRIMARY KEY,
+            constants TEXT NOT NULL,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    conn.commit()
-    conn.close()
+    # Покрывающий индекс для выборок по (p, n) в порядке сохранения; выборки в порядке коэффициентов
+    # идут по первичному ключу
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_irreducible_p_n_timestamp
+        ON irreducible_polynomials (p, n, timestamp, is_primitive)
+    ''')
 
 
-def save_polynomials_to_db(polynomials, p, n, time, db_path='irreducible_polynomials.db'):
+@instrumented('db.save')
+def save_polynomials_to_db(polynomials, p, n, time, db_path='irreducible_polynomials.db', primitive=None):
     """
     Сохраняет список многочленов в базу данных.
+
+    Если задан primitive, у сохраняемых (в том числе уже существующих) записей выставляется флаг примитивности.
+
+    :return: True, если многочлены сохранены, False - если при сохранении возникла ошибка.
     """
     if not polynomials:
-        return
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    try:
-        cursor.executemany('''
-            INSERT OR IGNORE INTO irreducible_polynomials (p, n, coefficients, timestamp)
+        return True
+
+    if primitive is None:
+        query = '''
+            INSERT OR IGNORE INTO irreducible_polynomials (p, n, code, timestamp)
             VALUES (?, ?, ?, ?)
-        ''', [(p, n, ", ".join(map(str, poly)), time.strftime('%Y-%m-%d %H:%M:%S')) for poly in polynomials])
-        conn.commit()
+        '''
+        rows = [(p, n, pack_coefficients(poly, p), time.strftime('%Y-%m-%d %H:%M:%S')) for poly in polynomials]
+    else:
+        query = '''
+            INSERT INTO irreducible_polynomials (p, n, code, timestamp, is_primitive)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(p, n, code) DO UPDATE SET is_primitive = excluded.is_primitive
+        '''
+        rows = [(p, n, pack_coefficients(poly, p), time.strftime('%Y-%m-%d %H:%M:%S'), int(primitive))
+                for poly in polynomials]
+
+    try:
+        with _connection(db_path, write=True) as cursor:
+            cursor.executemany(query, rows)
     except Exception as e:
         print(f"Ошибка при сохранении многочленов в базу данных: {e}")
-    finally:
-        conn.close()
+        return False
+    return True
 
 
-def get_saved_polynomials(p=None, n=None, db_path='irreducible_polynomials.db'):
+@instrumented('db.load')
+def get_saved_polynomials(p=None, n=None, db_path='irreducible_polynomials.db', primitive_only=False, since=None):
     """
     Извлекает сохраненные многочлены из базы данных с фильтрацией по p и n.
-    """
 
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    query = "SELECT p, n, coefficients, timestamp  FROM irreducible_polynomials WHERE 1=1"
+    При primitive_only=True возвращаются только многочлены, отмеченные как примитивные.
+    Если задан since (datetime), возвращаются только многочлены, сохранённые начиная с этого момента,
+    в порядке сохранения. Коэффициенты возвращаются строкой; для больших выборок удобнее
+    iter_saved_polynomials, которая не читает весь результат в память.
+    """
+    query = "SELECT p, n, code, timestamp  FROM irreducible_polynomials WHERE 1=1"
     params = []
     if p is not None:
         query += " AND p = ?"
@@ -57,8 +347,308 @@ def get_saved_polynomials(p=None, n=None, db_path='irreducible_polynomials.db'):
     if n is not None:
         query += " AND n = ?"
         params.append(n)
-    cursor.execute(query, params)
-    results = cursor.fetchall()
-    conn.close()
+    if primitive_only:
+        query += " AND is_primitive = 1"
+    if since is not None:
+        query += " AND timestamp >= ? ORDER BY timestamp"
+        params.append(since.strftime('%Y-%m-%d %H:%M:%S'))
+
+    with _connection(db_path) as cursor:
+        cursor.execute(query, params)
+        results = cursor.fetchall()
+
+    return [(p, n, ", ".join(map(str, unpack_coefficients(code, p, n))), timestamp)
+            for p, n, code, timestamp in results]
+
+
+@instrumented('db.count')
+def count_saved_polynomials(p, n, db_path='irreducible_polynomials.db', primitive_only=False):
+    """Возвращает число сохранённых многочленов степени n над GF(p)."""
+    query = "SELECT COUNT(*) FROM irreducible_polynomials WHERE p = ? AND n = ?"
+    if primitive_only:
+        query += " AND is_primitive = 1"
+
+    with _connection(db_path) as cursor:
+        cursor.execute(query, (p, n))
+        count = cursor.fetchone()[0]
+
+    return count
+
+
+@instrumented('db.page')
+def get_saved_polynomials_page(p, n, after=None, limit=SAVED_PAGE_SIZE, db_path='irreducible_polynomials.db',
+                               primitive_only=False, offset=0):
+    """
+    Возвращает страницу сохранённых многочленов степени n над GF(p) в порядке коэффициентов.
+
+    Страница начинается сразу после многочлена after (по умолчанию - с начала каталога): такая выборка
+    по ключу не зависит от номера страницы и стоит одного поиска по индексу.
+
+    :param after: Коэффициенты (от старшей степени к младшей) последнего многочлена предыдущей страницы.
+    :param limit: Размер страницы.
+    :param offset: Сколько многочленов после after пропустить (пропуск стоит O(offset), поэтому для
+                   последовательного чтения лучше передавать after).
+    :return: Список пар (коэффициенты от старшей степени к младшей, время сохранения).
+    """
+    query = "SELECT code, timestamp FROM irreducible_polynomials WHERE p = ? AND n = ? AND code > ?"
+    if primitive_only:
+        query += " AND is_primitive = 1"
+    query += " ORDER BY code LIMIT ? OFFSET ?"
+
+    with _connection(db_path) as cursor:
+        cursor.execute(query, (p, n, b'' if after is None else pack_coefficients(after, p), limit, offset))
+        rows = cursor.fetchall()
+
+    return [(unpack_coefficients(code, p, n), timestamp) for code, timestamp in rows]
+
+
+def iter_saved_polynomials(p, n, after=None, page_size=SAVED_PAGE_SIZE, db_path='irreducible_polynomials.db',
+                           primitive_only=False):
+    """
+    Лениво выдаёт сохранённые многочлены степени n над GF(p) в порядке коэффициентов, читая их страницами
+    (см. get_saved_polynomials_page). Соединение с базой не удерживается между страницами.
+
+    :return: Генератор пар (коэффициенты от старшей степени к младшей, время сохранения).
+    """
+    while True:
+        page = get_saved_polynomials_page(p, n, after, page_size, db_path=db_path, primitive_only=primitive_only)
+        yield from page
+
+        if len(page) < page_size:
+            return
+        after = page[-1][0]
+
+
+def get_saved_degrees(db_path='irreducible_polynomials.db'):
+    """Возвращает отсортированный список пар (p, n), для которых в каталоге есть многочлены."""
+    with _connection(db_path) as cursor:
+        cursor.execute("SELECT DISTINCT p, n FROM irreducible_polynomials ORDER BY p, n")
+        results = cursor.fetchall()
 
     return results
+
+
+def iter_saved_codes(p, n, page_size=SAVED_PAGE_SIZE, db_path='irreducible_polynomials.db'):
+    """
+    Лениво выдаёт упакованные записи (см. pack_coefficients) сохранённых многочленов степени n над GF(p)
+    в порядке коэффициентов вместе с флагом примитивности (1, 0 или None, если неизвестно).
+    """
+    after = b''
+    while True:
+        with _connection(db_path) as cursor:
+            cursor.execute('''
+                SELECT code, is_primitive FROM irreducible_polynomials
+                WHERE p = ? AND n = ? AND code > ? ORDER BY code LIMIT ?
+            ''', (p, n, after, page_size))
+            page = cursor.fetchall()
+
+        yield from page
+
+        if len(page) < page_size:
+            return
+        after = page[-1][0]
+
+
+@instrumented('db.save_packed')
+def save_packed_polynomials(p, n, rows, time, db_path='irreducible_polynomials.db'):
+    """
+    Сохраняет в одной транзакции многочлены, заданные упакованными записями.
+
+    :param rows: Пары (упакованная запись, флаг примитивности или None).
+    """
+    try:
+        with _connection(db_path, write=True) as cursor:
+            cursor.executemany('''
+                INSERT INTO irreducible_polynomials (p, n, code, timestamp, is_primitive)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(p, n, code) DO UPDATE SET is_primitive = COALESCE(excluded.is_primitive, is_primitive)
+            ''', [(p, n, code, time.strftime('%Y-%m-%d %H:%M:%S'), primitive) for code, primitive in rows])
+    except Exception as e:
+        print(f"Ошибка при сохранении многочленов в базу данных: {e}")
+
+
+def mark_enumeration_complete(p, n, count, time, db_path='irreducible_polynomials.db'):
+    """
+    Отмечает, что в базе данных сохранены все унитарные неприводимые многочлены степени n над GF(p).
+    """
+    try:
+        with _connection(db_path, write=True) as cursor:
+            cursor.execute('''
+                INSERT OR REPLACE INTO complete_enumerations (p, n, count, timestamp)
+                VALUES (?, ?, ?, ?)
+            ''', (p, n, count, time.strftime('%Y-%m-%d %H:%M:%S')))
+    except Exception as e:
+        print(f"Ошибка при сохранении отметки о полном переборе: {e}")
+
+
+def is_enumeration_complete(p, n, db_path='irreducible_polynomials.db'):
+    """
+    Проверяет, сохранён ли в базе данных полный список унитарных неприводимых многочленов степени n над GF(p).
+    """
+    with _connection(db_path) as cursor:
+        cursor.execute("SELECT count FROM complete_enumerations WHERE p = ? AND n = ?", (p, n))
+        row = cursor.fetchone()
+
+    return row is not None
+
+
+def get_order_factorization(p, n, db_path='irreducible_polynomials.db'):
+    """
+    Возвращает сохранённое разложение p^n - 1 на простые множители в виде {q: кратность} или None.
+    """
+    with _connection(db_path) as cursor:
+        cursor.execute("SELECT factors FROM order_factorizations WHERE p = ? AND n = ?", (p, n))
+        row = cursor.fetchone()
+
+    if row is None:
+        return None
+
+    factors = {}
+    for item in filter(None, row[0].split(',')):
+        q, e = item.split('^')
+        factors[int(q)] = int(e)
+
+    return factors
+
+
+def save_order_factorization(p, n, factors, db_path='irreducible_polynomials.db'):
+    """
+    Сохраняет разложение p^n - 1 на простые множители, чтобы не вычислять его повторно.
+    """
+    try:
+        with _connection(db_path, write=True) as cursor:
+            cursor.execute('''
+                INSERT OR REPLACE INTO order_factorizations (p, n, factors)
+                VALUES (?, ?, ?)
+            ''', (p, n, ", ".join(f"{q}^{e}" for q, e in sorted(factors.items()))))
+    except Exception as e:
+        print(f"Ошибка при сохранении разложения в базу данных: {e}")
+
+
+def get_fastest_modulus(p, n, db_path='irreducible_polynomials.db'):
+    """
+    Возвращает сохранённый неприводимый многочлен степени n наименьшего веса (от старшей степени к младшей) или None.
+    """
+    with _connection(db_path) as cursor:
+        cursor.execute("SELECT coefficients FROM fastest_moduli WHERE p = ? AND n = ?", (p, n))
+        row = cursor.fetchone()
+
+    if row is None:
+        return None
+
+    return list(map(int, row[0].split(',')))
+
+
+def save_fastest_modulus(p, n, coeffs, db_path='irreducible_polynomials.db'):
+    """
+    Сохраняет неприводимый многочлен наименьшего веса для (p, n).
+    """
+    try:
+        with _connection(db_path, write=True) as cursor:
+            cursor.execute('''
+                INSERT OR REPLACE INTO fastest_moduli (p, n, coefficients)
+                VALUES (?, ?, ?)
+            ''', (p, n, ", ".join(map(str, coeffs))))
+    except Exception as e:
+        print(f"Ошибка при сохранении модуля в базу данных: {e}")
+
+
+def get_cost_calibration(machine, db_path='irreducible_polynomials.db'):
+    """
+    Возвращает сохранённые постоянные модели стоимости для машины в виде {название: значение} или None.
+    """
+    with _connection(db_path) as cursor:
+        cursor.execute("SELECT constants FROM cost_calibrations WHERE machine = ?", (machine,))
+        row = cursor.fetchone()
+
+    if row is None:
+        return None
+
+    constants = {}
+    for item in filter(None, row[0].split(',')):
+        name, value = item.split('=')
+        constants[name.strip()] = float(value)
+
+    return constants
+
+
+def save_cost_calibration(machine, constants, db_path='irreducible_polynomials.db'):
+    """
+    Сохраняет постоянные модели стоимости, замеренные на машине machine, чтобы не замерять их при каждом запуске.
+    """
+    try:
+        with _connection(db_path, write=True) as cursor:
+            cursor.execute('''
+                INSERT OR REPLACE INTO cost_calibrations (machine, constants, timestamp)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            ''', (machine, ", ".join(f"{name}={value!r}" for name, value in sorted(constants.items()))))
+    except Exception as e:
+        print(f"Ошибка при сохранении калибровки в базу данных: {e}")
+
+
+def _index_width(p, n):
+    """
+    Ширина записи номера кандидата для (p, n).
+
+    Номера могут не помещаться в INTEGER SQLite, поэтому хранятся строкой, дополненной нулями до общей ширины:
+    тогда сравнение строк совпадает со сравнением чисел.
+    """
+    return len(str((p - 1) * p ** n))
+
+
+def get_search_checkpoint(p, n, mode, db_path='irreducible_polynomials.db'):
+    """
+    Возвращает номер, до которого (не включительно) кандидаты для (p, n, mode) полностью проверены.
+    """
+    with _connection(db_path) as cursor:
+        cursor.execute("SELECT scanned_to FROM search_checkpoints WHERE p = ? AND n = ? AND mode = ?", (p, n, mode))
+        row = cursor.fetchone()
+
+    return int(row[0]) if row is not None else 0
+
+
+@instrumented('db.search_hits')
+def get_search_hits(p, n, mode, start=0, stop=None, db_path='irreducible_polynomials.db'):
+    """
+    Возвращает сохранённые находки поиска (p, n, mode) с номерами из [start, stop) в порядке номеров.
+
+    :return: Список пар (номер кандидата, коэффициенты от старшей степени к младшей).
+    """
+    width = _index_width(p, n)
+    query = "SELECT idx, coefficients FROM search_hits WHERE p = ? AND n = ? AND mode = ? AND idx >= ?"
+    params = [p, n, mode, str(start).zfill(width)]
+    if stop is not None:
+        query += " AND idx < ?"
+        params.append(str(stop).zfill(width))
+    query += " ORDER BY idx"
+
+    with _connection(db_path) as cursor:
+        cursor.execute(query, params)
+        results = [(int(idx), list(map(int, coeffs_str.split(',')))) for idx, coeffs_str in cursor.fetchall()]
+
+    return results
+
+
+@instrumented('db.checkpoint')
+def save_search_checkpoint(p, n, mode, hits, scanned_to, db_path='irreducible_polynomials.db'):
+    """
+    Сохраняет в одной транзакции новые находки поиска и номер, до которого кандидаты полностью проверены.
+
+    :param hits: Список пар (номер кандидата, коэффициенты от старшей степени к младшей).
+    """
+    width = _index_width(p, n)
+
+    try:
+        with _connection(db_path, write=True) as cursor:
+            cursor.executemany('''
+                INSERT OR IGNORE INTO search_hits (p, n, mode, idx, coefficients)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(p, n, mode, str(index).zfill(width), ", ".join(map(str, coeffs))) for index, coeffs in hits])
+            cursor.execute('''
+                INSERT INTO search_checkpoints (p, n, mode, scanned_to)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(p, n, mode) DO UPDATE SET scanned_to = MAX(scanned_to, excluded.scanned_to),
+                                                      timestamp = CURRENT_TIMESTAMP
+            ''', (p, n, mode, str(scanned_to).zfill(width)))
+    except Exception as e:
+        print(f"Ошибка при сохранении хода поиска в базу данных: {e}")
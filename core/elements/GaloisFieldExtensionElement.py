@@ -6,9 +6,11 @@ from typing import List, Union
 from .functions import (
     mod_polynomial,
     inverse_polynomial,
-    karatsuba_multiply,
+    multiply_polynomials,
     format_polynomial,
 )
+from .memo import memoized, memo_field_key
+from .timing import instrumented
 
 
 class GaloisFieldExtensionElement:
@@ -30,7 +32,14 @@ class GaloisFieldExtensionElement:
         self.modulus_poly = modulus_poly
         self.poly = mod_polynomial(np.poly1d(coeffs), modulus_poly, p)
 
+    def _field_key(self):
+        return memo_field_key(self.p, self.modulus_poly.coeffs)
 
+    def _coeffs_key(self):
+        return tuple(int(c) for c in self.poly.coeffs)
+
+
+    @instrumented('extension.evaluate')
     def calculate_value(self, x_element: GaloisFieldExtensionElement) -> GaloisFieldExtensionElement:
         """
         Вычисляет значение многочлена в заданной точке.
@@ -38,52 +47,72 @@ class GaloisFieldExtensionElement:
         :param x_element: Точка, в которой вычисляется многочлен.
         :return: Результат вычисления (как новый элемент поля).
         """
-        result = np.poly1d([0])
-        x_power = np.poly1d([1])
+        def compute():
+            result = np.poly1d([0])
+            x_power = np.poly1d([1])
+
+            for coef in self.poly.coeffs[::-1]:
+                term = np.poly1d([coef]) * x_power
+                result = mod_polynomial(result + term, self.modulus_poly, self.p)
+                x_power = mod_polynomial(x_power * x_element.poly, self.modulus_poly, self.p)
+
+            return tuple(int(c) for c in result.coeffs)
 
-        for coef in self.poly.coeffs[::-1]:
-            term = np.poly1d([coef]) * x_power
-            result = mod_polynomial(result + term, self.modulus_poly, self.p)
-            x_power = mod_polynomial(x_power * x_element.poly, self.modulus_poly, self.p)
+        result_coeffs = memoized(self._field_key(), 'calculate_value', (self._coeffs_key(), x_element._coeffs_key()),
+                                 compute)
 
-        return GaloisFieldExtensionElement(self.p, result.coeffs, self.modulus_poly)
+        return GaloisFieldExtensionElement(self.p, list(result_coeffs), self.modulus_poly)
 
 
+    @instrumented('extension.inverse')
     def inverse(self) -> GaloisFieldExtensionElement:
         """
         Вычисляет мультипликативный обратный элемент в поле GF(p^n).
 
         :return: Обратный элемент поля.
         """
-        inv_poly = inverse_polynomial(self.poly, self.p, self.modulus_poly)
+        def compute():
+            return tuple(int(c) for c in inverse_polynomial(self.poly, self.p, self.modulus_poly).coeffs)
 
-        return GaloisFieldExtensionElement(self.p, inv_poly.coeffs, self.modulus_poly)
+        inv_coeffs = memoized(self._field_key(), 'inverse', (self._coeffs_key(),), compute)
 
+        return GaloisFieldExtensionElement(self.p, list(inv_coeffs), self.modulus_poly)
+
+    @instrumented('extension.add')
     def __add__(self, other: GaloisFieldExtensionElement) -> GaloisFieldExtensionElement:
         result_poly = self.poly + other.poly
 
         return GaloisFieldExtensionElement(self.p, result_poly.coeffs, self.modulus_poly)
 
+    @instrumented('extension.sub')
     def __sub__(self, other: GaloisFieldExtensionElement) -> GaloisFieldExtensionElement:
         result_poly = self.poly - other.poly
 
         return GaloisFieldExtensionElement(self.p, result_poly.coeffs, self.modulus_poly)
 
+    @instrumented('extension.mul')
     def __mul__(self, other: 'GaloisFieldExtensionElement') -> 'GaloisFieldExtensionElement':
         if self.p != other.p or not np.array_equal(self.modulus_poly.coeffs, other.modulus_poly.coeffs):
             raise ValueError("Элементы принадлежат разным полям.")
 
-        product_coeffs = karatsuba_multiply(self.poly.coeffs.tolist(), other.poly.coeffs.tolist(), self.p)
+        def compute():
+            product_coeffs = multiply_polynomials(self.poly.coeffs.tolist(), other.poly.coeffs.tolist(), self.p)
+            return tuple(int(c) for c in mod_polynomial(np.poly1d(product_coeffs), self.modulus_poly, self.p).coeffs)
 
-        result_poly = mod_polynomial(np.poly1d(product_coeffs), self.modulus_poly, self.p)
+        result_coeffs = memoized(self._field_key(), 'mul', (self._coeffs_key(), other._coeffs_key()), compute)
 
-        return GaloisFieldExtensionElement(self.p, result_poly.coeffs, self.modulus_poly)
+        return GaloisFieldExtensionElement(self.p, list(result_coeffs), self.modulus_poly)
 
+    @instrumented('extension.div')
     def __truediv__(self, other: GaloisFieldExtensionElement) -> GaloisFieldExtensionElement:
-        inverse_poly = inverse_polynomial(other.poly, self.p, self.modulus_poly)
-        result_poly = self.poly * inverse_poly
+        def compute():
+            inverse_poly = inverse_polynomial(other.poly, self.p, self.modulus_poly)
+            result_poly = mod_polynomial(self.poly * inverse_poly, self.modulus_poly, self.p)
+            return tuple(int(c) for c in result_poly.coeffs)
 
-        return GaloisFieldExtensionElement(self.p, result_poly.coeffs, self.modulus_poly)
+        result_coeffs = memoized(self._field_key(), 'truediv', (self._coeffs_key(), other._coeffs_key()), compute)
+
+        return GaloisFieldExtensionElement(self.p, list(result_coeffs), self.modulus_poly)
 
     def __repr__(self) -> str:
         return format_polynomial(self.poly)
\ No newline at end of file
@@ -1,10 +1,13 @@
 import numpy as np
 from .functions import (
     format_polynomial,
-    karatsuba_multiply,
+    multiply_polynomials,
     multiply_naive
 )
 from .GaloisFieldSimpleElement import GaloisFieldSimpleElement
+from .factorization import factor_polynomial
+from .memo import memoized, memo_field_key
+from .timing import instrumented
 
 
 class GaloisFieldSimplePolynom:
@@ -31,6 +34,10 @@ class GaloisFieldSimplePolynom:
 
         return coeffs
 
+    def _coeffs_key(self):
+        return tuple(int(c) for c in self.poly.coeffs)
+
+    @instrumented('polynomial.add')
     def __add__(self, other):
         if self.p != other.p:
             raise ValueError("Многочлены из разных полей нельзя складывать")
@@ -47,6 +54,7 @@ class GaloisFieldSimplePolynom:
 
         return GaloisFieldSimplePolynom(result_coeffs, self.p)
 
+    @instrumented('polynomial.sub')
     def __sub__(self, other):
         if self.p != other.p:
             raise ValueError("Многочлены из разных полей нельзя вычитать")
@@ -62,16 +70,21 @@ class GaloisFieldSimplePolynom:
 
         return GaloisFieldSimplePolynom(result_coeffs, self.p)
 
+    @instrumented('polynomial.mul')
     def __mul__(self, other: 'GaloisFieldSimplePolynom') -> 'GaloisFieldSimplePolynom':
         if self.p != other.p:
             raise ValueError("Многочлены из разных полей нельзя умножать")
 
-        product_coeffs = karatsuba_multiply(self.poly.coeffs.tolist(), other.poly.coeffs.tolist(), self.p)
+        def compute():
+            product_coeffs = multiply_polynomials(self.poly.coeffs.tolist(), other.poly.coeffs.tolist(), self.p)
+            return tuple(int(c) % self.p for c in product_coeffs)
 
-        product_coeffs = [c % self.p for c in product_coeffs]
+        product_coeffs = memoized(memo_field_key(self.p), 'poly_mul', (self._coeffs_key(), other._coeffs_key()),
+                                  compute)
 
-        return GaloisFieldSimplePolynom(product_coeffs, self.p)
+        return GaloisFieldSimplePolynom(list(product_coeffs), self.p)
 
+    @instrumented('polynomial.divmod')
     def __truediv__(self, other):
         if self.p != other.p:
             raise ValueError("Многочлены из разных полей нельзя делить")
@@ -79,19 +92,23 @@ class GaloisFieldSimplePolynom:
         if np.all(other.poly.coeffs == 0):
             raise ZeroDivisionError("Деление на ноль.")
         
-        quotient, remainder = np.polydiv(self.poly, other.poly)
+        def compute():
+            quotient, remainder = np.polydiv(self.poly, other.poly)
+            return (tuple(int(round(c)) % self.p for c in quotient.coeffs),
+                    tuple(int(round(c)) % self.p for c in remainder.coeffs))
 
-        quotient_coeffs = [int(round(c)) % self.p for c in quotient.coeffs]
-        remainder_coeffs = [int(round(c)) % self.p for c in remainder.coeffs]
+        quotient_coeffs, remainder_coeffs = memoized(memo_field_key(self.p), 'poly_divmod',
+                                                     (self._coeffs_key(), other._coeffs_key()), compute)
 
-        quotient_poly = GaloisFieldSimplePolynom(quotient_coeffs, self.p)
-        remainder_poly = GaloisFieldSimplePolynom(remainder_coeffs, self.p)
+        quotient_poly = GaloisFieldSimplePolynom(list(quotient_coeffs), self.p)
+        remainder_poly = GaloisFieldSimplePolynom(list(remainder_coeffs), self.p)
 
         return quotient_poly, remainder_poly
 
     def __str__(self) -> str:
         return format_polynomial(self.poly)
 
+    @instrumented('polynomial.evaluate')
     def calculate_value(self, element: GaloisFieldSimpleElement) -> GaloisFieldSimpleElement:
         """
         Вычисляет значение многочлена в данной точке
@@ -102,3 +119,18 @@ class GaloisFieldSimplePolynom:
             result = (result * element.value + coef) % self.p
 
         return GaloisFieldSimpleElement(result, self.p)
+
+    @instrumented('polynomial.factor')
+    def factor(self):
+        """
+        Раскладывает многочлен на неприводимые множители (алгоритм Кантора-Цассенхауса).
+
+        :return: Пара (старший коэффициент, список пар (унитарный неприводимый множитель, кратность)).
+        """
+        def compute():
+            lead, factors = factor_polynomial(self.poly.coeffs.tolist(), self.p)
+            return lead, tuple((tuple(coeffs), multiplicity) for coeffs, multiplicity in factors)
+
+        lead, factors = memoized(memo_field_key(self.p), 'factor', (self._coeffs_key(),), compute)
+
+        return lead, [(GaloisFieldSimplePolynom(list(coeffs), self.p), multiplicity) for coeffs, multiplicity in factors]
@@ -1,13 +1,42 @@
 from .GaloisFieldExtensionElement import GaloisFieldExtensionElement
 from .GaloisFieldSimpleElement import GaloisFieldSimpleElement
-from .functions import format_polynomial
-from .irreducibility_test import is_irreducible_benor
+from .functions import format_polynomial, is_prime
+from .irreducibility_test import is_irreducible_benor, count_irreducible_polynomials
+from .primitivity_test import is_primitive, factor_field_order
 from .GaloisFieldSimplePolynom import GaloisFieldSimplePolynom
+from .factorization import factor_polynomial
+from .memo import OperationMemo, memo_field_key, enable_memo, disable_memo, get_memo, memoized
+from .batch import BatchField, evaluate_batch
+from .cost_model import CostModel, get_cost_model, set_cost_model
+from .timing import LatencyHistogram, OperationTimings, enable_timings, disable_timings, get_timings, instrumented, timed
 
 __all__ = (
     "GaloisFieldExtensionElement",
     "GaloisFieldSimpleElement",
     "GaloisFieldSimplePolynom",
     "format_polynomial",
-    "is_irreducible_benor"
+    "is_prime",
+    "is_irreducible_benor",
+    "count_irreducible_polynomials",
+    "is_primitive",
+    "factor_field_order",
+    "factor_polynomial",
+    "OperationMemo",
+    "memo_field_key",
+    "enable_memo",
+    "disable_memo",
+    "get_memo",
+    "memoized",
+    "BatchField",
+    "evaluate_batch",
+    "LatencyHistogram",
+    "OperationTimings",
+    "enable_timings",
+    "disable_timings",
+    "get_timings",
+    "instrumented",
+    "timed",
+    "CostModel",
+    "get_cost_model",
+    "set_cost_model"
 )
\ No newline at end of file
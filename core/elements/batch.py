@@ -0,0 +1,204 @@
+from functools import lru_cache
+
+import numpy as np
+
+from .functions import format_polynomial
+from .timing import instrumented
+
+# Операции, которые evaluate_batch выполняет сразу над всей порцией элементов
+BATCH_OPS = ('add', 'sub', 'mul', 'div', 'inv', 'eval')
+
+
+class BatchField:
+    """
+    Векторизованная арифметика в поле GF(p^n) = GF(p)[x]/(f) над порциями элементов.
+
+    Порция - массив NumPy формы (число элементов, n): строка - коэффициенты элемента от младшей степени
+    к старшей. Умножение порций - n сдвинутых умножений строк на столбец и приведение старшей половины
+    произведения одной матрицей остатков x^(n + k) mod f, обращение - возведение в степень p^n - 2
+    (по теореме Ферма), вычисление значения многочлена - схема Горнера; каждая операция выполняется
+    сразу для всех элементов порции. Простое поле GF(p) - частный случай с f = x (n = 1).
+    """
+    def __init__(self, p, modulus_coeffs):
+        """
+        :param p: Простое число, характеристика поля.
+        :param modulus_coeffs: Коэффициенты неприводимого многочлена f (от старшей степени к младшей).
+        """
+        coeffs = [int(c) % p for c in modulus_coeffs]
+        while len(coeffs) > 1 and coeffs[0] == 0:
+            coeffs.pop(0)
+        if len(coeffs) < 2:
+            raise ValueError("Модуль поля должен иметь степень не меньше 1")
+
+        self.p = p
+        self.n = n = len(coeffs) - 1
+        # Суммы n произведений коэффициентов должны помещаться в int64, иначе - Python-целые
+        self.dtype = np.int64 if n * (p - 1) ** 2 < 2 ** 62 else object
+
+        # Унитарный модуль (от младшей степени к старшей): остатки по f и по f / lc(f) совпадают
+        lead_inverse = pow(coeffs[0], p - 2, p)
+        self.modulus = np.array([c * lead_inverse % p for c in coeffs[::-1]], dtype=self.dtype)
+
+        # Строка k - остаток x^(n + k) mod f
+        self._reduction = np.zeros((max(n - 1, 0), n), dtype=self.dtype)
+        row = (-self.modulus[:n]) % p
+        for k in range(n - 1):
+            self._reduction[k] = row
+            top = row[-1]
+            row = np.concatenate((row[:1] * 0, row[:-1]))
+            if top:
+                row = (row - top * self.modulus[:n]) % p
+
+    def rows(self, elements):
+        """
+        Порция из списков коэффициентов (от старшей степени к младшей) любой длины с приведением по модулю f.
+
+        :param elements: Список списков коэффициентов.
+        :return: Массив формы (len(elements), n).
+        """
+        width = max([self.n] + [len(coeffs) for coeffs in elements])
+        data = np.zeros((len(elements), width), dtype=self.dtype)
+        for i, coeffs in enumerate(elements):
+            if len(coeffs):
+                data[i, :len(coeffs)] = [int(c) % self.p for c in coeffs[::-1]]
+
+        # Старшие коэффициенты, выходящие за степень n - 1, убираются вычитанием кратных f
+        for degree in range(width - 1, self.n - 1, -1):
+            top = data[:, degree].copy()
+            if top.any():
+                data[:, degree - self.n:degree + 1] = (data[:, degree - self.n:degree + 1]
+                                                       - top[:, None] * self.modulus) % self.p
+        return data[:, :self.n]
+
+    def poly_rows(self, polys):
+        """
+        Порция многочленов с коэффициентами из GF(p) без приведения по модулю f (для evaluate):
+        многочлен вычисляется в точке целиком, а не как элемент поля.
+
+        :param polys: Список списков коэффициентов (от старшей степени к младшей).
+        :return: Массив формы (len(polys), наибольшая длина), строки - от младшей степени к старшей.
+        """
+        width = max([1] + [len(coeffs) for coeffs in polys])
+        data = np.zeros((len(polys), width), dtype=self.dtype)
+        for i, coeffs in enumerate(polys):
+            if len(coeffs):
+                data[i, :len(coeffs)] = [int(c) % self.p for c in coeffs[::-1]]
+        return data
+
+    def coefficients(self, data):
+        """Списки коэффициентов (от старшей степени к младшей, без старших нулей) для строк порции."""
+        result = []
+        for row in data:
+            nonzero = np.flatnonzero(row)
+            result.append([int(c) for c in row[:nonzero[-1] + 1][::-1]] if len(nonzero) else [0])
+        return result
+
+    def add(self, a, b):
+        return (a + b) % self.p
+
+    def sub(self, a, b):
+        return (a - b) % self.p
+
+    def mul(self, a, b):
+        n, p = self.n, self.p
+        product = np.zeros((len(a), 2 * n - 1), dtype=self.dtype)
+        for i in range(n):
+            product[:, i:i + n] += a[:, i:i + 1] * b
+        product %= p
+        if n == 1:
+            return product
+        return (product[:, :n] + product[:, n:] @ self._reduction) % p
+
+    def pow(self, a, e):
+        result = np.zeros_like(a)
+        result[:, 0] = 1
+        while e:
+            if e & 1:
+                result = self.mul(result, a)
+            e >>= 1
+            if e:
+                a = self.mul(a, a)
+        return result
+
+    def inverse(self, a):
+        """
+        Обратные элементы (a^(p^n - 2)); для нулевых строк результат нулевой - их нужно отсеять заранее
+        (см. is_zero).
+        """
+        return self.pow(a, self.p ** self.n - 2)
+
+    def is_zero(self, a):
+        return ~a.astype(bool).any(axis=1)
+
+    def evaluate(self, polys, points):
+        """
+        Значения многочленов с коэффициентами из GF(p) в точках поля (схема Горнера).
+
+        :param polys: Коэффициенты многочленов (строки от младшей степени к старшей, см. poly_rows).
+        :param points: Точки (порция элементов поля той же длины).
+        """
+        result = np.zeros_like(points)
+        for j in range(polys.shape[1] - 1, -1, -1):
+            result = self.mul(result, points)
+            result[:, 0] = (result[:, 0] + polys[:, j]) % self.p
+        return result
+
+
+@lru_cache(maxsize=64)
+def get_batch_field(p, modulus_coeffs):
+    """BatchField для (p, кортеж коэффициентов модуля); матрица приведения строится один раз на процесс."""
+    return BatchField(p, modulus_coeffs)
+
+
+@instrumented('batch.evaluate')
+def evaluate_batch(p, modulus_coeffs, items):
+    """
+    Выполняет порцию операций в одном поле, группируя их по виду операции.
+
+    :param p: Характеристика поля.
+    :param modulus_coeffs: Кортеж коэффициентов модуля (от старшей степени к младшей); (1, 0) - простое поле GF(p).
+    :param items: Список троек (операция, a, b): операции add, sub, mul, div, inv (b не используется)
+                  и eval (значение многочлена a в точке b; в GF(p^n) a приводится по модулю f, как элемент поля,
+                  в GF(p) вычисляется целиком); a и b - списки коэффициентов от старшей степени к младшей.
+    :return: Список результатов в порядке items: пары (коэффициенты результата, запись многочлена)
+             или строки с текстом ошибки.
+    """
+    field = get_batch_field(p, tuple(modulus_coeffs))
+    results = [None] * len(items)
+
+    groups = {}
+    for index, (op, a, b) in enumerate(items):
+        if op not in BATCH_OPS:
+            results[index] = f"Неизвестная операция: '{op}'"
+        elif op != 'inv' and b is None:
+            results[index] = f"Для операции '{op}' нужен операнд b"
+        else:
+            groups.setdefault(op, []).append(index)
+
+    for op, indices in groups.items():
+        # Как и в библиотеке, в GF(p^n) многочлен a - элемент поля (приводится по модулю f),
+        # а в простом поле GF(p) (модуль x) - многочлен над GF(p), который вычисляется целиком
+        prime_eval = op == 'eval' and field.n == 1 and tuple(modulus_coeffs) == (1, 0)
+        a = (field.poly_rows if prime_eval else field.rows)([items[i][1] for i in indices])
+        b = field.rows([items[i][2] for i in indices]) if op != 'inv' else None
+
+        if op in ('div', 'inv'):
+            divisor = b if op == 'div' else a
+            zero = field.is_zero(divisor)
+            for i in np.flatnonzero(zero):
+                results[indices[i]] = "Деление на ноль" if op == 'div' else "Нулевой элемент не имеет обратного"
+            indices = [index for index, is_zero in zip(indices, zero) if not is_zero]
+            a, divisor = a[~zero], divisor[~zero]
+            if not indices:
+                continue
+            inverse = field.inverse(divisor)
+            value = field.mul(a, inverse) if op == 'div' else inverse
+        elif op == 'eval':
+            value = field.evaluate(a, b)
+        else:
+            value = getattr(field, op)(a, b)
+
+        for index, coeffs in zip(indices, field.coefficients(value)):
+            results[index] = (coeffs, format_polynomial(np.poly1d(coeffs)))
+
+    return results
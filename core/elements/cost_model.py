@@ -0,0 +1,212 @@
+import math
+import threading
+from statistics import median
+from time import perf_counter
+
+# Постоянные модели по умолчанию: секунды на единицу работы и на вызов, замеренные на типичной машине
+# (CPython 3.11, x86-64); CostModel.calibrate() заменяет их замерами на текущей машине
+DEFAULT_CONSTANTS = {
+    'call': 2.5e-6,         # накладные расходы одного умножения многочленов
+    'naive': 8.5e-8,        # одно произведение коэффициентов наивного умножения (n^2 единиц)
+    'karatsuba': 1.3e-6,    # единица n^log2(3) умножения Карацубы
+    'reduce': 8.0e-8,       # умножение с приведением по модулю веса w (numpy): n * (w + 1) единиц
+    'reduce_call': 3.5e-5,  # накладные расходы умножения с приведением
+    'euclid': 1.5e-7,       # единица n^2 расширенного алгоритма Евклида
+    'euclid_call': 3.0e-5,  # накладные расходы обращения алгоритмом Евклида
+    'benor': 1.5e-7,        # шаг Фробениуса теста Бен-Ора: n^2 * (log2 p + 1) единиц
+    'sieve': 1.0e-6,        # один кандидат решета (на всех степенях делителей)
+}
+
+# Алгоритмы, из которых выбирает модель
+MULTIPLICATION_METHODS = ('naive', 'karatsuba')
+INVERSION_METHODS = ('fermat', 'euclid')
+
+# Степень log2(3) в сложности алгоритма Карацубы
+KARATSUBA_EXPONENT = math.log2(3)
+
+
+class CostModel:
+    """
+    Модель стоимости операций с многочленами над GF(p): оценка времени по (p, n) и постоянным,
+    откалиброванным на конкретной машине, и выбор самого быстрого алгоритма.
+
+    Оценки - время одного вызова в секундах; выбор алгоритма кэшируется по аргументам,
+    поэтому в умножении и обращении элементов он стоит одного обращения к словарю.
+    """
+    def __init__(self, constants=None):
+        """
+        :param constants: Словарь постоянных (см. DEFAULT_CONSTANTS); отсутствующие берутся по умолчанию.
+        """
+        self.constants = dict(DEFAULT_CONSTANTS)
+        if constants:
+            self.constants.update({key: float(value) for key, value in constants.items()})
+        self._choices = {}
+
+    def multiplication_cost(self, n, method):
+        """Оценка времени умножения двух многочленов из n коэффициентов."""
+        if method == 'naive':
+            return self.constants['call'] + self.constants['naive'] * n * n
+        if method == 'karatsuba':
+            return self.constants['call'] + self.constants['karatsuba'] * n ** KARATSUBA_EXPONENT
+        raise ValueError(f"Неизвестный алгоритм умножения: '{method}'")
+
+    def reduction_cost(self, n, weight=None):
+        """
+        Оценка времени умножения элементов GF(p^n) с приведением произведения по модулю.
+
+        :param weight: Число ненулевых коэффициентов модуля (по умолчанию n + 1 - плотный модуль).
+        """
+        weight = n + 1 if weight is None else weight
+        return self.constants['reduce_call'] + self.constants['reduce'] * n * (weight + 1)
+
+    def inversion_cost(self, p, n, method, weight=None):
+        """
+        Оценка времени обращения элемента поля GF(p^n).
+
+        :param weight: Число ненулевых коэффициентов модуля (по умолчанию n + 1 - плотный модуль).
+        """
+        if method == 'fermat':
+            # Возведение в степень p^n - 2: около 1.5 * log2(p^n) умножений с приведением
+            return 1.5 * n * math.log2(p) * self.reduction_cost(n, weight)
+        if method == 'euclid':
+            return self.constants['euclid_call'] + self.constants['euclid'] * n * n
+        raise ValueError(f"Неизвестный алгоритм обращения: '{method}'")
+
+    def frobenius_cost(self, p, n):
+        """Оценка времени одного шага x^(p^i) -> x^(p^(i+1)) mod f теста Бен-Ора для многочлена степени n."""
+        return self.constants['benor'] * n * n * (math.log2(p) + 1)
+
+    def irreducibility_cost(self, p, n, irreducible=True):
+        """
+        Оценка времени теста Бен-Ора для многочлена степени n.
+
+        Неприводимый многочлен проходит все n // 2 шагов; случайный кандидат в среднем останавливается
+        на шаге порядка ln(n // 2) + 1 (вероятность не иметь делителей степени до k убывает как 1 / k).
+
+        :param irreducible: True - оценка для неприводимого многочлена, False - для случайного кандидата.
+        """
+        steps = max(n // 2, 1)
+        if not irreducible:
+            steps = min(steps, math.log(steps) + 1)
+        return self.frobenius_cost(p, n) * steps
+
+    def choose_multiplication(self, n):
+        """Самый быстрый алгоритм умножения многочленов из n коэффициентов ('naive' или 'karatsuba')."""
+        key = ('mul', n)
+        method = self._choices.get(key)
+        if method is None:
+            method = self._choices[key] = min(MULTIPLICATION_METHODS,
+                                              key=lambda name: self.multiplication_cost(n, name))
+        return method
+
+    def choose_inversion(self, p, n, weight=None):
+        """Самый быстрый алгоритм обращения в GF(p^n) ('fermat' или 'euclid')."""
+        key = ('inv', p, n, weight)
+        method = self._choices.get(key)
+        if method is None:
+            method = self._choices[key] = min(INVERSION_METHODS,
+                                              key=lambda name: self.inversion_cost(p, n, name, weight))
+        return method
+
+    def karatsuba_threshold(self, limit=4096):
+        """Наименьшее число коэффициентов, начиная с которого выгоднее умножение Карацубы (None - до limit нет)."""
+        ratio = self.constants['karatsuba'] / self.constants['naive']
+        # naive * n^2 > karatsuba * n^log2(3)  <=>  n > ratio^(1 / (2 - log2(3)))
+        threshold = math.ceil(ratio ** (1 / (2 - KARATSUBA_EXPONENT)))
+        return threshold if threshold <= limit else None
+
+    @classmethod
+    def calibrate(cls, budget=0.5):
+        """
+        Замеряет постоянные модели на текущей машине микротестами (около budget секунд на все замеры).
+
+        Каждая операция замеряется на двух размерах; по ним находятся время на единицу работы
+        и накладные расходы вызова (прямая через две точки).
+
+        :param budget: Примерное общее время замеров в секундах.
+        :return: Новая модель с замеренными постоянными.
+        """
+        import numpy as np
+
+        from .functions import karatsuba_multiply, multiply_naive, inverse_polynomial
+        from .irreducibility_test import is_irreducible_benor
+
+        share = budget / 10
+
+        def measure(fn):
+            # Повторяет вызов, пока не наберётся доля бюджета, и берёт медиану времени вызова
+            samples = []
+            spent = 0.0
+            while (spent < share or len(samples) < 3) and len(samples) < 1000:
+                start = perf_counter()
+                fn()
+                elapsed = perf_counter() - start
+                samples.append(elapsed)
+                spent += elapsed
+            return median(samples)
+
+        def fit(points):
+            # Прямая time = fixed + per_unit * units через две точки (units, time)
+            (units1, time1), (units2, time2) = points
+            per_unit = max((time2 - time1) / (units2 - units1), 1e-12)
+            return max(time1 - per_unit * units1, 0.0), per_unit
+
+        def dense(length, p, seed):
+            return [(seed * (i + 1) * 7 + i * i) % p or 1 for i in range(length)]
+
+        constants = {}
+
+        p = 65521
+        points = {'naive': [], 'karatsuba': []}
+        for n in (16, 192):
+            a, b = dense(n, p, 3), dense(n, p, 5)
+            points['naive'].append((n * n, measure(lambda: multiply_naive(a, b, p, reverse=True))))
+            points['karatsuba'].append((n ** KARATSUBA_EXPONENT, measure(lambda: karatsuba_multiply(a, b, p))))
+        constants['call'], constants['naive'] = fit(points['naive'])
+        constants['karatsuba'] = fit(points['karatsuba'])[1]
+
+        # Модуль не обязан быть неприводимым: время обращения от этого не зависит
+        p = 101
+        points = {'euclid': [], 'reduce': []}
+        for n in (4, 32):
+            modulus = np.poly1d([1] + dense(n, p, 11))
+            poly = np.poly1d(dense(n, p, 13))
+            steps = 1.5 * n * math.log2(p)
+            points['euclid'].append((n * n, measure(lambda: inverse_polynomial(poly, p, modulus, method='euclid'))))
+            points['reduce'].append((n * (n + 2),
+                                     measure(lambda: inverse_polynomial(poly, p, modulus, method='fermat')) / steps))
+        constants['euclid_call'], constants['euclid'] = fit(points['euclid'])
+        constants['reduce_call'], constants['reduce'] = fit(points['reduce'])
+
+        # x^63 + x + 1 над GF(2) и x^15 + x + 35 над GF(101) неприводимы: тест проходит все n // 2 шагов
+        samples = []
+        for p, n, constant in ((2, 63, 1), (101, 15, 35)):
+            coeffs = [constant, 1] + [0] * (n - 2) + [1]
+            elapsed = measure(lambda: is_irreducible_benor((p, coeffs)))
+            samples.append(elapsed / (n * n * (math.log2(p) + 1) * (n // 2)))
+        constants['benor'] = sum(samples) / len(samples)
+
+        return cls(constants)
+
+
+# Модель стоимости процесса: по умолчанию - с постоянными DEFAULT_CONSTANTS, без замеров при импорте
+_cost_model = CostModel()
+_lock = threading.Lock()
+
+
+def get_cost_model():
+    """Возвращает модель стоимости, по которой операции с элементами выбирают алгоритмы."""
+    return _cost_model
+
+
+def set_cost_model(model):
+    """
+    Заменяет модель стоимости процесса (например, откалиброванной на этой машине).
+
+    :param model: Объект CostModel или None - вернуть модель с постоянными по умолчанию.
+    :return: Установленная модель.
+    """
+    global _cost_model
+    with _lock:
+        _cost_model = model if model is not None else CostModel()
+    return _cost_model
@@ -0,0 +1,319 @@
+import random
+
+import numpy as np
+
+# Внутри модуля многочлены - массивы NumPy коэффициентов от младшей степени к старшей без старших нулей
+# (нулевой многочлен - пустой массив). При p < 2^31 коэффициенты хранятся в int64, а скалярные произведения
+# (свёртки и умножения на матрицы) при необходимости считаются по частям коэффициентов, чтобы суммы
+# произведений помещались в int64; для больших p используются массивы Python-целых (dtype=object).
+
+
+def _dtype(p):
+    return np.int64 if p < 2 ** 31 else object
+
+
+def _split_bits(p, n):
+    """Ширина части коэффициента, при которой сумма n произведений части на коэффициент помещается в int64."""
+    return 62 - n.bit_length() - (p - 1).bit_length()
+
+
+def _products(op, a, b, p, bits):
+    """
+    op(a, b) mod p для билинейной операции op (свёртки или умножения на матрицу).
+
+    Если сумма произведений может переполнить int64, a раскладывается на части по bits бит и результат
+    собирается по схеме Горнера с приведением по модулю p после каждой части.
+    """
+    if a.dtype == object or bits >= (p - 1).bit_length():
+        return op(a, b) % p
+
+    parts = []
+    while True:
+        parts.append(a & ((1 << bits) - 1))
+        a = a >> bits
+        if not a.any():
+            break
+
+    result = op(parts.pop(), b) % p
+    while parts:
+        result = ((result << bits) + op(parts.pop(), b)) % p
+    return result
+
+
+def _trim(a):
+    nonzero = np.flatnonzero(a)
+    return a[:nonzero[-1] + 1] if len(nonzero) else a[:0]
+
+
+def _monic(a, p):
+    """Делит многочлен на старший коэффициент."""
+    if len(a) == 0 or a[-1] == 1:
+        return a
+    return a * pow(int(a[-1]), p - 2, p) % p
+
+
+def _sub(a, b, p):
+    length = max(len(a), len(b))
+    result = np.zeros(length, dtype=a.dtype)
+    result[:len(a)] += a
+    result[:len(b)] -= b
+    return _trim(result % p)
+
+
+def _rem(a, b, p):
+    """Остаток от деления a на унитарный многочлен b."""
+    db = len(b) - 1
+    if len(a) <= db:
+        return a
+    a = a.copy()
+    for i in range(len(a) - 1 - db, -1, -1):
+        c = a[i + db]
+        if c:
+            a[i:i + db + 1] = (a[i:i + db + 1] - c * b) % p
+    return _trim(a[:db])
+
+
+def _divmod(a, b, p):
+    """Частное и остаток от деления a на унитарный многочлен b."""
+    db = len(b) - 1
+    if len(a) <= db:
+        return a[:0], a
+    a = a.copy()
+    q = np.zeros(len(a) - db, dtype=a.dtype)
+    for i in range(len(a) - 1 - db, -1, -1):
+        c = a[i + db]
+        if c:
+            q[i] = c
+            a[i:i + db + 1] = (a[i:i + db + 1] - c * b) % p
+    return _trim(q), _trim(a[:db])
+
+
+def _gcd(a, b, p):
+    """Унитарный НОД двух многочленов (алгоритм Евклида с векторизованным делением)."""
+    a, b = _monic(a, p), _monic(b, p)
+    while len(b):
+        a, b = b, _monic(_rem(a, b, p), p)
+    return a
+
+
+def _pth_root(a, p):
+    """Корень степени p из многочлена, все показатели которого кратны p (над GF(p) c^p = c)."""
+    return a[::p].copy()
+
+
+class _Modulus:
+    """
+    Арифметика по модулю унитарного многочлена f степени n.
+
+    Приведение выполняется умножением старшей половины произведения на заранее вычисленную матрицу
+    остатков x^k mod f (n <= k <= 2n - 2), а возведение в степень p (отображение Фробениуса, линейное над GF(p)) -
+    умножением на матрицу остатков x^(ip) mod f. Так каждое умножение и каждое применение Фробениуса
+    стоит одно матричное произведение O(n^2) вместо O(n^2) шагов интерпретатора.
+    """
+    def __init__(self, f, p):
+        self.f = f
+        self.p = p
+        self.n = len(f) - 1
+        self._bits = _split_bits(p, self.n)
+        n = self.n
+
+        # Строка k - остаток x^(n + k) mod f: x^(k+1) = x * x^k, приведённый вычитанием старшего члена
+        self._reduction = np.zeros((max(n - 1, 0), n), dtype=f.dtype)
+        row = (-f[:n]) % p
+        for k in range(n - 1):
+            self._reduction[k] = row
+            top = row[-1]
+            row = np.concatenate((row[:1] * 0, row[:-1]))
+            if top:
+                row = (row - top * f[:n]) % p
+
+        self._frobenius = None
+
+    def reduce(self, a):
+        n = self.n
+        if len(a) <= n:
+            return a
+        if len(a) > 2 * n - 1:
+            return _rem(a, self.f, self.p)
+        high = a[n:]
+        result = a[:n] + _products(np.matmul, high, self._reduction[:len(high)], self.p, self._bits)
+        return _trim(result % self.p)
+
+    def mul(self, a, b):
+        if len(a) == 0 or len(b) == 0:
+            return a[:0]
+        return self.reduce(_products(np.convolve, a, b, self.p, self._bits))
+
+    def pow(self, a, e):
+        result = np.ones(1, dtype=self.f.dtype)
+        a = self.reduce(a)
+        while e:
+            if e & 1:
+                result = self.mul(result, a)
+            e >>= 1
+            if e:
+                a = self.mul(a, a)
+        return result
+
+    def frobenius(self, a):
+        """a^p mod f."""
+        if self._frobenius is None:
+            # Строка i - x^(ip) mod f
+            n, dtype = self.n, self.f.dtype
+            x_p = self.pow(np.array([0, 1], dtype=dtype), self.p)
+            self._frobenius = np.zeros((n, n), dtype=dtype)
+            row = np.ones(1, dtype=dtype)
+            for i in range(n):
+                self._frobenius[i, :len(row)] = row
+                row = self.mul(row, x_p)
+
+        if len(a) == 0:
+            return a
+        return _trim(_products(np.matmul, a, self._frobenius[:len(a)], self.p, self._bits))
+
+
+def square_free_decomposition(f, p):
+    """
+    Разложение унитарного многочлена на свободные от квадратов множители (алгоритм Юня для GF(p)).
+
+    :return: Список пар (многочлен, кратность): f - произведение многочленов в степенях их кратностей,
+             многочлены попарно взаимно просты и свободны от квадратов.
+    """
+    if len(f) <= 1:
+        return []
+
+    derivative = _trim(f[1:] * np.arange(1, len(f), dtype=f.dtype) % p)
+    if len(derivative) == 0:
+        # f = g(x^p) = g(x)^p
+        return [(g, k * p) for g, k in square_free_decomposition(_pth_root(f, p), p)]
+
+    result = []
+    c = _gcd(f, derivative, p)
+    w = _divmod(f, c, p)[0]
+    i = 1
+    while len(w) > 1:
+        y = _gcd(w, c, p)
+        factor = _divmod(w, y, p)[0]
+        if len(factor) > 1:
+            result.append((factor, i))
+        w = y
+        c = _divmod(c, y, p)[0]
+        i += 1
+
+    if len(c) > 1:
+        # Остались множители с кратностями, кратными p
+        result.extend((g, k * p) for g, k in square_free_decomposition(_pth_root(c, p), p))
+
+    return result
+
+
+def distinct_degree_factorization(f, p):
+    """
+    Разложение унитарного свободного от квадратов многочлена на произведения неприводимых множителей одной степени.
+
+    Степени x^(p^i) mod f получаются одна из другой применением матрицы Фробениуса (как в тесте Бен-Ора),
+    а НОД(f, x^(p^i) - x) отделяет произведение всех неприводимых множителей степени i.
+
+    :return: Список пар (произведение множителей степени d, d).
+    """
+    result = []
+    modulus = _Modulus(f, p)
+    x = np.array([0, 1], dtype=f.dtype)
+    x_p_i = x
+    remaining = f
+    d = 0
+
+    while 2 * (d + 1) <= len(remaining) - 1:
+        d += 1
+        x_p_i = modulus.frobenius(x_p_i)
+        g = _gcd(remaining, _sub(x_p_i, x, p), p)
+        if len(g) > 1:
+            result.append((g, d))
+            remaining = _divmod(remaining, g, p)[0]
+
+    if len(remaining) > 1:
+        result.append((remaining, len(remaining) - 1))
+
+    return result
+
+
+def equal_degree_factorization(f, d, p, rng=random):
+    """
+    Расщепление произведения неприводимых многочленов одной степени d (алгоритм Кантора-Цассенхауса).
+
+    Для случайного h многочлен T = h^((p^d - 1) / 2) - 1 (при p = 2 - след h + h^2 + ... + h^(2^(d-1)))
+    с вероятностью около 1/2 делит каждый неприводимый множитель, поэтому НОД с T расщепляет сразу все ещё
+    не разложенные части. Показатель (p^d - 1) / 2 = (1 + p + ... + p^(d-1)) * (p - 1) / 2, поэтому
+    h^((p^d - 1) / 2) считается через d применений Фробениуса и возведение в небольшую степень (p - 1) / 2.
+
+    :return: Список неприводимых унитарных множителей.
+    """
+    n = len(f) - 1
+    if n == d:
+        return [f]
+
+    modulus = _Modulus(f, p)
+    pieces = [f]
+    done = []
+    while pieces:
+        h = _trim(np.array([rng.randrange(p) for _ in range(n)], dtype=f.dtype))
+        if len(h) <= 1:
+            continue
+
+        if p == 2:
+            t = h
+            power = h
+            for _ in range(d - 1):
+                power = modulus.frobenius(power)
+                t = _sub(t, power, p)
+        else:
+            norm = h
+            power = h
+            for _ in range(d - 1):
+                power = modulus.frobenius(power)
+                norm = modulus.mul(norm, power)
+            t = _sub(modulus.pow(norm, (p - 1) // 2), np.ones(1, dtype=f.dtype), p)
+
+        split = []
+        for piece in pieces:
+            g = _gcd(piece, t, p)
+            if 1 < len(g) < len(piece):
+                split.extend((g, _divmod(piece, g, p)[0]))
+            else:
+                split.append(piece)
+
+        pieces = []
+        for piece in split:
+            (done if len(piece) - 1 == d else pieces).append(piece)
+
+    return done
+
+
+def factor_polynomial(coeffs, p, rng=random):
+    """
+    Раскладывает многочлен над GF(p) на неприводимые множители (алгоритм Кантора-Цассенхауса):
+    разложение на свободные от квадратов множители, затем разложение по степеням неприводимых множителей
+    и расщепление произведений множителей одной степени.
+
+    :param coeffs: Коэффициенты многочлена (от старшей степени к младшей).
+    :param p: Простое число, характеристика поля.
+    :param rng: Источник случайности для расщепления (объект с методом randrange, например random.Random(seed)).
+    :return: Пара (старший коэффициент, список пар (коэффициенты унитарного неприводимого множителя от старшей
+             степени к младшей, кратность)); множители упорядочены по степени, затем лексикографически.
+    """
+    poly = [int(c) % p for c in coeffs[::-1]]
+    f = _trim(np.array(poly, dtype=_dtype(p)))
+    if len(f) == 0:
+        raise ValueError("Нулевой многочлен нельзя разложить на множители")
+
+    lead = int(f[-1])
+    f = _monic(f, p)
+
+    factors = []
+    for square_free, multiplicity in square_free_decomposition(f, p):
+        for product, d in distinct_degree_factorization(square_free, p):
+            for factor in equal_degree_factorization(product, d, p, rng):
+                factors.append(([int(c) for c in factor[::-1]], multiplicity))
+
+    factors.sort(key=lambda item: (len(item[0]), item[0]))
+    return lead, factors
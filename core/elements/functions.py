@@ -1,6 +1,8 @@
 import numpy as np
 from typing import List
 
+from .cost_model import get_cost_model
+
 
 def karatsuba_multiply(coeffs1: List[int], coeffs2: List[int], p: int) -> List[int]:
     """
@@ -234,10 +236,15 @@ def mod_polynomial(poly1: np.poly1d, poly2: np.poly1d, p: int) -> np.poly1d:
 
     remainder = poly1_coeffs[:]
 
+    # Вычитаются только ненулевые члены делителя: для триномов и пентаномов шаг стоит O(1), а не O(n)
+    lead_inverse = inverse_in_field(poly2_coeffs[0], p)
+    nonzero_terms = [(i, c) for i, c in enumerate(poly2_coeffs) if c != 0]
+
     while len(remainder) >= len(poly2_coeffs):
-        coeff = (remainder[0] * inverse_in_field(poly2_coeffs[0], p)) % p
-        for i in range(len(poly2_coeffs)):
-            remainder[i] = (remainder[i] - coeff * poly2_coeffs[i]) % p
+        coeff = (remainder[0] * lead_inverse) % p
+        if coeff:
+            for i, c in nonzero_terms:
+                remainder[i] = (remainder[i] - coeff * c) % p
         remainder = remainder[1:] if remainder[0] == 0 else remainder
 
     if not remainder:
@@ -275,17 +282,149 @@ def mod_pow_polynomial(poly: np.poly1d, e: int, p: int, mod_poly: np.poly1d) ->
     return result
 
 
-def inverse_polynomial(poly: np.poly1d, p: int, modulus_poly: np.poly1d) -> np.poly1d:
+def multiply_polynomials(coeffs1: List[int], coeffs2: List[int], p: int, method: str = None) -> List[int]:
+    """
+    Умножает два многочлена с приведением по модулю p выбранным алгоритмом.
+
+    :param coeffs1: Коэффициенты первого многочлена (от старшей степени к младшей).
+    :param coeffs2: Коэффициенты второго многочлена (от старшей степени к младшей).
+    :param p: Модуль для конечного поля.
+    :param method: 'naive', 'karatsuba' или None - алгоритм выбирает модель стоимости (см. cost_model).
+    :return: Коэффициенты результирующего многочлена (от старшей степени к младшей).
+    """
+    if method is None:
+        method = get_cost_model().choose_multiplication(max(len(coeffs1), len(coeffs2)))
+
+    if method == 'karatsuba':
+        return karatsuba_multiply(coeffs1, coeffs2, p)
+    if method == 'naive':
+        return multiply_naive(coeffs1, coeffs2, p, reverse=True)
+    raise ValueError(f"Неизвестный алгоритм умножения: '{method}'")
+
+
+def _divmod_lists(a: List[int], b: List[int], p: int):
+    """Деление с остатком списков коэффициентов (от старшей степени к младшей, b без старших нулей)."""
+    remainder = a[:]
+    lead_inverse = inverse_in_field(b[0], p)
+    quotient = []
+    for _ in range(len(a) - len(b) + 1):
+        coeff = remainder[0] * lead_inverse % p
+        quotient.append(coeff)
+        if coeff:
+            for i, c in enumerate(b):
+                remainder[i] = (remainder[i] - coeff * c) % p
+        remainder.pop(0)
+
+    while len(remainder) > 1 and remainder[0] == 0:
+        remainder.pop(0)
+    return quotient or [0], remainder or [0]
+
+
+def inverse_polynomial_euclid(poly: np.poly1d, p: int, modulus_poly: np.poly1d) -> np.poly1d:
+    """
+    Вычисляет обратный многочлен по модулю modulus_poly расширенным алгоритмом Евклида.
+
+    Требует O(n^2) операций с коэффициентами вместо O(n^3 log p) у возведения в степень p^n - 2,
+    поэтому выгоднее при больших p и n. Как и inverse_polynomial, для нулевого многочлена возвращает ноль.
+
+    :param poly: Многочлен, для которого нужно найти обратный.
+    :param p: Характеристика конечного поля.
+    :param modulus_poly: Модульный многочлен, по которому выполняется операция.
+    :return: Обратный многочлен по модулю modulus_poly в поле GF(p^n).
+    """
+    if len(poly.coeffs) == 1:
+        return np.poly1d([inverse_in_field(int(poly.coeffs[0]), p)])
+
+    r0 = mod_coeffs(modulus_poly.coeffs, p).tolist()
+    r1 = mod_coeffs(poly.coeffs, p).tolist()
+    while len(r1) > 1 and r1[0] == 0:
+        r1.pop(0)
+
+    # Инвариант: s_i * poly = r_i (mod modulus_poly)
+    s0, s1 = [0], [1]
+    while any(r1):
+        quotient, remainder = _divmod_lists(r0, r1, p)
+        product = multiply_naive(quotient, s1, p, reverse=True)
+        width = max(len(s0), len(product))
+        s_next = [(a - b) % p for a, b in zip([0] * (width - len(s0)) + s0, [0] * (width - len(product)) + product)]
+        while len(s_next) > 1 and s_next[0] == 0:
+            s_next.pop(0)
+        r0, r1, s0, s1 = r1, remainder, s1, s_next
+
+    # НОД - ненулевая константа, если многочлен обратим; иначе (нулевой элемент) результат нулевой
+    if len(r0) > 1:
+        return np.poly1d([0])
+
+    scale = inverse_in_field(r0[0], p)
+    return np.poly1d([c * scale % p for c in s0])
+
+
+def inverse_polynomial(poly: np.poly1d, p: int, modulus_poly: np.poly1d, method: str = None) -> np.poly1d:
     """
     Вычисляет обратный многочлен по модулю другого многочлена в поле GF(p^n).
 
     :param poly: Многочлен, для которого нужно найти обратный.
     :param p: Характеристика конечного поля.
     :param modulus_poly: Модульный многочлен, по которому выполняется операция.
+    :param method: 'fermat' (возведение в степень p^n - 2), 'euclid' (расширенный алгоритм Евклида)
+                   или None - алгоритм выбирает модель стоимости (см. cost_model).
     :return: Обратный многочлен по модулю modulus_poly в поле GF(p^n).
     """
     if len(poly.coeffs) == 1:
         inverse_el = inverse_in_field(int(poly.coeffs[0]), p)
         return np.poly1d([inverse_el])
 
-    return mod_pow_polynomial(poly, p ** (len(modulus_poly.coeffs) - 1) - 2, p, modulus_poly)
+    n = len(modulus_poly.coeffs) - 1
+    if method is None:
+        method = get_cost_model().choose_inversion(p, n, int(np.count_nonzero(modulus_poly.coeffs)))
+
+    if method == 'euclid':
+        return inverse_polynomial_euclid(poly, p, modulus_poly)
+    if method == 'fermat':
+        return mod_pow_polynomial(poly, p ** n - 2, p, modulus_poly)
+    raise ValueError(f"Неизвестный алгоритм обращения: '{method}'")
+
+
+# Основания, при которых тест Миллера-Рабина точен для всех n < 3 317 044 064 679 887 385 961 981
+_MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+_MILLER_RABIN_LIMIT = 3317044064679887385961981
+
+
+def is_prime(n: int) -> bool:
+    """
+    Проверяет число на простоту.
+
+    Для n < 3.3 * 10^24 используется детерминированный тест Миллера-Рабина, для больших n - sympy.isprime
+    (sympy импортируется только в этом случае, чтобы не замедлять импорт библиотеки).
+
+    :param n: Проверяемое число.
+    :return: True, если n простое.
+    """
+    n = int(n)
+    if n < 2:
+        return False
+    for q in _MILLER_RABIN_BASES:
+        if n % q == 0:
+            return n == q
+
+    if n >= _MILLER_RABIN_LIMIT:
+        from sympy import isprime
+        return bool(isprime(n))
+
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for a in _MILLER_RABIN_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+
+    return True
@@ -137,12 +137,41 @@ def is_irreducible_benor(args):
     x_poly = [0, 1]  # Многочлен x
     m = n // 2
 
+    # x^(p^i) получается из x^(p^(i-1)) возведением в степень p (итерация Фробениуса),
+    # что избавляет от возведения в огромную степень p^i на каждом шаге
+    x_p_i = x_poly
     for i in range(1, m + 1):
-        exp_val = p ** i
-        x_p_i = poly_pow_mod(x_poly, exp_val, poly, p)
+        x_p_i = poly_pow_mod(x_p_i, p, poly, p)
         tmp = poly_sub(x_p_i, x_poly, p)
         g = poly_gcd(poly, tmp, p)
         if poly_is_zero(tmp) or poly_degree(g) > 0:
             return None
 
-    return poly[::-1]
\ No newline at end of file
+    return poly[::-1]
+
+
+def mobius(k):
+    """Функция Мёбиуса μ(k)."""
+    result = 1
+    d = 2
+    while d * d <= k:
+        if k % d == 0:
+            k //= d
+            if k % d == 0:
+                return 0
+            result = -result
+        d += 1
+    if k > 1:
+        result = -result
+    return result
+
+
+def count_irreducible_polynomials(p, n):
+    """
+    Возвращает точное число унитарных неприводимых многочленов степени n над GF(p)
+    по формуле Гаусса: (1/n) * Σ_{d | n} μ(d) * p^(n/d).
+
+    Число всех неприводимых многочленов степени n (с любым ненулевым старшим коэффициентом) в p - 1 раз больше.
+    """
+    total = sum(mobius(d) * p ** (n // d) for d in range(1, n + 1) if n % d == 0)
+    return total // n
@@ -0,0 +1,162 @@
+import sys
+import threading
+from collections import OrderedDict
+
+
+def memo_field_key(p, modulus_coeffs=None):
+    """
+    Ключ поля для кэша результатов: (p,) для GF(p) и (p, коэффициенты модуля) для GF(p^n).
+
+    :param p: Характеристика поля.
+    :param modulus_coeffs: Коэффициенты модуля (от старшей степени к младшей) или None для простого поля.
+    """
+    if modulus_coeffs is None:
+        return (int(p),)
+
+    coeffs = [int(c) for c in modulus_coeffs]
+    # Старшие нули не меняют модуль (np.poly1d их отбрасывает), поэтому не должны менять и ключ
+    while len(coeffs) > 1 and coeffs[0] == 0:
+        coeffs.pop(0)
+    return (int(p), tuple(coeffs))
+
+
+def _estimate_size(obj):
+    """Приблизительный размер объекта в байтах (кортежи и списки учитываются вместе с содержимым)."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (tuple, list)):
+        size += sum(_estimate_size(item) for item in obj)
+    return size
+
+
+class OperationMemo:
+    """
+    LRU-кэш результатов арифметики в полях с ключами (ключ поля, операция, операнды).
+
+    Операнды и результаты хранятся в канонической форме - кортежах целых коэффициентов, поэтому
+    кэш не удерживает объекты элементов и не зависит от их изменения. Когда число записей или их
+    суммарный размер превышает лимит, вытесняются давно не использованные записи.
+    """
+    def __init__(self, max_entries=4096, max_bytes=16 * 1024 * 1024):
+        """
+        :param max_entries: Наибольшее число записей.
+        :param max_bytes: Наибольший суммарный (приблизительный) размер ключей и результатов в байтах.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, key):
+        """Возвращает пару (найдено ли, результат)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def store(self, key, value):
+        size = _estimate_size(key) + _estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, field_key=None):
+        """Удаляет записи поля field_key (по умолчанию - все записи)."""
+        with self._lock:
+            if field_key is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+
+            for key in [key for key in self._entries if key[0] == field_key]:
+                self._bytes -= self._entries.pop(key)[1]
+
+    def stats(self):
+        """Словарь со статистикой: попадания, промахи, доля попаданий, число записей, размер, вытеснения."""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'evictions': self.evictions,
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# Кэш выключен, пока его явно не включат (enable_memo): библиотека по умолчанию ничего не запоминает
+_memo = None
+
+
+def enable_memo(max_entries=4096, max_bytes=16 * 1024 * 1024):
+    """
+    Включает кэш результатов операций для всего процесса. Если кэш уже включён, он сохраняется
+    (с новыми лимитами).
+
+    :return: Объект кэша (OperationMemo).
+    """
+    global _memo
+    if _memo is None:
+        _memo = OperationMemo(max_entries, max_bytes)
+    else:
+        _memo.max_entries = max_entries
+        _memo.max_bytes = max_bytes
+    return _memo
+
+
+def disable_memo():
+    """Выключает кэш результатов операций и освобождает его записи."""
+    global _memo
+    _memo = None
+
+
+def get_memo():
+    """Возвращает включённый кэш (OperationMemo) или None, если кэш выключен."""
+    return _memo
+
+
+def memoized(field_key, op, operands, compute):
+    """
+    Возвращает результат compute() из кэша или вычисляет и запоминает его (если кэш включён).
+
+    :param field_key: Ключ поля (см. memo_field_key).
+    :param op: Название операции.
+    :param operands: Кортеж операндов в канонической форме (кортежи целых коэффициентов).
+    :param compute: Функция без аргументов, вычисляющая результат в канонической форме.
+    """
+    memo = _memo
+    if memo is None:
+        return compute()
+
+    key = (field_key, op, operands)
+    found, value = memo.lookup(key)
+    if found:
+        return value
+
+    value = compute()
+    memo.store(key, value)
+    return value
@@ -0,0 +1,72 @@
+from .irreducibility_test import (
+    poly_trim,
+    poly_is_zero,
+    poly_degree,
+    poly_scalar_mul,
+    poly_pow_mod,
+    is_irreducible_benor,
+)
+
+
+def factor_field_order(p, n):
+    """
+    Раскладывает порядок мультипликативной группы поля p^n - 1 на простые множители.
+
+    Используется разложение p^n - 1 = Π Φ_d(p) по делителям d числа n (Φ_d - круговые многочлены),
+    поэтому факторизуются значительно меньшие числа, чем само p^n - 1.
+
+    Возвращает словарь {простой делитель: кратность}.
+    """
+    # sympy нужен только для факторизации, поэтому импортируется при первом вызове, а не вместе с библиотекой
+    from sympy import cyclotomic_poly, divisors, factorint
+
+    factors = {}
+    for d in divisors(n):
+        for q, e in factorint(int(cyclotomic_poly(d, p))).items():
+            factors[q] = factors.get(q, 0) + e
+
+    return factors
+
+
+def is_primitive(p, coeffs, order_factors=None):
+    """
+    Проверяет, является ли многочлен примитивным над GF(p).
+
+    Многочлен степени n примитивен, если он неприводим и x порождает мультипликативную группу
+    поля GF(p)[x]/(f), т.е. x^((p^n - 1) / q) != 1 для каждого простого делителя q числа p^n - 1.
+    Старший коэффициент не обязан быть равен 1: проверяется ассоциированный унитарный многочлен.
+
+    Параметры:
+    - p: модуль конечного поля (размер поля).
+    - coeffs: коэффициенты проверяемого многочлена (от старшей степени к младшей).
+    - order_factors: разложение p^n - 1 в виде {q: кратность}; если не задано, вычисляется.
+
+    Возвращает:
+    - True, если многочлен примитивен, иначе False.
+    """
+    poly = poly_trim([int(c) % p for c in coeffs[::-1]])
+
+    if poly_is_zero(poly):
+        return False
+
+    n = poly_degree(poly)
+
+    if n == 0 or poly[0] == 0:
+        return False
+
+    poly = poly_scalar_mul(poly, pow(poly[-1], p - 2, p), p)
+
+    if is_irreducible_benor((p, poly)) is None:
+        return False
+
+    if order_factors is None:
+        order_factors = factor_field_order(p, n)
+
+    order = p ** n - 1
+    x_poly = [0, 1]  # Многочлен x
+
+    for q in order_factors:
+        if poly_pow_mod(x_poly, order // q, poly, p) == [1]:
+            return False
+
+    return True
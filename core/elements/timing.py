@@ -0,0 +1,180 @@
+import functools
+import json
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+
+# Верхние границы корзин гистограмм в секундах (1 мкс ... 10 с, шаг 1 - 2.5 - 5); последняя корзина - бесконечность
+BUCKETS = tuple(float(f"{base}e{exponent}") for exponent in range(-6, 1) for base in (1, 2.5, 5)) + (10.0,)
+
+# Название метрики в формате Prometheus
+PROMETHEUS_METRIC = 'galois_operation_duration_seconds'
+
+
+class LatencyHistogram:
+    """Гистограмма длительностей одной операции: число, сумма, минимум, максимум и счётчики по корзинам BUCKETS."""
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def quantile(self, q):
+        """
+        Оценка квантиля по корзинам (линейная интерполяция внутри корзины, как histogram_quantile в Prometheus).
+
+        :param q: Уровень квантиля от 0 до 1.
+        :return: Длительность в секундах или None, если замеров нет.
+        """
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            if count and seen + count >= rank:
+                lower = BUCKETS[index - 1] if index else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else self.max
+                value = lower + (upper - lower) * (rank - seen) / count
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+    def summary(self):
+        """Словарь со сводкой: число, сумма, среднее, минимум, p50, p95, p99, максимум (в секундах) и корзины."""
+        cumulative = 0
+        buckets = []
+        for bound, count in zip(BUCKETS + (float('inf'),), self.buckets):
+            cumulative += count
+            buckets.append(['+Inf' if bound == float('inf') else bound, cumulative])
+        return {
+            'count': self.count,
+            'sum': self.total,
+            'mean': self.total / self.count if self.count else None,
+            'min': self.min,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': self.max,
+            'buckets': buckets,
+        }
+
+
+class OperationTimings:
+    """
+    Гистограммы длительностей по операциям (создание поля, арифметика, обращение, вычисление значения,
+    пакеты поиска, обращения к базе данных) с выгрузкой в JSON и в текстовом формате Prometheus.
+    """
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, op, seconds):
+        with self._lock:
+            histogram = self._histograms.get(op)
+            if histogram is None:
+                histogram = self._histograms[op] = LatencyHistogram()
+            histogram.add(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def summary(self):
+        """Словарь {операция: сводка гистограммы} (см. LatencyHistogram.summary), отсортированный по операциям."""
+        with self._lock:
+            return {op: histogram.summary() for op, histogram in sorted(self._histograms.items())}
+
+    def export_json(self):
+        return json.dumps(self.summary(), ensure_ascii=False, indent=2)
+
+    def export_prometheus(self, metric=PROMETHEUS_METRIC):
+        """Гистограммы в текстовом формате Prometheus (метка op - название операции)."""
+        lines = [f"# HELP {metric} Длительность операций с полями Галуа в секундах",
+                 f"# TYPE {metric} histogram"]
+        for op, summary in self.summary().items():
+            label = op.replace('\\', '\\\\').replace('"', '\\"')
+            for bound, cumulative in summary['buckets']:
+                le = bound if bound == '+Inf' else repr(bound)
+                lines.append(f'{metric}_bucket{{op="{label}",le="{le}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{op="{label}"}} {summary["sum"]!r}')
+            lines.append(f'{metric}_count{{op="{label}"}} {summary["count"]}')
+        return "\n".join(lines) + "\n"
+
+    def __len__(self):
+        return len(self._histograms)
+
+
+# Замеры выключены, пока их явно не включат (enable_timings): выключенный замер - одна проверка на None
+_timings = None
+
+
+def enable_timings():
+    """
+    Включает замеры длительности операций для всего процесса (если они уже включены, собранное сохраняется).
+
+    :return: Объект с гистограммами (OperationTimings).
+    """
+    global _timings
+    if _timings is None:
+        _timings = OperationTimings()
+    return _timings
+
+
+def disable_timings():
+    """Выключает замеры длительности операций и освобождает собранные гистограммы."""
+    global _timings
+    _timings = None
+
+
+def get_timings():
+    """Возвращает включённые замеры (OperationTimings) или None, если они выключены."""
+    return _timings
+
+
+def instrumented(op):
+    """
+    Декоратор: длительность каждого вызова функции записывается в гистограмму операции op (если замеры включены).
+
+    :param op: Название операции, например 'extension.mul'.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            timings = _timings
+            if timings is None:
+                return fn(*args, **kwargs)
+
+            start = perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings.record(op, perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def timed(op):
+    """Контекстный менеджер: длительность блока записывается в гистограмму операции op (если замеры включены)."""
+    timings = _timings
+    if timings is None:
+        yield
+        return
+
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        timings.record(op, perf_counter() - start)
@@ -0,0 +1,545 @@
+"""
+Компилятор выражений над полями GF(p) и GF(p^n).
+
+Выражение вида "(a*b + c)/(a - d)^3" разбирается один раз и превращается в план - последовательность
+элементарных операций (сложение, вычитание, умножение, обращение):
+- одинаковые подвыражения вычисляются один раз (сложение и умножение считаются коммутативными);
+- степени раскладываются на возведения в квадрат и умножения, показатель приводится по модулю p^n - 1;
+- подвыражения из одних констант вычисляются при компиляции;
+- деление заменяется умножением на обратный элемент, а независимые обращения объединяются: при вычислении
+  на отдельных элементах k обращений заменяются одним обращением и 3(k - 1) умножениями (приём Монтгомери),
+  при векторизованном вычислении все они выполняются одним проходом BatchField.
+
+Синтаксис: переменные (a, x1, alpha), целые константы, списки коэффициентов от старшей степени к младшей
+([1, 0, 1] - элемент x^2 + 1 поля GF(p^n)), операции + - * / ^ (или **) с целым, возможно отрицательным,
+показателем, унарный минус, скобки и функция inv(...).
+"""
+import re
+
+import numpy as np
+
+from .GaloisFieldSimple import GaloisFieldSimple
+from .elements import GaloisFieldSimpleElement, format_polynomial
+from .elements.batch import get_batch_field
+from .elements.timing import instrumented
+
+TOKEN_PATTERN = re.compile(r'\s*(?:(\d+)|([A-Za-z_][A-Za-z_0-9]*)|(\*\*|[-+*/^(),\[\]]))')
+
+# Обозначения операций плана при выводе
+OP_SYMBOLS = {'add': '+', 'sub': '-', 'mul': '*'}
+
+
+class ExpressionError(ValueError):
+    """Ошибка в тексте выражения или в значениях его переменных."""
+
+
+def _tokenize(source):
+    tokens = []
+    position = 0
+    source = source.rstrip()
+    while position < len(source):
+        match = TOKEN_PATTERN.match(source, position)
+        if match is None or match.end() == position:
+            raise ExpressionError(f"Неожиданный символ '{source[position:].lstrip()[:1]}' в позиции {position + 1}")
+        number, name, symbol = match.groups()
+        if number is not None:
+            tokens.append(('number', int(number), match.start(1)))
+        elif name is not None:
+            tokens.append(('name', name, match.start(2)))
+        else:
+            tokens.append(('symbol', '^' if symbol == '**' else symbol, match.start(3)))
+        position = match.end()
+    tokens.append(('end', None, len(source)))
+    return tokens
+
+
+class _Parser:
+    """Разбор выражения рекурсивным спуском; результат - дерево из кортежей."""
+    def __init__(self, source):
+        self.tokens = _tokenize(source)
+        self.index = 0
+
+    def parse(self):
+        tree = self._sum()
+        kind, value, position = self.tokens[self.index]
+        if kind != 'end':
+            raise ExpressionError(f"Лишний фрагмент '{value}' в позиции {position + 1}")
+        return tree
+
+    def _peek(self, *symbols):
+        kind, value, _ = self.tokens[self.index]
+        return kind == 'symbol' and value in symbols
+
+    def _expect(self, symbol):
+        kind, value, position = self.tokens[self.index]
+        if kind != 'symbol' or value != symbol:
+            found = "конец выражения" if kind == 'end' else f"'{value}'"
+            raise ExpressionError(f"Ожидался символ '{symbol}' в позиции {position + 1}, найден {found}")
+        self.index += 1
+
+    def _sum(self):
+        tree = self._product()
+        while self._peek('+', '-'):
+            op = 'add' if self.tokens[self.index][1] == '+' else 'sub'
+            self.index += 1
+            tree = (op, tree, self._product())
+        return tree
+
+    def _product(self):
+        tree = self._unary()
+        while self._peek('*', '/'):
+            op = 'mul' if self.tokens[self.index][1] == '*' else 'div'
+            self.index += 1
+            tree = (op, tree, self._unary())
+        return tree
+
+    def _unary(self):
+        if self._peek('-'):
+            self.index += 1
+            return ('neg', self._unary())
+        if self._peek('+'):
+            self.index += 1
+            return self._unary()
+        return self._power()
+
+    def _power(self):
+        tree = self._atom()
+        if not self._peek('^'):
+            return tree
+
+        self.index += 1
+        sign = 1
+        if self._peek('-'):
+            sign = -1
+            self.index += 1
+        kind, value, position = self.tokens[self.index]
+        if kind != 'number':
+            raise ExpressionError(f"Показатель степени в позиции {position + 1} должен быть целым числом")
+        self.index += 1
+        if self._peek('^'):
+            raise ExpressionError(f"Неоднозначная степень в позиции {self.tokens[self.index][2] + 1}: "
+                                  f"расставьте скобки")
+        return ('pow', tree, sign * value)
+
+    def _atom(self):
+        kind, value, position = self.tokens[self.index]
+        self.index += 1
+
+        if kind == 'number':
+            return ('const', value)
+        if kind == 'name':
+            if self._peek('('):
+                if value != 'inv':
+                    raise ExpressionError(f"Неизвестная функция '{value}' в позиции {position + 1}")
+                self.index += 1
+                tree = self._sum()
+                self._expect(')')
+                return ('inv', tree)
+            return ('var', value)
+        if value == '(':
+            tree = self._sum()
+            self._expect(')')
+            return tree
+        if value == '[':
+            coeffs = [self._coefficient()]
+            while self._peek(','):
+                self.index += 1
+                coeffs.append(self._coefficient())
+            self._expect(']')
+            return ('const', tuple(coeffs))
+
+        found = "конец выражения" if kind == 'end' else f"'{value}'"
+        raise ExpressionError(f"Ожидался операнд в позиции {position + 1}, найден {found}")
+
+    def _coefficient(self):
+        sign = 1
+        if self._peek('-'):
+            sign = -1
+            self.index += 1
+        kind, value, position = self.tokens[self.index]
+        if kind != 'number':
+            raise ExpressionError(f"Коэффициент в позиции {position + 1} должен быть целым числом")
+        self.index += 1
+        return sign * value
+
+
+class CompiledExpression:
+    """
+    Скомпилированное выражение над полем: план вычисления и его выполнение на элементах или на порциях.
+
+    Узлы плана пронумерованы; каждый узел - кортеж (операция, аргументы): ('var', имя), ('const', элемент),
+    ('add' | 'sub' | 'mul', i, j), ('neg', i), ('inv', i). Шаги плана - ('op', узел) или ('inv', [узлы]) -
+    обращение нескольких узлов сразу.
+    """
+    def __init__(self, source, field):
+        """
+        :param source: Текст выражения.
+        :param field: Поле (GaloisFieldSimple или GaloisFieldExtension).
+        :raise ExpressionError: Если выражение некорректно.
+        """
+        self.source = source
+        self.field = field
+        self.p = field.p
+        if isinstance(field, GaloisFieldSimple):
+            self.modulus = (1, 0)
+        else:
+            self.modulus = tuple(int(c) for c in field.modulus_polynomial.coeffs)
+        self.n = len(self.modulus) - 1
+        self.order = self.p ** self.n
+
+        self.nodes = []
+        self.variables = []
+        self.requested = 0
+        self._index = {}
+
+        root = self._lower(_Parser(source).parse())
+        self.root = root
+        self.steps = self._schedule(root)
+
+    # --- Построение плана ---
+
+    def _element(self, value):
+        """Элемент поля из числа, списка коэффициентов или элемента."""
+        if isinstance(value, GaloisFieldSimpleElement) or hasattr(value, 'poly'):
+            return value
+        if isinstance(self.field, GaloisFieldSimple):
+            if isinstance(value, (list, tuple)):
+                if len(value) != 1:
+                    raise ExpressionError(f"Элемент поля GF({self.p}) задаётся одним числом, получено: {list(value)}")
+                value = value[0]
+            return self.field.create_element(int(value))
+        if isinstance(value, (int, np.integer)):
+            value = [value]
+        return self.field.create_element([int(c) for c in value])
+
+    def _key(self, element):
+        """Каноническая форма элемента для сравнения констант."""
+        if isinstance(element, GaloisFieldSimpleElement):
+            return (int(element.value),)
+        return tuple(int(c) for c in element.poly.coeffs)
+
+    def _is_zero(self, element):
+        return not any(self._key(element))
+
+    def _node(self, op, *args):
+        """Добавляет узел (или возвращает номер такого же, уже существующего)."""
+        if op in ('add', 'mul'):
+            args = tuple(sorted(args))
+
+        constants = [self.nodes[arg][1] for arg in args if self.nodes[arg][0] == 'const'] if op != 'var' else []
+        if op not in ('var', 'const') and len(constants) == len(args):
+            # Подвыражение из одних констант вычисляется сразу
+            return self._constant(self._apply(op, constants))
+
+        # Сложение с нулём и умножение на единицу (или на ноль) не требуют вычислений
+        identity = self._identity(op, args)
+        if identity is not None:
+            return identity
+
+        self.requested += 1
+        key = (op,) + args
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self.nodes)
+            self.nodes.append(key)
+        return index
+
+    def _constant_value(self, index):
+        """Значение узла-константы как кортеж коэффициентов или None, если узел не константа."""
+        node = self.nodes[index]
+        return self._key(node[1]) if node[0] == 'const' else None
+
+    def _identity(self, op, args):
+        if op not in ('add', 'sub', 'mul'):
+            return None
+        values = [self._constant_value(arg) for arg in args]
+        zero, one = (0,), (1,)
+        if op == 'add' and zero in values:
+            return args[1 - values.index(zero)]
+        if op == 'sub' and values[1] == zero:
+            return args[0]
+        if op == 'mul' and zero in values:
+            return args[values.index(zero)]
+        if op == 'mul' and one in values:
+            return args[1 - values.index(one)]
+        return None
+
+    def _constant(self, element):
+        key = ('const', self._key(element))
+        index = self._index.get(key)
+        if index is None:
+            index = self._index[key] = len(self.nodes)
+            self.nodes.append(('const', element))
+        return index
+
+    def _apply(self, op, values):
+        if op == 'add':
+            return values[0] + values[1]
+        if op == 'sub':
+            return values[0] - values[1]
+        if op == 'mul':
+            return values[0] * values[1]
+        if op == 'neg':
+            return self._element(0) - values[0]
+        if self._is_zero(values[0]):
+            raise ExpressionError("Деление на ноль в константной части выражения")
+        return values[0].inverse()
+
+    def _lower(self, tree):
+        kind = tree[0]
+        if kind == 'var':
+            if tree[1] not in self.variables:
+                self.variables.append(tree[1])
+            return self._node('var', tree[1])
+        if kind == 'const':
+            try:
+                return self._constant(self._element(list(tree[1]) if isinstance(tree[1], tuple) else tree[1]))
+            except ValueError as e:
+                raise ExpressionError(str(e))
+        if kind == 'neg':
+            return self._node('neg', self._lower(tree[1]))
+        if kind == 'inv':
+            return self._node('inv', self._lower(tree[1]))
+        if kind == 'div':
+            return self._node('mul', self._lower(tree[1]), self._node('inv', self._lower(tree[2])))
+        if kind == 'pow':
+            return self._power(self._lower(tree[1]), tree[2])
+        return self._node(kind, self._lower(tree[1]), self._lower(tree[2]))
+
+    def _power(self, base, exponent):
+        if exponent == 0:
+            return self._constant(self._element(1))
+        if exponent < 0:
+            base, exponent = self._node('inv', base), -exponent
+
+        # x^(p^n) = x для всех элементов поля (и для нуля), поэтому показатель приводится к 1..p^n - 1
+        exponent = (exponent - 1) % (self.order - 1) + 1
+        result = base
+        for bit in bin(exponent)[3:]:
+            result = self._node('mul', result, result)
+            if bit == '1':
+                result = self._node('mul', result, base)
+        return result
+
+    def _schedule(self, root):
+        """
+        Порядок вычисления узлов, нужных для root. Обращения группируются по стадиям: стадия обращения
+        на единицу больше стадии, после которой доступен его аргумент, и все обращения одной стадии
+        выполняются вместе.
+        """
+        needed = set()
+        stack = [root]
+        while stack:
+            index = stack.pop()
+            if index in needed:
+                continue
+            needed.add(index)
+            node = self.nodes[index]
+            if node[0] not in ('var', 'const'):
+                stack.extend(node[1:])
+
+        # Узлы добавляются после своих аргументов, поэтому порядок номеров - топологический
+        stage = {}
+        for index in sorted(needed):
+            node = self.nodes[index]
+            if node[0] in ('var', 'const'):
+                stage[index] = 0
+            elif node[0] == 'inv':
+                stage[index] = stage[node[1]] + 1
+            else:
+                stage[index] = max(stage[arg] for arg in node[1:])
+
+        # На каждой стадии сначала обращаются все её аргументы-обращения, затем выполняются остальные операции
+        steps = []
+        for current in range(max(stage.values()) + 1):
+            inversions = [index for index in sorted(needed) if stage[index] == current and self.nodes[index][0] == 'inv']
+            if inversions:
+                steps.append(('inv', inversions))
+            steps.extend(('op', index) for index in sorted(needed)
+                         if stage[index] == current and self.nodes[index][0] not in ('var', 'const', 'inv'))
+        return steps
+
+    # --- Сведения о плане ---
+
+    def counts(self):
+        """
+        Число операций: requested - в выражении как записано (степени - по схеме возведения в квадрат),
+        operations - в плане после устранения повторов, inversions - обращений, inversion_batches - групп
+        обращений (столько обращений выполняется на самом деле).
+        """
+        counts = {'requested': self.requested, 'operations': 0, 'multiplications': 0, 'inversions': 0,
+                  'inversion_batches': 0}
+        for step in self.steps:
+            if step[0] == 'inv':
+                counts['inversions'] += len(step[1])
+                counts['inversion_batches'] += 1
+                counts['operations'] += len(step[1])
+            else:
+                counts['operations'] += 1
+                counts['multiplications'] += self.nodes[step[1]][0] == 'mul'
+        return counts
+
+    def _name(self, index):
+        node = self.nodes[index]
+        if node[0] == 'var':
+            return node[1]
+        if node[0] == 'const':
+            return self._format(node[1])
+        return f"t{index}"
+
+    def _format(self, element):
+        if isinstance(element, GaloisFieldSimpleElement):
+            return str(element.value)
+        return f"({format_polynomial(element.poly)})"
+
+    def describe(self):
+        """План вычисления построчно: t3 = a * b, t5, t7 = inv(t4), inv(t6) и т. д."""
+        lines = []
+        for step in self.steps:
+            if step[0] == 'inv':
+                targets = ", ".join(f"t{index}" for index in step[1])
+                values = ", ".join(f"inv({self._name(self.nodes[index][1])})" for index in step[1])
+                suffix = f"  # одно обращение на {len(step[1])} элемента" if len(step[1]) > 1 else ""
+                lines.append(f"{targets} = {values}{suffix}")
+                continue
+            node = self.nodes[step[1]]
+            if node[0] == 'neg':
+                lines.append(f"t{step[1]} = -{self._name(node[1])}")
+            else:
+                lines.append(f"t{step[1]} = {self._name(node[1])} {OP_SYMBOLS[node[0]]} {self._name(node[2])}")
+        lines.append(f"результат = {self._name(self.root)}")
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.describe()
+
+    # --- Вычисление на элементах ---
+
+    @instrumented('expression.evaluate')
+    def evaluate(self, bindings=None, **values):
+        """
+        Значение выражения на элементах поля.
+
+        :param bindings: Словарь {имя переменной: значение}; значения можно передать и именованными аргументами.
+                         Значение - элемент поля, число или список коэффициентов (от старшей степени к младшей).
+        :return: Элемент поля.
+        :raise ZeroDivisionError: Если при вычислении встречается обращение нуля.
+        :raise ExpressionError: Если не задано значение какой-либо переменной.
+        """
+        bindings = dict(bindings or {}, **values)
+        results = {}
+        for index, node in enumerate(self.nodes):
+            if node[0] == 'const':
+                results[index] = node[1]
+        for name in self.variables:
+            if name not in bindings:
+                raise ExpressionError(f"Не задано значение переменной '{name}'")
+            results[self._index[('var', name)]] = self._element(bindings[name])
+
+        for step in self.steps:
+            if step[0] == 'inv':
+                targets = step[1]
+                inverses = self._invert_all([results[self.nodes[index][1]] for index in targets])
+                results.update(zip(targets, inverses))
+            else:
+                node = self.nodes[step[1]]
+                results[step[1]] = self._apply(node[0], [results[arg] for arg in node[1:]])
+        return results[self.root]
+
+    def _invert_all(self, values):
+        """Обратные элементы для values одним обращением (приём Монтгомери)."""
+        if any(self._is_zero(value) for value in values):
+            raise ZeroDivisionError("Деление на ноль")
+        if len(values) == 1:
+            return [values[0].inverse()]
+
+        prefix = [values[0]]
+        for value in values[1:]:
+            prefix.append(prefix[-1] * value)
+
+        inverse = prefix[-1].inverse()
+        result = [None] * len(values)
+        for i in range(len(values) - 1, 0, -1):
+            result[i] = inverse * prefix[i - 1]
+            inverse = inverse * values[i]
+        result[0] = inverse
+        return result
+
+    # --- Векторизованное вычисление ---
+
+    @instrumented('expression.evaluate_batch')
+    def evaluate_batch(self, bindings):
+        """
+        Значения выражения сразу для многих наборов значений переменных (векторизованно, см. BatchField).
+
+        :param bindings: Словарь {имя переменной: список значений} - списки одной длины; значение - число
+                         или список коэффициентов (от старшей степени к младшей).
+        :return: Список результатов по наборам: пары (результат, запись) - результат число для GF(p) и список
+                 коэффициентов для GF(p^n) - или строки с текстом ошибки.
+        :raise ExpressionError: Если значения переменных заданы некорректно.
+        """
+        field = get_batch_field(self.p, self.modulus)
+        sizes = set()
+        for name in self.variables:
+            if name not in bindings:
+                raise ExpressionError(f"Не заданы значения переменной '{name}'")
+            sizes.add(len(bindings[name]))
+        if len(sizes) > 1:
+            raise ExpressionError("Списки значений переменных должны быть одной длины")
+        size = sizes.pop() if sizes else 1
+
+        def rows(values):
+            try:
+                return field.rows([[int(value)] if isinstance(value, (int, np.integer)) else [int(c) for c in value]
+                                   for value in values])
+            except (TypeError, ValueError):
+                raise ExpressionError("Значение переменной должно быть числом или списком коэффициентов")
+
+        results = {}
+        for index, node in enumerate(self.nodes):
+            if node[0] == 'const':
+                results[index] = np.tile(rows([list(self._key(node[1]))]), (size, 1))
+        for name in self.variables:
+            results[self._index[('var', name)]] = rows(bindings[name])
+
+        failed = np.zeros(size, dtype=bool)
+        for step in self.steps:
+            if step[0] == 'inv':
+                stacked = np.concatenate([results[self.nodes[index][1]] for index in step[1]])
+                zero = field.is_zero(stacked)
+                failed |= zero.reshape(len(step[1]), size).any(axis=0)
+                # Нули заменяются единицами, чтобы обращение остальных строк шло одним проходом
+                stacked[zero] = 0
+                stacked[zero, 0] = 1
+                inverses = field.inverse(stacked)
+                for k, index in enumerate(step[1]):
+                    results[index] = inverses[k * size:(k + 1) * size]
+            else:
+                node = self.nodes[step[1]]
+                args = [results[arg] for arg in node[1:]]
+                if node[0] == 'neg':
+                    results[step[1]] = field.sub(np.zeros_like(args[0]), args[0])
+                else:
+                    results[step[1]] = getattr(field, node[0])(*args)
+
+        output = []
+        for row_failed, coeffs in zip(failed, field.coefficients(results[self.root])):
+            if row_failed:
+                output.append("Деление на ноль")
+            elif self.modulus == (1, 0):
+                output.append((coeffs[0], str(coeffs[0])))
+            else:
+                output.append((coeffs, format_polynomial(np.poly1d(coeffs))))
+        return output
+
+
+def compile_expression(source, field):
+    """
+    Компилирует выражение над полем.
+
+    :param source: Текст выражения, например "(a*b + c)/(a - d)^3".
+    :param field: Поле (GaloisFieldSimple или GaloisFieldExtension).
+    :return: Скомпилированное выражение (CompiledExpression).
+    :raise ExpressionError: Если выражение некорректно.
+    """
+    return CompiledExpression(source, field)
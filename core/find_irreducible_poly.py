@@ -1,33 +1,716 @@
-import os
-from elements import is_irreducible_benor
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import random
+import itertools
+from collections import deque
+from contextlib import closing
+import numpy as np
+from time import perf_counter
+from datetime import datetime
+from .elements import is_irreducible_benor, is_primitive, factor_field_order
+from .elements.timing import instrumented, timed
+from concurrent.futures import wait, FIRST_COMPLETED
 
+from .search_pool import get_search_pool
+from .catalog_file import get_catalog, CATALOG_PATH
+from .db import (
+    initialize_database,
+    iter_saved_polynomials,
+    save_polynomials_to_db,
+    mark_enumeration_complete,
+    is_enumeration_complete,
+    get_order_factorization,
+    save_order_factorization,
+    get_fastest_modulus,
+    save_fastest_modulus,
+    get_search_checkpoint,
+    get_search_hits,
+    save_search_checkpoint,
+)
 
-def find_irreducible_polynomials_batch(p, n, batch_size, offset=0):
+# Максимальное число кандидатов p^n, для которого решето помещается в память
+SIEVE_MAX_CANDIDATES = 1 << 24
+
+# Сколько унитарных многочленов обрабатывается решетом за один векторный шаг
+SIEVE_BLOCK_SIZE = 1 << 16
+
+# Сколько случайных кандидатов проверяет один процесс за одно задание
+RANDOM_CHUNK_SIZE = 32
+
+# Как часто (в секундах) продолжаемый поиск сохраняет свой ход в базе данных
+CHECKPOINT_SECONDS = 2.0
+
+# Наибольшее число находок в одном шаге продолжаемого поиска, выдаваемом из базы данных или файла каталога
+RESUMED_HITS_CHUNK = 64
+
+# Наибольшее число ненулевых членов в многочленах, перебираемых поиском модулей малого веса
+MAX_LOW_WEIGHT = 5
+
+# Сколько кандидатов малого веса проверяет один процесс за одно задание
+LOW_WEIGHT_CHUNK_SIZE = 16
+
+
+def _candidate_coeffs(index, p, n):
+    """
+    Возвращает коэффициенты (от младшей степени к старшей) кандидата с номером index.
+
+    Номера [0, p^n) соответствуют унитарным многочленам, далее идут многочлены со старшим коэффициентом 2, 3, ..., p-1.
+    """
+    # Ведущий коэффициент от 1 до p-1
+    leading_coeff = (index // (p ** n)) + 1
+    rest_index = index % (p ** n)
+    coeffs = []
+    temp = rest_index
+    for _ in range(n):
+        coeffs.append(temp % p)
+        temp = temp // p
+
+    return coeffs + [leading_coeff]
+
+
+def _scan_irreducible_range(p, n, start, stop):
+    """
+    Проверяет кандидатов с номерами [start, stop) тестом Бен-Ора (выполняется в процессе пула).
+
+    Возвращает номера неприводимых многочленов и время проверки.
+    """
+    started = perf_counter()
+    hits = [index for index in range(start, stop)
+            if is_irreducible_benor((p, _candidate_coeffs(index, p, n))) is not None]
+
+    return hits, perf_counter() - started
+
+
+def _iter_ranges(scan_fn, p, n, start, stop, args=(), order="lex", max_in_flight=None):
+    """
+    Проверяет кандидатов с номерами [start, stop) функцией scan_fn в долгоживущем пуле процессов.
+
+    Выдаёт пары (конец проверенного диапазона, номера находок в нём). При order="lex" диапазоны выдаются
+    по порядку, так что конец очередного диапазона - это номер, до которого все кандидаты уже проверены.
+    В работе одновременно находится не больше max_in_flight диапазонов (вместе с проверенными, но ещё
+    не выданными); при закрытии генератора ещё не начатые задания отменяются.
+    """
+    if order not in ("lex", "unordered"):
+        raise ValueError(f"Неизвестный порядок перебора: {order}")
+
+    pool = get_search_pool()
+    max_in_flight = max_in_flight or 2 * pool.max_workers
+
+    pending = {}
+    finished = {}
+    submitted = deque()
+    position = start
+
+    try:
+        while position < stop or pending:
+            while position < stop and len(pending) + len(finished) < max_in_flight:
+                end = min(position + pool.chunk_size(scan_fn, p, n), stop)
+                pending[pool.submit_range(scan_fn, p, n, position, end, *args)] = (position, end)
+                if order == "lex":
+                    # Очередь начал диапазонов нужна только для выдачи по порядку
+                    submitted.append(position)
+                position = end
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                range_start, range_end = pending.pop(future)
+                hits, elapsed = future.result()
+                pool.record(scan_fn, p, n, range_end - range_start, elapsed)
+                if order == "lex":
+                    finished[range_start] = (range_end, hits)
+                else:
+                    yield range_end, hits
+
+            while submitted and submitted[0] in finished:
+                yield finished.pop(submitted.popleft())
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _catalog_prefix(p, n, start, stop):
+    """
+    Если в файле каталога есть все унитарные неприводимые многочлены степени n, берёт из него находки
+    с номерами [start, min(stop, p^n)) вместо перебора.
+
+    :return: Список пар (номер кандидата, коэффициенты) и номер, с которого перебор нужно продолжить.
+    """
+    catalog = get_catalog()
+    if catalog is None or start >= p ** n or not catalog.is_complete(p, n):
+        return [], start
+
+    stop = min(stop, p ** n)
+    return list(catalog.iter_range(p, n, start, stop)), stop
+
+
+def iter_irreducible(p, n, start=0, stop=None, order="lex", max_in_flight=None, with_index=False):
+    """
+    Лениво перебирает неприводимые многочлены степени n, начиная с кандидата номер start.
+
+    Диапазоны номеров проверяются долгоживущим пулом процессов, и каждый найденный многочлен выдаётся,
+    как только проверен он и (при order="lex") все кандидаты перед ним. В работе одновременно находится
+    не больше max_in_flight диапазонов (вместе с уже проверенными, но ещё не выданными), поэтому
+    после того как потребитель перестал итерироваться, лишней работы почти не делается,
+    а при закрытии генератора ещё не начатые задания отменяются.
+
+    :param p: Простое число, характеристика поля.
+    :param n: Степень многочленов.
+    :param start: Номер первого кандидата (нумерация как в find_irreducible_polynomials_batch).
+    :param stop: Номер, до которого идёт перебор (по умолчанию - все (p - 1) * p^n кандидатов).
+    :param order: "lex" - в порядке номеров (детерминированно), "unordered" - в порядке готовности.
+    :param max_in_flight: Ограничение на число диапазонов в работе (по умолчанию вдвое больше числа процессов).
+    :param with_index: Выдавать пары (номер кандидата, коэффициенты) вместо одних коэффициентов.
+    :return: Генератор коэффициентов (от старшей степени к младшей).
+    """
     total_combinations = (p - 1) * (p ** n)
+    stop = total_combinations if stop is None else min(stop, total_combinations)
+
+    hits, start = _catalog_prefix(p, n, start, stop)
+    for index, coeffs in hits:
+        yield (index, coeffs) if with_index else coeffs
+
+    with closing(_iter_ranges(_scan_irreducible_range, p, n, start, stop, order=order,
+                              max_in_flight=max_in_flight)) as ranges:
+        for _, hits in ranges:
+            for index in hits:
+                coeffs = _candidate_coeffs(index, p, n)[::-1]
+                yield (index, coeffs) if with_index else coeffs
+
+
+@instrumented('search.irreducible_batch')
+def find_irreducible_polynomials_batch(p, n, batch_size, offset=0):
+    """
+    Находит неприводимые многочлены степени n среди кандидатов с номерами [offset, offset + batch_size).
+
+    Проверка выполняется долгоживущим пулом процессов диапазонами номеров.
+    Результаты (коэффициенты от старшей степени к младшей) идут в порядке номеров кандидатов.
+    """
+    return list(iter_irreducible(p, n, start=offset, stop=offset + batch_size))
+
+
+def order_factorization(p, n, db_path='irreducible_polynomials.db'):
+    """
+    Возвращает разложение p^n - 1 на простые множители, сохраняя его в базе данных.
+
+    Повторные поиски примитивных многочленов для тех же (p, n) берут разложение из базы данных.
+    """
+    initialize_database(db_path)
+
+    factors = get_order_factorization(p, n, db_path=db_path)
+    if factors is None:
+        factors = factor_field_order(p, n)
+        save_order_factorization(p, n, factors, db_path=db_path)
+
+    return factors
+
+
+@instrumented('search.check')
+def check_polynomial(p, coeffs, primitive=False, catalog_path=CATALOG_PATH, order_factors=None):
+    """
+    Проверяет многочлен на неприводимость и, если primitive, на примитивность.
+
+    Как и при создании поля, известные многочлены проверяются по файлу каталога, остальные - тестом Бен-Ора.
+
+    :param p: Простое число, характеристика поля.
+    :param coeffs: Коэффициенты многочлена (от старшей степени к младшей).
+    :param primitive: Проверять ли примитивность.
+    :param catalog_path: Путь к файлу каталога (None - не использовать каталог).
+    :param order_factors: Словарь {(p, n): разложение p^n - 1}, в котором запоминаются разложения
+                          для повторных проверок (по умолчанию разложение вычисляется заново).
+    :return: Пара (неприводим ли, примитивен ли); второй элемент - None, если примитивность не проверялась.
+    """
+    coeffs = [int(c) % p for c in coeffs]
+    while len(coeffs) > 1 and coeffs[0] == 0:
+        coeffs.pop(0)
+    n = len(coeffs) - 1
+
+    catalog = get_catalog(catalog_path) if catalog_path is not None else None
+    known = catalog.contains(p, coeffs) if catalog is not None else None
+    irreducible = known if known is not None else is_irreducible_benor((p, coeffs[::-1])) is not None
+
+    if not primitive:
+        return irreducible, None
+    if not irreducible or n < 1:
+        return irreducible, False
+
+    order_factors = {} if order_factors is None else order_factors
+    if (p, n) not in order_factors:
+        order_factors[(p, n)] = factor_field_order(p, n)
+    return irreducible, is_primitive(p, coeffs, order_factors[(p, n)])
+
+
+def _scan_primitive_range(p, n, start, stop, order_factors):
+    """
+    Проверяет на примитивность кандидатов с номерами [start, stop) (выполняется в процессе пула).
+
+    Возвращает номера примитивных многочленов и время проверки.
+    """
+    started = perf_counter()
+    hits = [index for index in range(start, stop)
+            if is_primitive(p, _candidate_coeffs(index, p, n)[::-1], order_factors)]
+
+    return hits, perf_counter() - started
+
+
+def iter_primitive(p, n, start=0, stop=None, with_index=False, db_path='irreducible_polynomials.db'):
+    """
+    Лениво перебирает унитарные примитивные многочлены степени n в порядке номеров, как iter_irreducible.
+
+    Перебираются только унитарные кандидаты (номера меньше p^n), разложение p^n - 1 берётся из базы данных.
+    """
+    order_factors = order_factorization(p, n, db_path=db_path)
+    stop = p ** n if stop is None else min(stop, p ** n)
+
+    with closing(_iter_ranges(_scan_primitive_range, p, n, start, stop, (order_factors,))) as ranges:
+        for _, hits in ranges:
+            for index in hits:
+                coeffs = _candidate_coeffs(index, p, n)[::-1]
+                yield (index, coeffs) if with_index else coeffs
+
+
+@instrumented('search.primitive_batch')
+def find_primitive_polynomials_batch(p, n, batch_size, offset=0, db_path='irreducible_polynomials.db'):
+    """
+    Ищет унитарные примитивные многочлены степени n среди кандидатов с номерами [offset, offset + batch_size).
+
+    Нумерация совпадает с find_irreducible_polynomials_batch, но перебираются только унитарные многочлены
+    (номера меньше p^n). Каждый кандидат проходит тест Бен-Ора, а затем проверку порядка x
+    с разложением p^n - 1, взятым из базы данных. Найденные многочлены сохраняются в базе данных
+    с отметкой о примитивности.
+    """
+    primitive_polynomials = list(iter_primitive(p, n, start=offset, stop=offset + batch_size, db_path=db_path))
+
+    save_polynomials_to_db(primitive_polynomials, p, n, datetime.now(), db_path=db_path, primitive=True)
+
+    return primitive_polynomials
+
+
+def _search_mode_scan(p, n, mode, db_path):
+    """Возвращает функцию проверки диапазона, её дополнительные аргументы и число кандидатов для режима поиска."""
+    if mode == "lex":
+        return _scan_irreducible_range, (), (p - 1) * p ** n
+    if mode == "primitive":
+        return _scan_primitive_range, (order_factorization(p, n, db_path=db_path),), p ** n
+
+    raise ValueError(f"Неизвестный режим поиска: {mode}")
+
+
+def _chunk_hits(hits, stop, size):
+    """
+    Делит уже известные находки на порции не больше чем по size штук.
+
+    Выдаёт пары (номер, до которого проверены все кандидаты порции; порция): для последней порции - stop,
+    для остальных - номер, следующий за последней находкой порции.
+    """
+    chunk = []
+    for hit in hits:
+        chunk.append(hit)
+        if len(chunk) == size:
+            yield hit[0] + 1, chunk
+            chunk = []
+    yield stop, chunk
+
+
+def iter_resumable_ranges(p, n, start=0, mode="lex", db_path='irreducible_polynomials.db',
+                          chunk_hits=RESUMED_HITS_CHUNK):
+    """
+    Перебирает неприводимые (mode="lex") или примитивные (mode="primitive") многочлены в порядке номеров,
+    сохраняя ход поиска в базе данных.
+
+    Для каждого (p, n, mode) в базе хранится номер, до которого все кандидаты проверены, и найденные многочлены.
+    Уже проверенная часть выдаётся прямо из базы данных, перебор продолжается с сохранённого места,
+    а новые находки и продвижение сохраняются не реже раза в CHECKPOINT_SECONDS секунд и при остановке
+    перебора. Если start лежит дальше проверенной части, перебор идёт без сохранения (иначе в ней был бы пропуск).
+
+    Выдаёт пары (номер, до которого проверены все кандидаты; список пар (номер, коэффициенты) находок)
+    после каждого проверенного диапазона, в том числе диапазона без находок. Находки, уже известные
+    из базы данных или файла каталога, выдаются порциями не больше чем по chunk_hits штук.
+    """
+    initialize_database(db_path)
+    scan_fn, args, total = _search_mode_scan(p, n, mode, db_path)
+
+    scanned_to = get_search_checkpoint(p, n, mode, db_path=db_path)
+    if start < scanned_to:
+        stored = get_search_hits(p, n, mode, start, scanned_to, db_path=db_path)
+        yield from _chunk_hits(stored, scanned_to, chunk_hits)
+        start = scanned_to
+
+    persist = start == scanned_to
+
+    if mode == "lex":
+        hits, catalog_stop = _catalog_prefix(p, n, start, total)
+        if catalog_stop > start:
+            for chunk_end, chunk in _chunk_hits(hits, catalog_stop, chunk_hits):
+                if persist:
+                    save_search_checkpoint(p, n, mode, chunk, chunk_end, db_path=db_path)
+                    scanned_to = chunk_end
+                yield chunk_end, chunk
+            start = catalog_stop
+
+    saved_to = scanned_to
+    unsaved_hits = []
+    last_saved = perf_counter()
+
+    try:
+        with closing(_iter_ranges(scan_fn, p, n, start, total, args)) as ranges:
+            for range_end, hits in ranges:
+                decoded = [(index, _candidate_coeffs(index, p, n)[::-1]) for index in hits]
+
+                if persist:
+                    unsaved_hits.extend(decoded)
+                    scanned_to = range_end
+                    if perf_counter() - last_saved >= CHECKPOINT_SECONDS:
+                        save_search_checkpoint(p, n, mode, unsaved_hits, scanned_to, db_path=db_path)
+                        unsaved_hits, saved_to, last_saved = [], scanned_to, perf_counter()
+
+                yield range_end, decoded
+    finally:
+        if persist and scanned_to > saved_to:
+            save_search_checkpoint(p, n, mode, unsaved_hits, scanned_to, db_path=db_path)
+
+
+def iter_resumable(p, n, start=0, mode="lex", with_index=False, db_path='irreducible_polynomials.db'):
+    """
+    Лениво перебирает неприводимые или примитивные многочлены с сохранением хода поиска в базе данных
+    (см. iter_resumable_ranges), выдавая их по одному.
+    """
+    with closing(iter_resumable_ranges(p, n, start, mode, db_path=db_path)) as ranges:
+        for _, hits in ranges:
+            for index, coeffs in hits:
+                yield (index, coeffs) if with_index else coeffs
+
+
+def _decode_monic(indices, p, degree):
+    """
+    Восстанавливает коэффициенты унитарных многочленов степени degree по их номерам.
+
+    Номер многочлена x^degree + c_{degree-1}x^{degree-1} + ... + c_0 равен c_0 + c_1 p + ... + c_{degree-1} p^{degree-1}.
+    Коэффициенты возвращаются от младшей степени к старшей (по строке на многочлен).
+    """
+    indices = np.array(indices, dtype=np.int64)
+    digits = np.empty((len(indices), degree + 1), dtype=np.int64)
+    for i in range(degree):
+        digits[:, i] = indices % p
+        indices //= p
+    digits[:, degree] = 1
+
+    return digits
+
+
+def _monic_irreducibles_of_degree(p, d, db_path, use_db):
+    """
+    Возвращает все унитарные неприводимые многочлены степени d (от старшей степени к младшей).
+
+    Если полный список уже есть в файле каталога или в базе данных, он берётся оттуда,
+    иначе вычисляется решетом и сохраняется.
+    """
+    catalog = get_catalog()
+    if use_db and catalog is not None and catalog.is_complete(p, d):
+        return catalog.polynomials(p, d, 0, catalog.index_position(p, d, p ** d))
+
+    if use_db and is_enumeration_complete(p, d, db_path=db_path):
+        # Каталог упорядочен по коэффициентам, поэтому унитарные многочлены идут первыми
+        return list(itertools.takewhile(lambda coeffs: coeffs[0] == 1,
+                                        (coeffs for coeffs, _ in iter_saved_polynomials(p, d, db_path=db_path))))
+
+    polynomials = sieve_irreducible_polynomials(p, d, db_path=db_path, use_db=use_db)
+
+    if use_db:
+        time = datetime.now()
+        # Без сохранённого списка отметка о полном переборе сделала бы каталог неполным
+        if save_polynomials_to_db(polynomials, p, d, time, db_path=db_path):
+            mark_enumeration_complete(p, d, len(polynomials), time, db_path=db_path)
+
+    return polynomials
+
+
+@instrumented('search.sieve')
+def sieve_irreducible_polynomials(p, n, db_path='irreducible_polynomials.db', use_db=True):
+    """
+    Находит все унитарные неприводимые многочлены степени n над GF(p) решетом Эратосфена для многочленов.
+
+    Каждый приводимый унитарный многочлен степени n делится на неприводимый многочлен степени d <= n // 2,
+    поэтому достаточно вычеркнуть в битовом массиве (индексированном номером многочлена) все произведения
+    неприводимых многочленов младших степеней на унитарные многочлены степени n - d. Оставшиеся номера
+    соответствуют неприводимым многочленам. Полные списки младших степеней берутся из базы данных,
+    а при их отсутствии вычисляются и сохраняются туда для последующих запусков.
+
+    :param p: Простое число, характеристика поля.
+    :param n: Степень искомых многочленов.
+    :param db_path: Путь к базе данных с сохранёнными многочленами.
+    :param use_db: Использовать ли базу данных для кэширования списков младших степеней.
+    :return: Список коэффициентов (от старшей степени к младшей) в порядке возрастания номеров многочленов.
+    """
+    if n < 1:
+        raise ValueError("Степень многочлена должна быть не меньше 1.")
+
+    size = p ** n
+    if size > SIEVE_MAX_CANDIDATES:
+        raise ValueError(f"Слишком много кандидатов для решета: {p}^{n} > {SIEVE_MAX_CANDIDATES}.")
+
+    if use_db:
+        initialize_database(db_path)
+
+    powers = np.array([p ** i for i in range(n)], dtype=np.int64)
+    composite = np.zeros((size + 7) // 8, dtype=np.uint8)
+
+    for d in range(1, n // 2 + 1):
+        m = n - d
+        for factor in _monic_irreducibles_of_degree(p, d, db_path, use_db):
+            factor = factor[::-1]
+            for start in range(0, p ** m, SIEVE_BLOCK_SIZE):
+                stop = min(start + SIEVE_BLOCK_SIZE, p ** m)
+                cofactors = _decode_monic(np.arange(start, stop), p, m)
+
+                products = np.zeros((stop - start, n + 1), dtype=np.int64)
+                for j, coef in enumerate(factor):
+                    if coef:
+                        products[:, j:j + m + 1] += coef * cofactors
+                products %= p
+
+                indices = products[:, :n] @ powers
+                np.bitwise_or.at(composite, indices >> 3, (1 << (indices & 7)).astype(np.uint8))
+
+    is_composite = np.unpackbits(composite, bitorder='little')[:size]
+    survivors = np.flatnonzero(is_composite == 0)
+
+    irreducible_polynomials = []
+    for start in range(0, len(survivors), SIEVE_BLOCK_SIZE):
+        digits = _decode_monic(survivors[start:start + SIEVE_BLOCK_SIZE], p, n)
+        irreducible_polynomials.extend(row[::-1] for row in digits.tolist())
+
+    return irreducible_polynomials
+
+
+def _test_random_chunk(args):
+    """
+    Проверяет на неприводимость RANDOM_CHUNK_SIZE случайных унитарных многочленов.
+
+    Генератор случайных чисел инициализируется парой (seed, номер задания), поэтому набор кандидатов
+    каждого задания не зависит от того, какой процесс и когда его выполнил.
+    """
+    p, n, seed, chunk_index = args
+    rng = random.Random(f"{seed}:{chunk_index}")
+
+    hits = []
+    for _ in range(RANDOM_CHUNK_SIZE):
+        coeffs = [rng.randrange(p) for _ in range(n)] + [1]
+        res = is_irreducible_benor((p, coeffs))
+        if res is not None:
+            hits.append(res)
+
+    return chunk_index, hits
+
+
+def iter_random_irreducible(p, n, count=1, seed=None, max_attempts=None, max_workers=None):
+    """
+    Проверяет случайные унитарные многочлены степени n над GF(p) порциями по RANDOM_CHUNK_SIZE кандидатов.
+
+    Порции выполняются параллельно, а выдаются в порядке номеров: при заданном seed последовательность
+    детерминирована. В работе одновременно не больше 2 * max_workers порций; при закрытии генератора
+    (и при исключении) ещё не начатые порции отменяются.
+
+    Выдаёт пары (неприводимые многочлены порции, от старшей степени к младшей; число проверенных кандидатов).
+    Повторы не отбрасываются.
+
+    :param count: Сколько многочленов предполагается найти (задаёт max_attempts по умолчанию).
+    :param max_attempts: Максимальное число проверяемых кандидатов (по умолчанию с большим запасом для count).
+    """
+    if n < 1:
+        raise ValueError("Степень многочлена должна быть не меньше 1.")
+
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 63)
+    if max_attempts is None:
+        max_attempts = 100 * n * count + 1000
+    pool = get_search_pool()
+    max_workers = max_workers or pool.max_workers
+
+    total_chunks = -(-max_attempts // RANDOM_CHUNK_SIZE)
+    finished = {}
+    next_to_submit = 0
+    next_to_collect = 0
+    pending = set()
+
+    try:
+        while next_to_collect < total_chunks:
+            # Держим ограниченное число заданий в работе, чтобы не проверять лишнего, когда потребитель остановится
+            while next_to_submit < total_chunks and len(pending) < 2 * max_workers:
+                pending.add(pool.submit(_test_random_chunk, (p, n, seed, next_to_submit)))
+                next_to_submit += 1
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk_index, hits = future.result()
+                finished[chunk_index] = hits
+
+            while next_to_collect in finished:
+                yield finished.pop(next_to_collect), RANDOM_CHUNK_SIZE
+                next_to_collect += 1
+    finally:
+        # При остановке или исключении (в том числе в задании) ещё не начатые задания не должны занимать общий пул
+        for future in pending:
+            future.cancel()
+
+
+@instrumented('search.random')
+def random_irreducible(p, n, count=1, seed=None, max_attempts=None, max_workers=None):
+    """
+    Находит count различных унитарных неприводимых многочленов степени n над GF(p) случайным поиском (Лас-Вегас).
+
+    Неприводимым оказывается примерно каждый n-й случайный унитарный многочлен, поэтому в среднем
+    требуется O(n) проверок на один результат вместо перебора кандидатов по порядку.
+    Кандидаты разбиваются на задания фиксированного размера, которые выполняются параллельно,
+    а результаты собираются в порядке номеров заданий: при заданном seed ответ детерминирован
+    (см. iter_random_irreducible).
+
+    :param p: Простое число, характеристика поля.
+    :param n: Степень искомых многочленов.
+    :param count: Сколько многочленов требуется найти.
+    :param seed: Начальное значение генератора случайных чисел (None - случайное).
+    :param max_attempts: Максимальное число проверяемых кандидатов (по умолчанию с большим запасом).
+    :param max_workers: Сколько процессов пула поиска занимать одновременно (по умолчанию все).
+    :return: Список коэффициентов (от старшей степени к младшей); может быть короче count,
+             если за max_attempts проверок не удалось найти столько различных многочленов.
+    """
     irreducible_polynomials = []
+    seen = set()
+
+    with closing(iter_random_irreducible(p, n, count, seed, max_attempts, max_workers)) as chunks:
+        for hits, _ in chunks:
+            for res in hits:
+                key = tuple(res)
+                if key not in seen:
+                    seen.add(key)
+                    irreducible_polynomials.append(res)
+                    if len(irreducible_polynomials) == count:
+                        return irreducible_polynomials
+
+    return irreducible_polynomials
+
+
+def _middle_exponents(count, below):
+    """
+    Перебирает наборы из count различных показателей из [1, below) по возрастанию старшего показателя,
+    затем следующего за ним и т.д. (без построения и сортировки всех сочетаний сразу).
+    """
+    if count == 0:
+        yield ()
+        return
+
+    for top in range(count, below):
+        for rest in _middle_exponents(count - 1, top):
+            yield rest + (top,)
+
+
+def low_weight_candidates(p, n, max_weight=MAX_LOW_WEIGHT):
+    """
+    Перебирает унитарные многочлены степени n с малым числом ненулевых членов (веса от 2 до max_weight).
+
+    Кандидаты идут по возрастанию веса, внутри веса - по возрастанию средних показателей степени,
+    затем по коэффициентам. Свободный член всегда ненулевой (иначе многочлен делится на x).
+    Над GF(2) многочлены чётного веса степени больше 1 делятся на x + 1, поэтому пропускаются:
+    остаются триномы и пентаномы. При n, кратном 8, все триномы над GF(2) приводимы (теорема Свона)
+    и тоже пропускаются.
+
+    Возвращает коэффициенты от младшей степени к старшей.
+    """
+    for weight in range(2, max_weight + 1):
+        if p == 2 and weight % 2 == 0 and n > 1:
+            continue
+        if p == 2 and weight == 3 and n % 8 == 0:
+            continue
+        if weight - 2 > n - 1:
+            break
 
-    end = min(offset + batch_size, total_combinations)
-    args = []
-
-    for index in range(offset, end):
-        # Ведущий коэффициент от 1 до p-1
-        leading_coeff = (index // (p ** n)) + 1
-        rest_index = index % (p ** n)
-        coeffs = []
-        temp = rest_index
-        for _ in range(n):
-            coeffs.append(temp % p)
-            temp = temp // p
-        coeffs = coeffs[::-1]
-        coeffs_full = [leading_coeff] + coeffs
-        args.append((p, coeffs_full[::-1]))
-
-    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
-        future_to_args = {executor.submit(is_irreducible_benor, arg): arg for arg in args}
-        for future in as_completed(future_to_args):
-            res = future.result()
+        for middle in _middle_exponents(weight - 2, n):
+            for values in itertools.product(range(1, p), repeat=weight - 1):
+                coeffs = [0] * (n + 1)
+                coeffs[n] = 1
+                coeffs[0] = values[-1]
+                for exponent, value in zip(middle, values):
+                    coeffs[exponent] = value
+                yield coeffs
+
+
+def find_low_weight_irreducible(p, n, max_weight=MAX_LOW_WEIGHT, max_workers=None):
+    """
+    Находит неприводимый многочлен степени n наименьшего веса (с наименьшими средними показателями).
+
+    Такой модуль (трином, пентаном) делает приведение по модулю в mod_polynomial линейным по n.
+    Кандидаты проверяются параллельно порциями, но в порядке перебора, поэтому ответ не зависит от числа процессов.
+
+    :return: Коэффициенты (от старшей степени к младшей) или None, если среди многочленов веса
+             не больше max_weight неприводимых нет.
+    """
+    pool = get_search_pool()
+    max_workers = max_workers or pool.max_workers
+    candidates = low_weight_candidates(p, n, max_weight)
+
+    while True:
+        args = [(p, coeffs) for coeffs in itertools.islice(candidates, LOW_WEIGHT_CHUNK_SIZE * max_workers)]
+        if not args:
+            return None
+
+        for res in pool.map(is_irreducible_benor, args, chunksize=LOW_WEIGHT_CHUNK_SIZE):
             if res is not None:
-                irreducible_polynomials.append(res)
+                return res
+
+
+def iter_low_weight_irreducibles(p, n, batch_size, offset=0, max_weight=MAX_LOW_WEIGHT, max_workers=None):
+    """
+    Проверяет на неприводимость кандидатов малого веса с номерами [offset, offset + batch_size)
+    порциями по размеру пула поиска (LOW_WEIGHT_CHUNK_SIZE кандидатов на процесс).
+
+    Номер кандидата - его позиция в low_weight_candidates. Выдаёт пары (неприводимые многочлены порции
+    в порядке перебора, от старшей степени к младшей; число проверенных кандидатов).
+    """
+    pool = get_search_pool()
+    max_workers = max_workers or pool.max_workers
+    candidates = itertools.islice(low_weight_candidates(p, n, max_weight), offset, offset + batch_size)
+
+    while True:
+        args = [(p, coeffs) for coeffs in itertools.islice(candidates, LOW_WEIGHT_CHUNK_SIZE * max_workers)]
+        if not args:
+            return
+
+        # Результаты map ленивые: порция замеряется вместе с ожиданием всех её результатов
+        with timed('search.low_weight_portion'):
+            results = pool.map(is_irreducible_benor, args, chunksize=LOW_WEIGHT_CHUNK_SIZE)
+            hits = [res for res in results if res is not None]
+        yield hits, len(args)
+
+
+@instrumented('search.low_weight_batch')
+def find_low_weight_irreducibles_batch(p, n, batch_size, offset=0, max_weight=MAX_LOW_WEIGHT):
+    """
+    Проверяет на неприводимость кандидатов малого веса с номерами [offset, offset + batch_size).
+
+    Номер кандидата - его позиция в low_weight_candidates. Результаты возвращаются в порядке перебора,
+    т.е. начиная с самых дешёвых для приведения модулей.
+    """
+    return [res for hits, _ in iter_low_weight_irreducibles(p, n, batch_size, offset, max_weight) for res in hits]
+
+
+@instrumented('search.fastest_modulus')
+def fastest_modulus(p, n, db_path='irreducible_polynomials.db'):
+    """
+    Возвращает самый дешёвый для приведения известный неприводимый многочлен степени n над GF(p).
+
+    Многочлен наименьшего веса ищется один раз и сохраняется в базе данных. Если среди многочленов
+    малого веса неприводимых нет, берётся случайный неприводимый многочлен.
+
+    :return: Коэффициенты от старшей степени к младшей.
+    :raises ValueError: Если случайный поиск не нашёл неприводимого многочлена за отведённое число попыток.
+    """
+    initialize_database(db_path)
+
+    coeffs = get_fastest_modulus(p, n, db_path=db_path)
+    if coeffs is None:
+        coeffs = find_low_weight_irreducible(p, n)
+        if coeffs is None:
+            found = random_irreducible(p, n, count=1)
+            if not found:
+                raise ValueError(f"Не удалось найти неприводимый многочлен степени {n} над GF({p})")
+            coeffs = found[0]
+        save_fastest_modulus(p, n, coeffs, db_path=db_path)
 
-    return irreducible_polynomials
\ No newline at end of file
+    return coeffs
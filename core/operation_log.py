@@ -0,0 +1,272 @@
+import json
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from time import perf_counter
+
+from .db import _connection
+
+# Уровни записей журнала
+LEVEL_OPERATION = 'operation'
+LEVEL_INFO = 'info'
+LEVEL_ERROR = 'error'
+
+# Сколько вытесненных из кольцевого буфера записей копится перед записью на диск
+SPILL_BATCH = 100
+
+LOG_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS operation_log (
+        id INTEGER PRIMARY KEY,
+        timestamp TEXT NOT NULL,
+        last_timestamp TEXT NOT NULL,
+        level TEXT NOT NULL,
+        op TEXT,
+        operands TEXT,
+        result TEXT,
+        duration REAL,
+        message TEXT,
+        count INTEGER NOT NULL
+    )
+'''
+
+
+class LogEntry:
+    """
+    Запись журнала операций: время, уровень, операция, операнды, результат, длительность и текст сообщения.
+
+    Одинаковые информационные сообщения не дублируются: у записи растёт счётчик count
+    и обновляется время последнего повторения last_timestamp.
+    """
+    __slots__ = ('timestamp', 'last_timestamp', 'level', 'op', 'operands', 'result', 'duration', 'message', 'count')
+
+    def __init__(self, level, message=None, op=None, operands=None, result=None, duration=None, timestamp=None,
+                 last_timestamp=None, count=1):
+        self.timestamp = timestamp or datetime.now()
+        self.last_timestamp = last_timestamp or self.timestamp
+        self.level = level
+        self.op = op
+        self.operands = [str(operand) for operand in operands] if operands else []
+        self.result = None if result is None else str(result)
+        self.duration = duration
+        self.message = message
+        self.count = count
+
+    def text(self):
+        """Текст записи: сообщение или, если его нет, операция с операндами и результатом."""
+        if self.message is not None:
+            return self.message
+        text = f"Операция: {self.op}"
+        for i, operand in enumerate(self.operands, 1):
+            text += f"\nОперанд {i}: {operand}"
+        if self.result is not None:
+            text += f"\nРезультат: {self.result}"
+        return text
+
+    def __str__(self):
+        header = f"[{self.timestamp:%Y-%m-%d %H:%M:%S}]"
+        if self.duration is not None:
+            header += f" ({self.duration * 1000:.2f} мс)"
+        if self.count > 1:
+            header += f" (повторений: {self.count}, последнее в {self.last_timestamp:%H:%M:%S})"
+        return f"{header} {self.text()}"
+
+    def as_dict(self):
+        return {
+            'timestamp': self.timestamp.isoformat(),
+            'last_timestamp': self.last_timestamp.isoformat(),
+            'level': self.level,
+            'op': self.op,
+            'operands': self.operands,
+            'result': self.result,
+            'duration': self.duration,
+            'message': self.message,
+            'count': self.count,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['level'], data['message'], data['op'], data['operands'], data['result'], data['duration'],
+                   datetime.fromisoformat(data['timestamp']), datetime.fromisoformat(data['last_timestamp']),
+                   data['count'])
+
+
+class OperationLog:
+    """
+    Журнал операций ограниченного размера.
+
+    Последние capacity записей хранятся в кольцевом буфере; более старые либо отбрасываются, либо
+    (если задан spill_path) пачками дописываются на диск: в базу SQLite, если путь оканчивается на .db
+    или .sqlite, иначе в файл JSON Lines. Выгрузка журнала (export) собирается только по запросу
+    и включает записи с диска; поле version увеличивается при каждой новой записи, поэтому по нему видно,
+    устарела ли собранная выгрузка (счётчики повторов информационных сообщений в ней могут отставать).
+    """
+    def __init__(self, capacity=1000, spill_path=None):
+        """
+        :param capacity: Сколько последних записей держать в памяти.
+        :param spill_path: Куда сбрасывать вытесненные записи (по умолчанию они отбрасываются).
+        """
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.dropped = 0
+        self.version = 0
+        self._entries = deque()
+        self._info = {}
+        self._pending = []
+        self._lock = threading.Lock()
+
+    @property
+    def _spill_to_sqlite(self):
+        return self.spill_path is not None and self.spill_path.endswith(('.db', '.sqlite'))
+
+    def log(self, message=None, level=LEVEL_OPERATION, op=None, operands=None, result=None, duration=None):
+        """
+        Добавляет запись в журнал.
+
+        :param message: Текст записи (если не задан, строится по операции, операндам и результату).
+        :param level: Уровень записи: LEVEL_OPERATION, LEVEL_INFO или LEVEL_ERROR.
+        :param op: Название операции.
+        :param operands: Операнды (сохраняются строками).
+        :param result: Результат (сохраняется строкой).
+        :param duration: Длительность операции в секундах.
+        :return: Запись журнала.
+        """
+        with self._lock:
+            if level == LEVEL_INFO:
+                entry = self._info.get((message, op))
+                if entry is not None:
+                    # Повторённое сообщение переносится в конец буфера, чтобы не быть вытесненным раньше более старых
+                    entry.count += 1
+                    entry.last_timestamp = datetime.now()
+                    if self._entries[-1] is not entry:
+                        self._entries.remove(entry)
+                        self._entries.append(entry)
+                    return entry
+
+            # Повтор информационного сообщения (выше) версию не меняет: приложение повторяет такие сообщения
+            # при каждом перезапуске скрипта, и собранная выгрузка иначе устаревала бы от любого действия
+            self.version += 1
+            entry = LogEntry(level, message, op, operands, result, duration)
+            self._entries.append(entry)
+            if level == LEVEL_INFO:
+                self._info[(message, op)] = entry
+
+            while len(self._entries) > self.capacity:
+                self._evict(self._entries.popleft())
+
+            return entry
+
+    def _evict(self, entry):
+        if entry.level == LEVEL_INFO and self._info.get((entry.message, entry.op)) is entry:
+            del self._info[(entry.message, entry.op)]
+
+        if self.spill_path is None:
+            self.dropped += 1
+            return
+
+        self._pending.append(entry)
+        if len(self._pending) >= SPILL_BATCH:
+            self._flush_pending()
+
+    def _flush_pending(self):
+        if not self._pending:
+            return
+
+        if self._spill_to_sqlite:
+            with _connection(self.spill_path, write=True) as cursor:
+                cursor.execute(LOG_TABLE_SQL)
+                cursor.executemany('''
+                    INSERT INTO operation_log (timestamp, last_timestamp, level, op, operands, result, duration,
+                                               message, count)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [(entry.timestamp.isoformat(), entry.last_timestamp.isoformat(), entry.level, entry.op,
+                       json.dumps(entry.operands, ensure_ascii=False), entry.result, entry.duration, entry.message,
+                       entry.count) for entry in self._pending])
+        else:
+            with open(self.spill_path, 'a', encoding='utf-8') as f:
+                for entry in self._pending:
+                    f.write(json.dumps(entry.as_dict(), ensure_ascii=False) + '\n')
+
+        self._pending = []
+
+    def flush(self):
+        """Дописывает на диск накопленные вытесненные записи."""
+        with self._lock:
+            self._flush_pending()
+
+    @contextmanager
+    def timed(self, op, operands=None):
+        """
+        Замеряет длительность блока и записывает операцию в журнал.
+
+        Результат операции присваивается полю result выдаваемого словаря; если в блоке возникло исключение,
+        записывается ошибка с его текстом.
+        """
+        record = {'result': None}
+        start = perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            self.log(f"Ошибка при выполнении операции '{op}': {e}", LEVEL_ERROR, op, operands,
+                     duration=perf_counter() - start)
+            raise
+        self.log(None, LEVEL_OPERATION, op, operands, record['result'], perf_counter() - start)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __bool__(self):
+        return bool(self._entries) or self.dropped > 0 or self.spill_path is not None
+
+    def __iter__(self):
+        """Записи из памяти (без сброшенных на диск)."""
+        with self._lock:
+            return iter(list(self._entries))
+
+    def _iter_spilled(self):
+        if self.spill_path is None:
+            return
+
+        if self._spill_to_sqlite:
+            last_id = 0
+            while True:
+                with _connection(self.spill_path) as cursor:
+                    cursor.execute(LOG_TABLE_SQL)
+                    cursor.execute('''
+                        SELECT id, timestamp, last_timestamp, level, op, operands, result, duration, message, count
+                        FROM operation_log WHERE id > ? ORDER BY id LIMIT ?
+                    ''', (last_id, SPILL_BATCH))
+                    rows = cursor.fetchall()
+                for row_id, timestamp, last_timestamp, level, op, operands, result, duration, message, count in rows:
+                    yield LogEntry(level, message, op, json.loads(operands), result, duration,
+                                   datetime.fromisoformat(timestamp), datetime.fromisoformat(last_timestamp), count)
+                if len(rows) < SPILL_BATCH:
+                    return
+                last_id = rows[-1][0]
+        else:
+            try:
+                with open(self.spill_path, encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            yield LogEntry.from_dict(json.loads(line))
+            except FileNotFoundError:
+                return
+
+    def iter_all(self):
+        """Все записи журнала по порядку: сначала сброшенные на диск, затем из памяти."""
+        self.flush()
+        yield from self._iter_spilled()
+        yield from self
+
+    def export(self, fmt='text'):
+        """
+        Собирает выгрузку всего журнала.
+
+        :param fmt: 'text' - по записи в читаемом виде, 'jsonl' - по объекту JSON на строку.
+        :return: Строка с выгрузкой.
+        """
+        if fmt == 'jsonl':
+            return "".join(json.dumps(entry.as_dict(), ensure_ascii=False) + '\n' for entry in self.iter_all())
+        if fmt == 'text':
+            return "\n".join(str(entry) for entry in self.iter_all())
+        raise ValueError(f"Неизвестный формат выгрузки журнала: {fmt}")
@@ -0,0 +1,366 @@
+"""
+Планировщик операций по модели стоимости (CostModel) с контролем допуска.
+
+По (p, n, степени, операции) и постоянным, откалиброванным на этой машине, планировщик оценивает время
+и память, выбирает самый быстрый алгоритм (Ферма или Евклид для обращения, наивное умножение или Карацуба,
+решето, перебор или случайный поиск) и проверяет оценку по бюджету: запрос, который не укладывается
+в бюджет, урезается (меньше многочленов, случайная выборка вместо полного перебора) или отклоняется
+до запуска. Оценку можно показать пользователю до выполнения (Plan.describe).
+"""
+import math
+import os
+import platform
+from time import perf_counter
+
+from .db import initialize_database, get_cost_calibration, save_cost_calibration
+from .elements import count_irreducible_polynomials
+from .elements.cost_model import CostModel, get_cost_model, set_cost_model
+from .find_irreducible_poly import SIEVE_MAX_CANDIDATES, sieve_irreducible_polynomials
+
+DB_PATH = 'irreducible_polynomials.db'
+
+# Бюджет по умолчанию: время одной операции или одного шага поиска и память под её результаты
+DEFAULT_TIME_BUDGET = 60.0
+DEFAULT_MEMORY_BUDGET = 1 << 30
+
+# Режимы поиска: all - все унитарные неприводимые многочлены, остальные - первые count находок
+SEARCH_MODES = ('all', 'lex', 'primitive', 'random', 'low-weight')
+
+# Во сколько раз проверка примитивности неприводимого многочлена дороже теста Бен-Ора
+# (несколько возведений в степени порядка p^n); разложение p^n - 1 в оценку не входит
+PRIMITIVE_TEST_FACTOR = 3
+# Доля примитивных среди неприводимых, phi(p^n - 1) / (p^n - 1): обычно от 0.3 до 1, для оценки - 0.5
+PRIMITIVE_SHARE = 0.5
+
+# Память решета: бит на кандидата, порции по SIEVE_BLOCK_SIZE строк из n + 1 чисел int64 (три массива)
+# и по одному списку коэффициентов на найденный многочлен
+SIEVE_BLOCK_SIZE = 1 << 16
+LIST_BYTES = 56
+INT_BYTES = 8
+
+# Названия алгоритмов для пользователя
+ALGORITHM_NAMES = {
+    'naive': "наивное умножение",
+    'karatsuba': "умножение Карацубы",
+    'fermat': "возведение в степень p^n - 2 (Ферма)",
+    'euclid': "расширенный алгоритм Евклида",
+    'benor': "тест Бен-Ора",
+    'catalog': "поиск в каталоге",
+    'sieve': "решето",
+    'enumeration': "перебор по порядку",
+    'random': "случайный поиск",
+    'low-weight': "перебор многочленов малого веса",
+}
+
+
+class PlanError(ValueError):
+    """Запрос отклонён: его оценка не укладывается в бюджет времени или памяти."""
+    def __init__(self, plan):
+        super().__init__(plan.reason)
+        self.plan = plan
+
+
+def format_seconds(seconds):
+    """Длительность для пользователя: "120 мкс", "3.5 мс", "12 с", "4.2 мин", "3.1 ч" или "2.0e+05 лет"."""
+    if math.isinf(seconds):
+        return "∞"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.0f} мкс"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f} мс"
+    if seconds < 120:
+        return f"{seconds:.1f} с"
+    if seconds < 7200:
+        return f"{seconds / 60:.1f} мин"
+    if seconds < 86400 * 365:
+        return f"{seconds / 3600:.1f} ч"
+    return f"{seconds / (86400 * 365):.1e} лет"
+
+
+def format_bytes(size):
+    """Объём памяти для пользователя: "512 Б", "3.2 КБ", "120.0 МБ", "2.5 ГБ"."""
+    for unit in ("Б", "КБ", "МБ", "ГБ"):
+        if size < 1024 or unit == "ГБ":
+            return f"{size:.0f} {unit}" if unit == "Б" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def _scaled(cost, count):
+    """cost * count для целого count любой величины (бесконечность, если произведение не помещается во float)."""
+    try:
+        return cost * float(count)
+    except OverflowError:
+        return math.inf
+
+
+def _random_draws(count, total):
+    """
+    Среднее число случайных находок до count различных из total (задача о собирателе купонов):
+    total * ln(total / (total - count)).
+    """
+    share = count / total
+    if share >= 1:
+        return math.inf
+    return count if share < 1e-12 else count * -math.log1p(-share) / share
+
+
+class Plan:
+    """
+    План операции: выбранный алгоритм, оценка времени и памяти, оценки альтернатив и решение о допуске.
+
+    Урезанный план (downgraded) выполняет не весь запрос: например, ищет count многочленов случайным
+    поиском вместо полного перебора; причина записана в reason.
+    """
+    __slots__ = ('operation', 'algorithm', 'seconds', 'memory', 'alternatives', 'count', 'admitted', 'downgraded',
+                 'reason')
+
+    def __init__(self, operation, algorithm, seconds, memory=0, alternatives=None, count=None, admitted=True,
+                 downgraded=False, reason=None):
+        self.operation = operation
+        self.algorithm = algorithm
+        self.seconds = seconds
+        self.memory = memory
+        self.alternatives = alternatives or {}
+        self.count = count
+        self.admitted = admitted
+        self.downgraded = downgraded
+        self.reason = reason
+
+    def describe(self):
+        """Описание плана для пользователя: алгоритм, оценка времени и памяти, причина урезания или отказа."""
+        text = f"{ALGORITHM_NAMES.get(self.algorithm, self.algorithm)}: ~{format_seconds(self.seconds)}"
+        if self.memory:
+            text += f", память ~{format_bytes(self.memory)}"
+        if self.count is not None:
+            text += f", многочленов: {self.count}"
+        others = [f"{ALGORITHM_NAMES.get(name, name)} ~{format_seconds(seconds)}"
+                  for name, seconds in self.alternatives.items() if name != self.algorithm]
+        if others:
+            text += f" (другие варианты: {'; '.join(others)})"
+        if self.reason:
+            text += f". {self.reason}"
+        return text
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return f"Plan({self.operation!r}, {self.algorithm!r}, seconds={self.seconds:.3g}, admitted={self.admitted})"
+
+
+class Planner:
+    """
+    Выбирает алгоритмы и проверяет запросы по бюджету с помощью модели стоимости.
+
+    Без явной модели используется модель процесса (get_cost_model), т.е. после load_cost_model -
+    откалиброванная на этой машине.
+    """
+    def __init__(self, model=None, time_budget=DEFAULT_TIME_BUDGET, memory_budget=DEFAULT_MEMORY_BUDGET,
+                 workers=None):
+        """
+        :param model: Модель стоимости (CostModel) или None - модель процесса.
+        :param time_budget: Наибольшее допустимое время операции в секундах (None - без ограничения).
+        :param memory_budget: Наибольший допустимый объём памяти в байтах (None - без ограничения).
+        :param workers: Число процессов поиска (по умолчанию - число ядер, как у пула поиска).
+        """
+        self._model = model
+        self.time_budget = time_budget
+        self.memory_budget = memory_budget
+        self.workers = workers or os.cpu_count() or 1
+
+    @property
+    def model(self):
+        return self._model if self._model is not None else get_cost_model()
+
+    def _over_budget(self, seconds, memory=0):
+        """Текст причины, если оценка не укладывается в бюджет, иначе None."""
+        if self.time_budget is not None and seconds > self.time_budget:
+            return f"Оценка времени {format_seconds(seconds)} превышает бюджет {format_seconds(self.time_budget)}"
+        if self.memory_budget is not None and memory > self.memory_budget:
+            return f"Оценка памяти {format_bytes(memory)} превышает бюджет {format_bytes(self.memory_budget)}"
+        return None
+
+    def _admit(self, plan):
+        reason = self._over_budget(plan.seconds, plan.memory)
+        if reason is not None:
+            plan.admitted = False
+            plan.reason = reason + "."
+        return plan
+
+    def plan_multiplication(self, p, n, weight=None):
+        """
+        План умножения элементов GF(p^n) (умножение многочленов и приведение по модулю).
+
+        :param weight: Число ненулевых коэффициентов модуля (по умолчанию - плотный модуль).
+        """
+        model = self.model
+        reduction = model.reduction_cost(n, weight) - model.constants['reduce_call']
+        alternatives = {method: model.multiplication_cost(n, method) + reduction for method in ('naive', 'karatsuba')}
+        method = model.choose_multiplication(n)
+        return self._admit(Plan('mul', method, alternatives[method], alternatives=alternatives))
+
+    def plan_inversion(self, p, n, weight=None):
+        """План обращения элемента GF(p^n)."""
+        model = self.model
+        alternatives = {method: model.inversion_cost(p, n, method, weight) for method in ('fermat', 'euclid')}
+        method = model.choose_inversion(p, n, weight)
+        return self._admit(Plan('inv', method, alternatives[method], alternatives=alternatives))
+
+    def plan_field(self, p, modulus_coeffs, known=None):
+        """
+        План создания поля GF(p^n): проверка модуля (по каталогу или тестом Бен-Ора).
+
+        :param modulus_coeffs: Коэффициенты модуля (от старшей степени к младшей).
+        :param known: Результат проверки по каталогу (True/False) или None - модуля в каталоге нет.
+        """
+        n = len(modulus_coeffs) - 1
+        if known is not None:
+            return Plan('field', 'catalog', 0.0)
+        seconds = self.model.irreducibility_cost(p, n)
+        return self._admit(Plan('field', 'benor', seconds, memory=LIST_BYTES + INT_BYTES * (n + 1) * 4))
+
+    def _sieve_cost(self, p, n):
+        size = p ** n
+        found = size / n
+        memory = (size / 8 + 3 * min(SIEVE_BLOCK_SIZE, size) * (n + 1) * INT_BYTES
+                  + found * (LIST_BYTES + INT_BYTES * (n + 1)))
+        return self.model.constants['sieve'] * size, memory
+
+    def plan_search(self, p, n, mode='all', count=None):
+        """
+        План поиска неприводимых многочленов степени n над GF(p).
+
+        В режиме 'all' (все унитарные неприводимые) сравниваются решето (если кандидаты помещаются
+        в память, см. SIEVE_MAX_CANDIDATES) и параллельный перебор; если ни то ни другое не укладывается
+        в бюджет, план урезается до случайной выборки из стольких многочленов, сколько успеет найтись.
+        В остальных режимах ищутся count многочленов (в 'low-weight' - проверяются count кандидатов);
+        если count не укладывается в бюджет, он уменьшается.
+
+        :param mode: Режим из SEARCH_MODES.
+        :param count: Сколько многочленов найти (для 'all' не нужен).
+        :return: План (Plan); если в бюджет не укладывается даже один многочлен, план не допущен.
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Неизвестный режим поиска: '{mode}'")
+        if mode != 'all' and (count is None or count < 1):
+            raise ValueError("Для этого режима нужно указать число многочленов count >= 1")
+
+        model = self.model
+        candidate = model.irreducibility_cost(p, n, irreducible=False) / self.workers
+        total = count_irreducible_polynomials(p, n)
+        per_hit = n * candidate
+        result_bytes = LIST_BYTES + INT_BYTES * (n + 1)
+
+        if mode == 'all':
+            alternatives = {'enumeration': _scaled(candidate, p ** n)}
+            memory = {'enumeration': _scaled(result_bytes, total)}
+            if p ** n <= SIEVE_MAX_CANDIDATES:
+                alternatives['sieve'], memory['sieve'] = self._sieve_cost(p, n)
+            fitting = [name for name in alternatives if self._over_budget(alternatives[name], memory[name]) is None]
+            algorithm = min(fitting or alternatives, key=alternatives.get)
+            plan = Plan('search', algorithm, alternatives[algorithm], memory[algorithm], alternatives, count=total)
+            if fitting:
+                return plan
+
+            # Полный перебор не укладывается в бюджет: столько случайных многочленов, сколько успеет найтись
+            # (повторы случайных находок учитываются по задаче о собирателе купонов)
+            reason = self._over_budget(plan.seconds, plan.memory)
+            budget = self.time_budget if self.time_budget is not None else math.inf
+            sample = int(min(budget / per_hit, total // 2, 1 << 62))
+            if self.memory_budget is not None:
+                sample = min(sample, int(self.memory_budget // result_bytes))
+            if sample < 1:
+                plan.admitted = False
+                plan.reason = reason + "."
+                return plan
+            seconds = per_hit * _random_draws(sample, total)
+            return Plan('search', 'random', seconds, sample * result_bytes, alternatives, count=sample,
+                        downgraded=True,
+                        reason=f"{reason}: вместо полного перебора - случайная выборка из {sample} многочленов")
+
+        if mode == 'low-weight':
+            # count - число проверяемых кандидатов малого веса
+            per_item = candidate
+        elif mode == 'primitive':
+            per_item = (n * candidate + model.irreducibility_cost(p, n) * PRIMITIVE_TEST_FACTOR / self.workers) \
+                / PRIMITIVE_SHARE
+        else:
+            per_item = per_hit
+
+        algorithm = {'lex': 'enumeration', 'primitive': 'enumeration'}.get(mode, mode)
+        alternatives = {algorithm: count * per_item}
+        if mode in ('lex', 'random') and count < total:
+            # Случайные находки повторяются, перебор по порядку - нет; при count, близком к total, это заметно
+            alternatives['enumeration'] = count * per_hit
+            alternatives['random'] = per_hit * _random_draws(count, total)
+
+        plan = Plan('search', algorithm, alternatives[algorithm], count * result_bytes, alternatives, count=count)
+        reason = self._over_budget(plan.seconds, plan.memory)
+        if reason is None:
+            return plan
+
+        budget = self.time_budget if self.time_budget is not None else math.inf
+        fitting = int(min(budget / per_item, count))
+        if self.memory_budget is not None:
+            fitting = min(fitting, int(self.memory_budget // result_bytes))
+        if fitting < 1:
+            plan.admitted = False
+            plan.reason = reason + "."
+            return plan
+        return Plan('search', algorithm, fitting * per_item, fitting * result_bytes, alternatives, count=fitting,
+                    downgraded=True, reason=f"{reason}: число многочленов уменьшено до {fitting}")
+
+    def admit(self, plan):
+        """
+        Проверяет решение о допуске плана.
+
+        :return: Тот же план, если он допущен.
+        :raises PlanError: Если план не укладывается в бюджет.
+        """
+        if not plan.admitted:
+            raise PlanError(plan)
+        return plan
+
+
+def machine_key():
+    """Ключ машины для сохранённой калибровки: имя узла, архитектура и версия Python."""
+    return f"{platform.node()}/{platform.machine()}/Python {platform.python_version()}"
+
+
+def calibrate_cost_model(budget=0.5):
+    """
+    Замеряет постоянные модели стоимости на этой машине, включая время решета на одного кандидата.
+
+    :param budget: Примерное время замеров арифметики в секундах (см. CostModel.calibrate).
+    :return: Откалиброванная модель (CostModel).
+    """
+    model = CostModel.calibrate(budget)
+    p, n = 2, 14
+    start = perf_counter()
+    sieve_irreducible_polynomials(p, n, use_db=False)
+    model.constants['sieve'] = (perf_counter() - start) / p ** n
+    return model
+
+
+def load_cost_model(db_path=DB_PATH, calibrate=True):
+    """
+    Устанавливает модель стоимости процесса по калибровке этой машины из базы данных.
+
+    Если калибровки ещё нет, она выполняется (около секунды) и сохраняется; после этого операции
+    с элементами выбирают алгоритмы по замеренным постоянным.
+
+    :param db_path: Путь к базе данных.
+    :param calibrate: Выполнить калибровку, если сохранённой нет (иначе остаются постоянные по умолчанию).
+    :return: Установленная модель (CostModel).
+    """
+    initialize_database(db_path)
+    machine = machine_key()
+    constants = get_cost_calibration(machine, db_path=db_path)
+    if constants is not None:
+        return set_cost_model(CostModel(constants))
+    if not calibrate:
+        return get_cost_model()
+
+    model = calibrate_cost_model()
+    save_cost_calibration(machine, model.constants, db_path=db_path)
+    return set_cost_model(model)
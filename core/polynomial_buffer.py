@@ -0,0 +1,114 @@
+import numpy as np
+
+from .elements import format_polynomial
+
+
+class PolynomialBuffer:
+    """
+    Компактное хранилище найденных многочленов одной степени.
+
+    Коэффициенты (от старшей степени к младшей, уже приведённые по модулю p) лежат в строках массива NumPy
+    формы (ёмкость, n + 1) наименьшего подходящего целого типа; при заполнении ёмкость удваивается,
+    поэтому добавление в среднем стоит O(1). Строковые представления многочленов вычисляются
+    один раз на строку и кэшируются.
+    """
+    def __init__(self, p=None, n=None, capacity=16):
+        """
+        :param p: Характеристика поля (если задана, коэффициенты приводятся по модулю p).
+        :param n: Степень многочленов (если не задана, определяется по первому добавленному многочлену).
+        :param capacity: Начальная ёмкость.
+        """
+        self.p = p
+        self.n = n
+        self._dtype = np.min_scalar_type(p - 1) if p else np.int64
+        self._capacity = capacity
+        self._data = None if n is None else np.empty((capacity, n + 1), dtype=self._dtype)
+        self._size = 0
+        self._strings = []
+        self._keys = set()
+
+    def _reserve(self, extra):
+        if self._data is None:
+            self._data = np.empty((max(self._capacity, extra), self.n + 1), dtype=self._dtype)
+            return
+
+        needed = self._size + extra
+        if needed > len(self._data):
+            grown = np.empty((max(needed, 2 * len(self._data)), self.n + 1), dtype=self._dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+
+    def _rows(self, polynomials):
+        rows = np.asarray(polynomials, dtype=np.int64)
+        if rows.ndim != 2:
+            raise ValueError("Многочлены в буфере должны иметь одинаковую степень")
+        if self.n is None:
+            self.n = rows.shape[1] - 1
+        if rows.shape[1] != self.n + 1:
+            raise ValueError(f"Ожидались многочлены степени {self.n}, получены многочлены степени {rows.shape[1] - 1}")
+        if self.p:
+            rows %= self.p
+        return rows.astype(self._dtype)
+
+    def extend(self, polynomials):
+        """Добавляет многочлены (коэффициенты от старшей степени к младшей)."""
+        polynomials = list(polynomials)
+        if not polynomials:
+            return
+
+        rows = self._rows(polynomials)
+        self._reserve(len(rows))
+        self._data[self._size:self._size + len(rows)] = rows
+        self._size += len(rows)
+        self._strings.extend([None] * len(rows))
+        self._keys.update(row.tobytes() for row in rows)
+
+    def append(self, coeffs):
+        """Добавляет один многочлен."""
+        self.extend([coeffs])
+
+    def __len__(self):
+        return self._size
+
+    def _position(self, index):
+        # Массив данных длиннее заполненной части, поэтому отрицательный индекс отсчитывается от self._size
+        if not -self._size <= index < self._size:
+            raise IndexError("Индекс за пределами буфера")
+        return index + self._size if index < 0 else index
+
+    def __getitem__(self, index):
+        return [int(c) for c in self._data[self._position(index)]]
+
+    def __iter__(self):
+        for index in range(self._size):
+            yield self[index]
+
+    def __contains__(self, coeffs):
+        if self._size == 0:
+            return False
+        try:
+            row = self._rows([coeffs])[0]
+        except ValueError:
+            return False
+        return row.tobytes() in self._keys
+
+    def array(self):
+        """Заполненная часть буфера как массив NumPy (без копирования)."""
+        if self._data is None:
+            return np.empty((0, 0 if self.n is None else self.n + 1), dtype=self._dtype)
+        return self._data[:self._size]
+
+    def _cached_strings(self, index):
+        index = self._position(index)
+        if self._strings[index] is None:
+            row = self._data[index]
+            self._strings[index] = (format_polynomial(np.poly1d(row.astype(np.int64))), ", ".join(map(str, row)))
+        return self._strings[index]
+
+    def formatted(self, index):
+        """Многочлен в виде читаемой строки (например, "x^3 + x + 1")."""
+        return self._cached_strings(index)[0]
+
+    def coefficients_string(self, index):
+        """Коэффициенты многочлена строкой через запятую (от старшей степени к младшей)."""
+        return self._cached_strings(index)[1]
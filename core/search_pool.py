@@ -0,0 +1,114 @@
+import os
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class SearchWorkerPool:
+    """
+    Долгоживущий пул процессов для поиска неприводимых многочленов.
+
+    Процессы создаются один раз и переиспользуются всеми поисками. Вместо отдельного задания на каждого
+    кандидата процессу передаётся диапазон номеров [start, stop): кандидаты восстанавливаются по номеру
+    внутри процесса, а обратно возвращаются только номера найденных многочленов.
+    Размер диапазона подбирается по измеренной стоимости проверки одного кандидата так,
+    чтобы одно задание выполнялось около target_seconds.
+    """
+    def __init__(self, max_workers=None, target_seconds=0.25, min_chunk=8, max_chunk=1 << 16):
+        """
+        :param max_workers: Число процессов (по умолчанию os.cpu_count()).
+        :param target_seconds: Желаемая длительность одного задания.
+        :param min_chunk: Минимальный размер диапазона.
+        :param max_chunk: Максимальный размер диапазона.
+        """
+        self.max_workers = max_workers or os.cpu_count()
+        self.target_seconds = target_seconds
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self._executor = None
+        self._lock = threading.Lock()
+        # Экспоненциальное скользящее среднее стоимости одного кандидата по (функция, p, n)
+        self._cost = {}
+
+    @property
+    def executor(self):
+        """Пул процессов; создаётся при первом обращении и пересоздаётся, если процессы аварийно завершились."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _reset_executor(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, fn, *args):
+        """Отправляет произвольное задание в пул."""
+        try:
+            return self.executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._reset_executor()
+            return self.executor.submit(fn, *args)
+
+    def map(self, fn, iterable, chunksize=1):
+        """Аналог ProcessPoolExecutor.map на долгоживущем пуле (пул пересоздаётся, как в submit)."""
+        # ProcessPoolExecutor.map всё равно отправляет все задания сразу; список нужен для повторной отправки
+        items = list(iterable)
+        try:
+            return self.executor.map(fn, items, chunksize=chunksize)
+        except BrokenProcessPool:
+            self._reset_executor()
+            return self.executor.map(fn, items, chunksize=chunksize)
+
+    def chunk_size(self, fn, p, n):
+        """Размер диапазона для следующего задания по измеренной стоимости одного кандидата."""
+        cost = self._cost.get((fn.__name__, p, n))
+        if not cost:
+            return self.min_chunk
+
+        return int(max(self.min_chunk, min(self.max_chunk, self.target_seconds / cost)))
+
+    def record(self, fn, p, n, candidates, elapsed):
+        """Учитывает время, за которое процесс проверил candidates кандидатов."""
+        if candidates <= 0:
+            return
+
+        key = (fn.__name__, p, n)
+        cost = elapsed / candidates
+        with self._lock:
+            previous = self._cost.get(key)
+            self._cost[key] = cost if previous is None else 0.7 * previous + 0.3 * cost
+
+    def submit_range(self, fn, p, n, start, stop, *args):
+        """
+        Отправляет в пул проверку кандидатов с номерами [start, stop).
+
+        fn(p, n, start, stop, *args) должна возвращать пару (номера найденных, затраченное время).
+        """
+        return self.submit(fn, p, n, start, stop, *args)
+
+    def shutdown(self):
+        """Завершает процессы пула."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_search_pool():
+    """Возвращает общий для процесса пул поиска, создавая его при первом вызове."""
+    global _default_pool
+
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = SearchWorkerPool()
+            atexit.register(_default_pool.shutdown)
+
+        return _default_pool
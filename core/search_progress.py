@@ -0,0 +1,72 @@
+from .elements import count_irreducible_polynomials
+
+
+class SearchProgress:
+    """
+    Состояние перебора неприводимых многочленов степени n над GF(p).
+
+    Общее число кандидатов и неприводимых многочленов среди них известно точно (формула Гаусса),
+    поэтому по текущей скорости можно оценить время до k найденных многочленов и до конца перебора.
+    """
+    def __init__(self, p, n, offset=0):
+        """
+        :param p: Характеристика поля.
+        :param n: Степень многочленов.
+        :param offset: Номер первого кандидата, с которого начат перебор.
+        """
+        self.p = p
+        self.n = n
+        self.offset = offset
+        self.total_candidates = (p - 1) * p ** n
+        self.total_irreducible = (p - 1) * count_irreducible_polynomials(p, n)
+        self.tested = 0
+        self.hits = 0
+        self.elapsed = 0.0
+
+    def update(self, tested, hits, elapsed):
+        """Учитывает очередную проверенную порцию кандидатов."""
+        self.tested += tested
+        self.hits += hits
+        self.elapsed += elapsed
+
+    @property
+    def position(self):
+        """Номер следующего непроверенного кандидата."""
+        return min(self.offset + self.tested, self.total_candidates)
+
+    @property
+    def fraction_done(self):
+        """Доля всех кандидатов, просмотренных к текущему моменту (с учётом начального смещения)."""
+        return self.position / self.total_candidates
+
+    @property
+    def throughput(self):
+        """Скорость перебора, кандидатов в секунду."""
+        return self.tested / self.elapsed if self.elapsed > 0 else 0.0
+
+    def eta_to_completion(self):
+        """Оценка оставшегося времени до конца перебора в секундах (None, если скорость ещё неизвестна)."""
+        if not self.throughput:
+            return None
+        return (self.total_candidates - self.position) / self.throughput
+
+    def eta_to_hits(self, k):
+        """
+        Оценка времени (в секундах) до того, как будет найдено k многочленов.
+
+        Ожидаемое число кандидатов на одну находку берётся из точного числа неприводимых многочленов.
+        """
+        if self.hits >= k:
+            return 0.0
+        if not self.throughput:
+            return None
+        candidates_per_hit = self.total_candidates / self.total_irreducible
+        remaining = min((k - self.hits) * candidates_per_hit, self.total_candidates - self.position)
+        return remaining / self.throughput
+
+    def __str__(self):
+        eta = self.eta_to_completion()
+        eta_str = f"{eta:.1f} с" if eta is not None else "—"
+        return (f"Проверено {self.position} из {self.total_candidates} кандидатов, "
+                f"найдено {self.hits} (всего неприводимых: {self.total_irreducible}), "
+                f"скорость {self.throughput:.0f} кандидатов/с, до конца перебора: {eta_str}")
@@ -0,0 +1,590 @@
+"""
+Локальный HTTP/JSON-сервис арифметики в полях Галуа на asyncio (без внешних зависимостей).
+
+Маршруты:
+- GET /health - проверка доступности;
+- GET /metrics - задержки по маршрутам (гистограммы в секундах, как у OperationTimings), размеры порций,
+  число соединений и отклонённых запросов;
+- POST /fields - создание (проверка) поля: {"p": 2, "modulus": [1, 0, 0, 0, 1, 1, 0, 1, 1]};
+- POST /arith - операция в поле: {"field": ..., "op": "mul", "a": [...], "b": [...]} или {"items": [...]};
+- POST /inverse - обратный элемент: {"field": ..., "a": [...]};
+- POST /evaluate - значение многочлена в точке поля: {"field": ..., "poly": [...], "x": [...]};
+- POST /irreducible - проверка неприводимости (и примитивности): {"p": 3, "coeffs": [...], "primitive": true}.
+
+Поле задаётся идентификатором из ответа /fields ("field") или прямо полями p и modulus (без modulus - GF(p)).
+Одновременные запросы к одному полю объединяются в порции (micro-batching) и выполняются векторизованно
+(BatchField); крупные порции выполняются в пуле процессов поиска, чтобы не занимать цикл событий.
+"""
+import asyncio
+import json
+import threading
+from collections import OrderedDict
+from contextlib import suppress
+from time import perf_counter
+
+from .GaloisFieldExtension import GaloisFieldExtension
+from .elements import is_prime
+from .elements.batch import evaluate_batch
+from .elements.timing import OperationTimings
+from .find_irreducible_poly import check_polynomial
+from .search_pool import get_search_pool
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Порции набираются не дольше BATCH_DELAY секунд и не больше MAX_BATCH операций
+BATCH_DELAY = 0.002
+MAX_BATCH = 512
+# Порции, оценка стоимости которых меньше OFFLOAD_MIN_WORK (условных умножений коэффициентов),
+# выполняются прямо в цикле событий: передача в другой процесс стоила бы дороже самих вычислений
+OFFLOAD_MIN_WORK = 200_000
+# Сколько запросов может выполняться одновременно; сверх этого сервис отвечает 503 (Retry-After)
+MAX_PENDING = 1024
+KEEPALIVE_TIMEOUT = 15.0
+MAX_BODY = 1 << 20
+MAX_HEADER = 1 << 16
+MAX_FIELDS = 256
+
+HTTP_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    411: 'Length Required',
+    413: 'Payload Too Large',
+    431: 'Request Header Fields Too Large',
+    500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+
+class ServiceError(Exception):
+    """Ошибка запроса с HTTP-статусом ответа."""
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class MicroBatcher:
+    """
+    Объединяет одновременные запросы с одинаковым ключом в порции.
+
+    Первый запрос с новым ключом запускает таймер на delay секунд; все запросы с тем же ключом, пришедшие
+    до его срабатывания (или пока порция не наберёт max_batch элементов), выполняются одним вызовом
+    run_batch(key, items), который возвращает результаты в порядке items (строка - текст ошибки элемента).
+    """
+    def __init__(self, run_batch, delay=BATCH_DELAY, max_batch=MAX_BATCH):
+        self.run_batch = run_batch
+        self.delay = delay
+        self.max_batch = max_batch
+        self.batches = 0
+        self.items = 0
+        self.largest = 0
+        self._pending = {}
+        self._timers = {}
+        self._tasks = set()
+
+    async def submit(self, key, item):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((item, future))
+
+        if len(pending) >= self.max_batch:
+            self._flush(key)
+        elif len(pending) == 1:
+            self._timers[key] = loop.call_later(self.delay, self._flush, key)
+
+        return await future
+
+    def _flush(self, key):
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if not batch:
+            return
+
+        self.batches += 1
+        self.items += len(batch)
+        self.largest = max(self.largest, len(batch))
+
+        task = asyncio.ensure_future(self._run(key, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, key, batch):
+        try:
+            results = await self.run_batch(key, [item for item, _ in batch])
+        except Exception as e:
+            results = [ServiceError(f"Ошибка при выполнении порции операций: {e}", 500)] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            # Клиент мог уже отключиться - его результат просто отбрасывается
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            elif isinstance(result, str):
+                future.set_exception(ServiceError(result))
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        return {
+            'count': self.batches,
+            'items': self.items,
+            'mean_size': round(self.items / self.batches, 2) if self.batches else None,
+            'max_size': self.largest,
+        }
+
+
+def validate_field(p, modulus):
+    """
+    Проверяет параметры поля и возвращает канонический модуль.
+
+    :param p: Характеристика поля.
+    :param modulus: Коэффициенты модуля (от старшей степени к младшей) или None для GF(p).
+    :return: Кортеж коэффициентов модуля без старших нулей; для GF(p) - (1, 0) (многочлен x).
+    :raise ValueError: Если p не простое или модуль приводим.
+    """
+    if not is_prime(p):
+        raise ValueError(f"Число {p} не является простым!")
+    if modulus is None:
+        return (1, 0)
+
+    coeffs = [int(c) % p for c in modulus]
+    while len(coeffs) > 1 and coeffs[0] == 0:
+        coeffs.pop(0)
+    if len(coeffs) < 2:
+        raise ValueError("Модуль поля должен иметь степень не меньше 1")
+    GaloisFieldExtension(p, coeffs)
+    return tuple(coeffs)
+
+
+def check_polynomials(p, items):
+    """
+    Порция проверок неприводимости над GF(p) (выполняется в пуле процессов или в цикле событий).
+
+    :param items: Список пар (коэффициенты от старшей степени к младшей, проверять ли примитивность).
+    :return: Список словарей {"irreducible": ..., "primitive": ...}.
+    """
+    order_factors = {}
+    results = []
+    for coeffs, primitive in items:
+        irreducible, is_primitive = check_polynomial(p, coeffs, primitive, order_factors=order_factors)
+        result = {'irreducible': irreducible}
+        if primitive:
+            result['primitive'] = is_primitive
+        results.append(result)
+    return results
+
+
+def field_id(p, modulus):
+    """Идентификатор поля: "p" для GF(p), "p/коэффициенты модуля через запятую" для GF(p^n)."""
+    return str(p) if modulus == (1, 0) else f"{p}/{','.join(map(str, modulus))}"
+
+
+def _coeffs(value, name):
+    """Список целых коэффициентов из числа, списка или строки "1,0,1"."""
+    if isinstance(value, bool) or value is None:
+        raise ServiceError(f"Не задан или некорректен операнд '{name}'")
+    if isinstance(value, int):
+        return [value]
+    if isinstance(value, str):
+        value = [part for part in value.replace(',', ' ').split()]
+    if not isinstance(value, list) or not value:
+        raise ServiceError(f"Некорректный операнд '{name}': ожидался список коэффициентов")
+    try:
+        return [int(c) for c in value]
+    except (TypeError, ValueError):
+        raise ServiceError(f"Некорректный операнд '{name}': коэффициенты должны быть целыми числами")
+
+
+def _int(value, name):
+    if isinstance(value, bool):
+        raise ServiceError(f"Поле '{name}' должно быть целым числом")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ServiceError(f"Поле '{name}' должно быть целым числом")
+
+
+class FieldService:
+    """
+    HTTP/JSON-сервис арифметики в полях Галуа.
+
+    Соединения HTTP/1.1 остаются открытыми между запросами (keep-alive) и закрываются после
+    keepalive_timeout секунд простоя. Если одновременно выполняется max_pending запросов, новые
+    получают ответ 503 с заголовком Retry-After, а запись ответов ждёт освобождения буфера сокета (drain),
+    поэтому медленный клиент не заставляет сервис копить ответы в памяти.
+    """
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, batch_delay=BATCH_DELAY, max_batch=MAX_BATCH,
+                 max_pending=MAX_PENDING, keepalive_timeout=KEEPALIVE_TIMEOUT, max_body=MAX_BODY,
+                 offload_min_work=OFFLOAD_MIN_WORK):
+        """
+        :param host: Адрес для входящих соединений (по умолчанию только локальные).
+        :param port: Порт (0 - любой свободный; выбранный порт - в поле address после запуска).
+        :param batch_delay: Сколько секунд набирать порцию одновременных запросов к одному полю.
+        :param max_batch: Наибольший размер порции.
+        :param max_pending: Наибольшее число одновременно выполняемых запросов.
+        :param keepalive_timeout: Через сколько секунд простоя закрывать соединение.
+        :param max_body: Наибольший размер тела запроса в байтах.
+        :param offload_min_work: Начиная с какой оценки стоимости порция выполняется в пуле процессов.
+        """
+        self.host = host
+        self.port = port
+        self.max_pending = max_pending
+        self.keepalive_timeout = keepalive_timeout
+        self.max_body = max_body
+        self.offload_min_work = offload_min_work
+        self.address = None
+
+        self._arith = MicroBatcher(self._run_arith, batch_delay, max_batch)
+        self._irreducible = MicroBatcher(self._run_irreducible, batch_delay, max_batch)
+        self._fields = OrderedDict()
+        self._server = None
+        self._connections = {}
+        self._loop = None
+        self._thread = None
+        self._started = None
+
+        self._inflight = 0
+        self.requests = 0
+        self.rejected = 0
+        self.errors = 0
+        self.connections = 0
+        self.offloaded = 0
+        self.inline = 0
+        # Задержки по маршрутам - те же гистограммы, что и замеры операций в приложении
+        self.latency = OperationTimings()
+
+        self._routes = {
+            ('GET', '/health'): self._health,
+            ('GET', '/metrics'): self._metrics,
+            ('POST', '/fields'): self._create_field,
+            ('POST', '/arith'): self._arith_request,
+            ('POST', '/inverse'): self._inverse,
+            ('POST', '/evaluate'): self._evaluate,
+            ('POST', '/irreducible'): self._check_irreducible,
+        }
+
+    # --- Запуск и остановка ---
+
+    async def start(self):
+        """Начинает принимать соединения; возвращает пару (адрес, порт)."""
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port, limit=MAX_HEADER)
+        self.address = self._server.sockets[0].getsockname()[:2]
+        self._started = perf_counter()
+        return self.address
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # Открытые keep-alive соединения ждут следующего запроса: после закрытия сокета их обработчики
+            # получают конец потока и завершаются сами
+            for writer in self._connections.values():
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            with suppress(Exception):
+                await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    def start_in_thread(self):
+        """Запускает сервис в фоновом потоке со своим циклом событий; возвращает пару (адрес, порт)."""
+        ready = threading.Event()
+        errors = []
+
+        def run():
+            loop = asyncio.new_event_loop()
+            self._loop = loop
+            try:
+                loop.run_until_complete(self.start())
+            except Exception as e:
+                errors.append(e)
+                ready.set()
+                loop.close()
+                return
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self.close())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name='field-service', daemon=True)
+        self._thread.start()
+        ready.wait()
+        if errors:
+            raise errors[0]
+        return self.address
+
+    def stop_thread(self):
+        """Останавливает сервис, запущенный start_in_thread."""
+        if self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    # --- HTTP ---
+
+    async def _handle_connection(self, reader, writer):
+        self.connections += 1
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), self.keepalive_timeout)
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, {'error': "Слишком большие заголовки запроса"}, False)
+                    break
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                try:
+                    method, path, version, headers = self._parse_head(head)
+                except ValueError:
+                    await self._respond(writer, 400, {'error': "Некорректный HTTP-запрос"}, False)
+                    break
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+
+                body = b''
+                if 'transfer-encoding' in headers:
+                    await self._respond(writer, 411, {'error': "Нужен заголовок Content-Length"}, False)
+                    break
+                length = headers.get('content-length', '0')
+                if not length.isdigit():
+                    await self._respond(writer, 400, {'error': "Некорректный Content-Length"}, False)
+                    break
+                if int(length) > self.max_body:
+                    await self._respond(writer, 413, {'error': "Слишком большое тело запроса"}, False)
+                    break
+                if int(length):
+                    try:
+                        body = await asyncio.wait_for(reader.readexactly(int(length)), self.keepalive_timeout)
+                    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                        break
+
+                status, payload, extra = await self._dispatch(method, path, body)
+                await self._respond(writer, status, payload, keep_alive, extra)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+            with suppress(Exception):
+                await writer.wait_closed()
+
+    @staticmethod
+    def _parse_head(head):
+        lines = head.decode('latin-1').split('\r\n')
+        method, target, version = lines[0].split(' ')
+        if not version.startswith('HTTP/1.'):
+            raise ValueError(version)
+        headers = {}
+        for line in lines[1:]:
+            if line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        return method.upper(), target.split('?', 1)[0], version, headers
+
+    async def _respond(self, writer, status, payload, keep_alive, extra_headers=()):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        headers = [
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(body)}",
+            "Connection: keep-alive" if keep_alive else "Connection: close",
+        ]
+        if keep_alive:
+            headers.append(f"Keep-Alive: timeout={int(self.keepalive_timeout)}")
+        headers.extend(f"{name}: {value}" for name, value in extra_headers)
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+
+    async def _dispatch(self, method, path, body):
+        handler = self._routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self._routes):
+                return 405, {'error': f"Метод {method} не поддерживается для {path}"}, ()
+            return 404, {'error': f"Неизвестный маршрут {path}"}, ()
+
+        if method == 'GET':
+            return 200, handler(), ()
+
+        self.requests += 1
+        if self._inflight >= self.max_pending:
+            self.rejected += 1
+            return 503, {'error': "Сервис перегружен, повторите запрос позже"}, (('Retry-After', '1'),)
+
+        self._inflight += 1
+        start = perf_counter()
+        try:
+            try:
+                data = json.loads(body or b'{}')
+            except ValueError:
+                raise ServiceError("Тело запроса должно быть объектом JSON")
+            if not isinstance(data, dict):
+                raise ServiceError("Тело запроса должно быть объектом JSON")
+            return 200, await handler(data), ()
+        except ServiceError as e:
+            self.errors += 1
+            return e.status, {'error': str(e)}, ()
+        except Exception as e:
+            self.errors += 1
+            return 500, {'error': f"Внутренняя ошибка: {e}"}, ()
+        finally:
+            self._inflight -= 1
+            self.latency.record(path, perf_counter() - start)
+
+    # --- Вычисления ---
+
+    async def _offload(self, work, fn, *args):
+        """Выполняет fn(*args) в цикле событий или, если работа крупная, в пуле процессов поиска."""
+        if work < self.offload_min_work:
+            self.inline += 1
+            return fn(*args)
+        self.offloaded += 1
+        return await asyncio.wrap_future(get_search_pool().submit(fn, *args))
+
+    async def _field(self, data):
+        """Канонические (p, модуль) поля из запроса; проверенные поля запоминаются."""
+        if 'field' in data:
+            text = str(data['field'])
+            p_text, _, modulus_text = text.partition('/')
+            p = _int(p_text, 'field')
+            modulus = _coeffs(modulus_text, 'field') if modulus_text else None
+        else:
+            p = _int(data.get('p'), 'p')
+            modulus = _coeffs(data['modulus'], 'modulus') if data.get('modulus') not in (None, [], '') else None
+
+        key = (p, None if modulus is None else tuple(modulus))
+        cached = self._fields.get(key)
+        if cached is not None:
+            self._fields.move_to_end(key)
+            return cached
+
+        n = 1 if modulus is None else len(modulus)
+        try:
+            canonical = await self._offload(n ** 3 * p.bit_length(), validate_field, p, modulus)
+        except ValueError as e:
+            raise ServiceError(str(e))
+
+        self._fields[key] = (p, canonical)
+        if len(self._fields) > MAX_FIELDS:
+            self._fields.popitem(last=False)
+        return p, canonical
+
+    async def _run_arith(self, key, items):
+        p, modulus = key
+        n = len(modulus) - 1
+        # Обращение и деление - возведение в степень p^n - 2, вычисление значения - схема Горнера
+        heavy = any(op in ('inv', 'div', 'eval') for op, _, _ in items)
+        work = len(items) * n * n * (2 * n * p.bit_length() if heavy else 1)
+        return await self._offload(work, evaluate_batch, p, modulus, items)
+
+    async def _run_irreducible(self, key, items):
+        p = key
+        work = sum(len(coeffs) ** 3 * p.bit_length() for coeffs, _ in items)
+        return await self._offload(work, check_polynomials, p, items)
+
+    @staticmethod
+    def _result(field, value):
+        coeffs, polynomial = value
+        return {'result': coeffs[0] if field[1] == (1, 0) else coeffs, 'polynomial': polynomial}
+
+    async def _operation(self, field, op, a, b):
+        value = await self._arith.submit(field, (op, a, b))
+        return self._result(field, value)
+
+    def _health(self):
+        return {'status': 'ok'}
+
+    def _metrics(self):
+        return {
+            'uptime_s': round(perf_counter() - self._started, 3) if self._started else 0,
+            'connections': {'open': len(self._connections), 'total': self.connections},
+            'requests': {'total': self.requests, 'rejected': self.rejected, 'errors': self.errors,
+                         'inflight': self._inflight, 'max_pending': self.max_pending},
+            'latency': self.latency.summary(),
+            'batches': {'arith': self._arith.stats(), 'irreducible': self._irreducible.stats()},
+            'execution': {'inline': self.inline, 'offloaded': self.offloaded},
+        }
+
+    async def _create_field(self, data):
+        p, modulus = await self._field(data)
+        n = len(modulus) - 1
+        return {
+            'field': field_id(p, modulus),
+            'name': f"GF({p})" if modulus == (1, 0) else f"GF({p}^{n})",
+            'p': p,
+            'n': n,
+            'order': p ** n,
+            'modulus': list(modulus) if modulus != (1, 0) else None,
+        }
+
+    async def _arith_request(self, data):
+        field = await self._field(data)
+
+        if 'items' in data:
+            items = data['items']
+            if not isinstance(items, list):
+                raise ServiceError("Поле 'items' должно быть списком операций")
+
+            async def run(item):
+                try:
+                    if not isinstance(item, dict):
+                        raise ServiceError("Операция должна быть объектом JSON")
+                    op = str(item.get('op', ''))
+                    b = _coeffs(item['b'], 'b') if item.get('b') is not None else None
+                    return await self._operation(field, op, _coeffs(item.get('a'), 'a'), b)
+                except ServiceError as e:
+                    return {'error': str(e)}
+
+            return {'results': await asyncio.gather(*(run(item) for item in items))}
+
+        op = str(data.get('op', ''))
+        b = _coeffs(data['b'], 'b') if data.get('b') is not None else None
+        return await self._operation(field, op, _coeffs(data.get('a'), 'a'), b)
+
+    async def _inverse(self, data):
+        field = await self._field(data)
+        return await self._operation(field, 'inv', _coeffs(data.get('a'), 'a'), None)
+
+    async def _evaluate(self, data):
+        field = await self._field(data)
+        return await self._operation(field, 'eval', _coeffs(data.get('poly'), 'poly'), _coeffs(data.get('x'), 'x'))
+
+    async def _check_irreducible(self, data):
+        p = _int(data.get('p'), 'p')
+        if not is_prime(p):
+            raise ServiceError(f"Число {p} не является простым!")
+        coeffs = _coeffs(data.get('coeffs'), 'coeffs')
+        return await self._irreducible.submit(p, (coeffs, bool(data.get('primitive', False))))
+
+
+def run_service(host=DEFAULT_HOST, port=DEFAULT_PORT, **options):
+    """
+    Запускает сервис и обслуживает запросы до прерывания (Ctrl+C).
+
+    :param options: Параметры FieldService (batch_delay, max_batch, max_pending, ...).
+    """
+    service = FieldService(host, port, **options)
+
+    async def main():
+        address = await service.start()
+        print(f"Сервис полей Галуа запущен на http://{address[0]}:{address[1]}", flush=True)
+        await service.serve_forever()
+
+    with suppress(KeyboardInterrupt):
+        asyncio.run(main())
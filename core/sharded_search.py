@@ -0,0 +1,318 @@
+import os
+import time
+import socket
+import sqlite3
+import multiprocessing
+from datetime import datetime
+
+from .find_irreducible_poly import _scan_irreducible_range, _candidate_coeffs
+from .db import initialize_database, save_polynomials_to_db, mark_enumeration_complete
+
+# Число кандидатов в одном шарде манифеста
+SHARD_SIZE = 1 << 16
+
+# Время жизни аренды шарда (в секундах); воркер продлевает её после каждой проверенной порции
+LEASE_SECONDS = 60.0
+
+# Число кандидатов, после проверки которых воркер продлевает аренду
+LEASE_RENEW_CHUNK = 1 << 12
+
+MANIFEST_NAME = 'manifest.db'
+
+
+def _manifest_path(shard_dir):
+    return os.path.join(shard_dir, MANIFEST_NAME)
+
+
+def _shard_file(shard_dir, shard_id):
+    return os.path.join(shard_dir, f'shard_{shard_id:06d}.txt')
+
+
+def _connect(shard_dir):
+    # Несколько воркеров обращаются к манифесту одновременно: ждём снятия блокировки, а не падаем
+    return sqlite3.connect(_manifest_path(shard_dir), timeout=60, isolation_level=None)
+
+
+def create_manifest(p, n, shard_dir, shard_size=SHARD_SIZE):
+    """
+    Создаёт манифест шардированного перебора неприводимых многочленов степени n над GF(p).
+
+    Пространство номеров кандидатов [0, (p - 1) * p^n) (нумерация как в find_irreducible_polynomials_batch)
+    детерминированно делится на шарды по shard_size номеров. Манифест - база SQLite в каталоге shard_dir,
+    общем для всех воркеров (на одной машине или на нескольких с общей файловой системой).
+    Повторный вызов для того же каталога ничего не меняет.
+
+    :param p: Простое число, характеристика поля.
+    :param n: Степень многочленов.
+    :param shard_dir: Каталог с манифестом и файлами результатов шардов.
+    :param shard_size: Число кандидатов в одном шарде.
+    :return: Число шардов в манифесте.
+    """
+    os.makedirs(shard_dir, exist_ok=True)
+    total_combinations = (p - 1) * (p ** n)
+
+    conn = _connect(shard_dir)
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS manifest (
+                p INTEGER NOT NULL,
+                n INTEGER NOT NULL,
+                shard_size TEXT NOT NULL,
+                shard_count INTEGER NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS shards (
+                shard_id INTEGER PRIMARY KEY,
+                start TEXT NOT NULL,
+                stop TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_expires REAL,
+                hits INTEGER,
+                merged INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+        row = conn.execute('SELECT p, n, shard_count FROM manifest').fetchone()
+        if row is not None:
+            conn.execute('COMMIT')
+            if row[:2] != (p, n):
+                raise ValueError(f"Каталог {shard_dir} уже содержит манифест для p={row[0]}, n={row[1]}")
+            return row[2]
+
+        shard_count = -(-total_combinations // shard_size)
+        conn.executemany(
+            'INSERT INTO shards (shard_id, start, stop) VALUES (?, ?, ?)',
+            ((shard_id, str(shard_id * shard_size), str(min((shard_id + 1) * shard_size, total_combinations)))
+             for shard_id in range(shard_count))
+        )
+        conn.execute('INSERT INTO manifest (p, n, shard_size, shard_count) VALUES (?, ?, ?, ?)',
+                     (p, n, str(shard_size), shard_count))
+        conn.execute('COMMIT')
+        return shard_count
+    except Exception:
+        if conn.in_transaction:
+            conn.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+
+
+def read_manifest(shard_dir):
+    """Возвращает (p, n, shard_size, shard_count) манифеста из каталога shard_dir."""
+    conn = _connect(shard_dir)
+    try:
+        p, n, shard_size, shard_count = conn.execute('SELECT p, n, shard_size, shard_count FROM manifest').fetchone()
+    finally:
+        conn.close()
+
+    return p, n, int(shard_size), shard_count
+
+
+def claim_shard(shard_dir, worker_id, lease_seconds=LEASE_SECONDS):
+    """
+    Берёт в аренду очередной шард: ещё не начатый или тот, аренда которого истекла
+    (воркер, державший его, аварийно завершился или потерял связь).
+
+    Аренды сравниваются по системным часам, поэтому на нескольких машинах часы должны быть синхронизированы.
+
+    :return: Тройка (номер шарда, начало, конец диапазона) или None, если свободных шардов нет.
+    """
+    conn = _connect(shard_dir)
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        now = time.time()
+        row = conn.execute('''
+            SELECT shard_id, start, stop FROM shards
+            WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+            ORDER BY shard_id LIMIT 1
+        ''', (now,)).fetchone()
+
+        if row is None:
+            conn.execute('COMMIT')
+            return None
+
+        conn.execute("UPDATE shards SET status = 'leased', worker = ?, lease_expires = ? WHERE shard_id = ?",
+                     (worker_id, now + lease_seconds, row[0]))
+        conn.execute('COMMIT')
+        return row[0], int(row[1]), int(row[2])
+    except Exception:
+        if conn.in_transaction:
+            conn.execute('ROLLBACK')
+        raise
+    finally:
+        conn.close()
+
+
+def renew_lease(shard_dir, shard_id, worker_id, lease_seconds=LEASE_SECONDS):
+    """
+    Продлевает аренду шарда.
+
+    :return: False, если шард уже передан другому воркеру (аренда истекла), иначе True.
+    """
+    conn = _connect(shard_dir)
+    try:
+        cursor = conn.execute('''
+            UPDATE shards SET lease_expires = ?
+            WHERE shard_id = ? AND worker = ? AND status = 'leased'
+        ''', (time.time() + lease_seconds, shard_id, worker_id))
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+
+def complete_shard(shard_dir, shard_id, worker_id, hits):
+    """Отмечает шард как проверенный, если он всё ещё арендован этим воркером."""
+    conn = _connect(shard_dir)
+    try:
+        cursor = conn.execute('''
+            UPDATE shards SET status = 'done', hits = ?, lease_expires = NULL
+            WHERE shard_id = ? AND worker = ? AND status = 'leased'
+        ''', (hits, shard_id, worker_id))
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+
+def run_shard_worker(shard_dir, worker_id=None, lease_seconds=LEASE_SECONDS, max_shards=None):
+    """
+    Воркер шардированного перебора: арендует шарды из манифеста, пока они не закончатся.
+
+    Каждый шард проверяется порциями по LEASE_RENEW_CHUNK кандидатов с продлением аренды после каждой порции.
+    Найденные многочлены пишутся во временный файл, который по окончании шарда атомарно переименовывается
+    в файл результатов шарда. Поэтому шард, брошенный упавшим воркером, не оставляет частичных результатов
+    и после истечения аренды проверяется заново другим воркером.
+
+    :param shard_dir: Каталог с манифестом.
+    :param worker_id: Имя воркера (по умолчанию "<имя машины>:<pid>").
+    :param lease_seconds: Время жизни аренды.
+    :param max_shards: Сколько шардов проверить до выхода (по умолчанию - пока есть свободные).
+    :return: Число проверенных этим воркером шардов.
+    """
+    worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+    p, n, _, _ = read_manifest(shard_dir)
+    completed = 0
+
+    while max_shards is None or completed < max_shards:
+        claimed = claim_shard(shard_dir, worker_id, lease_seconds)
+        if claimed is None:
+            break
+
+        shard_id, start, stop = claimed
+        result_file = _shard_file(shard_dir, shard_id)
+        tmp_file = f'{result_file}.{worker_id.replace(os.sep, "_")}.tmp'
+        hits = 0
+        lost_lease = False
+
+        with open(tmp_file, 'w') as f:
+            for position in range(start, stop, LEASE_RENEW_CHUNK):
+                indices, _ = _scan_irreducible_range(p, n, position, min(position + LEASE_RENEW_CHUNK, stop))
+                for index in indices:
+                    f.write(f'{index}\t{", ".join(map(str, _candidate_coeffs(index, p, n)[::-1]))}\n')
+                hits += len(indices)
+
+                if not renew_lease(shard_dir, shard_id, worker_id, lease_seconds):
+                    lost_lease = True
+                    break
+
+        if lost_lease:
+            os.remove(tmp_file)
+            continue
+
+        os.replace(tmp_file, result_file)
+        if complete_shard(shard_dir, shard_id, worker_id, hits):
+            completed += 1
+
+    return completed
+
+
+def shard_status(shard_dir):
+    """Возвращает словарь {состояние шарда: число шардов}, где состояние - pending, leased, done или merged."""
+    conn = _connect(shard_dir)
+    try:
+        rows = conn.execute('''
+            SELECT CASE WHEN merged THEN 'merged' ELSE status END, COUNT(*) FROM shards GROUP BY 1
+        ''').fetchall()
+    finally:
+        conn.close()
+
+    return dict(rows)
+
+
+def merge_shards(shard_dir, db_path='irreducible_polynomials.db'):
+    """
+    Переносит результаты проверенных шардов в каталог неприводимых многочленов.
+
+    Каждый шард переносится один раз: отметка о переносе ставится в той же транзакции манифеста,
+    только после того как многочлены шарда записаны в каталог. Когда перенесены все шарды,
+    перебор отмечается в каталоге как полный.
+
+    :return: Число перенесённых многочленов.
+    :raises RuntimeError: Если многочлены шарда не удалось сохранить в каталог.
+    """
+    p, n, _, shard_count = read_manifest(shard_dir)
+    initialize_database(db_path)
+
+    conn = _connect(shard_dir)
+    try:
+        shard_ids = [row[0] for row in conn.execute(
+            "SELECT shard_id FROM shards WHERE status = 'done' AND merged = 0 ORDER BY shard_id")]
+
+        merged = 0
+        for shard_id in shard_ids:
+            with open(_shard_file(shard_dir, shard_id)) as f:
+                polynomials = [list(map(int, line.split('\t')[1].split(', '))) for line in f if line.strip()]
+
+            # Если запись в каталог не удалась, шард остаётся неперенесённым и переносится при следующем вызове;
+            # если же не удалось поставить отметку, повторная запись в каталог ничего не меняет (INSERT OR IGNORE)
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if not save_polynomials_to_db(polynomials, p, n, datetime.now(), db_path=db_path):
+                    raise RuntimeError(f"Не удалось перенести в каталог результаты шарда {shard_id}")
+                conn.execute('UPDATE shards SET merged = 1 WHERE shard_id = ?', (shard_id,))
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            merged += len(polynomials)
+
+        merged_shards, total_hits = conn.execute('SELECT COUNT(*), SUM(hits) FROM shards WHERE merged = 1').fetchone()
+    finally:
+        conn.close()
+
+    if merged_shards == shard_count:
+        # Шарды перебирают многочлены со всеми старшими коэффициентами, а в отметке хранится число унитарных:
+        # каждый унитарный неприводимый многочлен даёт p - 1 неприводимых, отличающихся множителем
+        mark_enumeration_complete(p, n, total_hits // (p - 1), datetime.now(), db_path=db_path)
+
+    return merged
+
+
+def run_local_sharded_search(p, n, shard_dir, workers=None, shard_size=SHARD_SIZE,
+                             lease_seconds=LEASE_SECONDS, db_path='irreducible_polynomials.db'):
+    """
+    Локальный режим шардированного перебора: создаёт манифест, запускает workers процессов-воркеров,
+    дожидается их и переносит результаты в каталог.
+
+    Если каталог shard_dir уже содержит манифест того же перебора, продолжает его с непроверенных шардов.
+
+    :return: Словарь состояний шардов после переноса (см. shard_status).
+    """
+    create_manifest(p, n, shard_dir, shard_size)
+    workers = workers or os.cpu_count()
+
+    processes = [
+        multiprocessing.Process(target=run_shard_worker, args=(shard_dir, f'{socket.gethostname()}:local-{i}',
+                                                               lease_seconds))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    merge_shards(shard_dir, db_path=db_path)
+
+    return shard_status(shard_dir)
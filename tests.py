@@ -1,11 +1,67 @@
 import os
+import sys
+import json
 import time
+import sqlite3
+import subprocess
+import itertools
+import http.client
+
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing
+from datetime import datetime
 
 import pytest
 
 from typing import List
 
-from core import GaloisFieldSimple, GaloisFieldExtension
+from core import (
+    GaloisFieldSimple,
+    GaloisFieldExtension,
+    sieve_irreducible_polynomials,
+    random_irreducible,
+    is_primitive,
+    find_low_weight_irreducible,
+    iter_irreducible,
+    iter_resumable,
+    iter_resumable_ranges,
+    create_manifest,
+    claim_shard,
+    run_local_sharded_search,
+    get_saved_polynomials,
+    BackgroundSearch,
+    SearchWorkerPool,
+    SearchProgress,
+    count_irreducible_polynomials,
+    PolynomialBuffer,
+    initialize_database,
+    save_polynomials_to_db,
+    iter_saved_polynomials,
+    get_saved_polynomials_page,
+    export_catalog,
+    CatalogFile,
+    factor_polynomial,
+    OperationLog,
+    LEVEL_INFO,
+    OperationMemo,
+    enable_memo,
+    disable_memo,
+    memo_field_key,
+    FieldService,
+    compile_expression,
+    enable_timings,
+    disable_timings,
+    get_timings,
+    CostModel,
+    set_cost_model,
+    Planner,
+    PlanError,
+)
+
+from core.cli import main as cli_main
+from core.elements.functions import inverse_polynomial, multiply_polynomials
+from core.elements.irreducibility_test import mobius
 
 from sage.all import *
 
@@ -374,3 +430,627 @@ def test_galois_field_extension(data):
 
     # Логирование результатов
     log_timing(max_degree, elapsed_time)
+
+
+@pytest.mark.parametrize("p, n", [(2, 6), (3, 4), (5, 3)])
+def test_sieve_irreducible_polynomials(p, n):
+    R = PolynomialRing(GF(p), 'x')
+
+    sieve_result = sieve_irreducible_polynomials(p, n, use_db=False)
+
+    # Все найденные многочлены неприводимы и различны
+    assert len(set(map(tuple, sieve_result))) == len(sieve_result)
+    for coeffs in sieve_result:
+        assert R(coeffs[::-1]).is_irreducible(), f"Многочлен {coeffs} приводим"
+
+    sage_count = sum(1 for poly in R.polynomials(of_degree=n) if poly.is_monic() and poly.is_irreducible())
+    assert len(sieve_result) == sage_count, f"Ожидалось {sage_count}, получено {len(sieve_result)}"
+
+
+@pytest.mark.parametrize("p, n", [(2, 1), (2, 6), (2, 10), (3, 4), (3, 6), (5, 3), (7, 2)])
+def test_count_irreducible_polynomials(p, n):
+    # Формула Гаусса совпадает с числом унитарных неприводимых многочленов, найденных решетом
+    assert count_irreducible_polynomials(p, n) == len(sieve_irreducible_polynomials(p, n, use_db=False))
+    assert [mobius(k) for k in range(1, 13)] == [1, -1, -1, 0, -1, 1, -1, 0, 0, 1, -1, 0]
+
+    progress = SearchProgress(p, n)
+    assert progress.total_irreducible == (p - 1) * count_irreducible_polynomials(p, n)
+    assert progress.eta_to_completion() is None and progress.eta_to_hits(1) is None
+
+    # Проверена половина кандидатов за секунду: до конца перебора ещё около секунды
+    half = progress.total_candidates // 2
+    progress.update(half, progress.total_irreducible // 2, 1.0)
+    assert progress.position == half and progress.throughput == half
+    assert progress.eta_to_completion() == pytest.approx((progress.total_candidates - half) / half)
+    assert progress.eta_to_hits(progress.hits) == 0.0
+    assert 0 < progress.eta_to_hits(progress.hits + 1) <= progress.eta_to_completion()
+
+
+@pytest.mark.parametrize("p, n", [(2, 31), (3, 20), (7, 9)])
+def test_random_irreducible(p, n):
+    R = PolynomialRing(GF(p), 'x')
+
+    result = random_irreducible(p, n, count=3, seed=2024)
+
+    # При одинаковом seed результат не зависит от числа процессов
+    assert result == random_irreducible(p, n, count=3, seed=2024, max_workers=1)
+    assert len(result) == 3
+    for coeffs in result:
+        assert len(coeffs) == n + 1 and coeffs[0] == 1
+        assert R(coeffs[::-1]).is_irreducible(), f"Многочлен {coeffs} приводим"
+
+
+@pytest.mark.parametrize("p, n", [(2, 6), (3, 4), (5, 3)])
+def test_is_primitive(p, n):
+    R = PolynomialRing(GF(p), 'x')
+
+    for poly in R.polynomials(of_degree=n):
+        if not poly.is_monic():
+            continue
+        coeffs = [int(c) for c in poly.list()[::-1]]
+        assert is_primitive(p, coeffs) == poly.is_primitive(), f"Ошибка для многочлена {coeffs}"
+
+
+@pytest.mark.parametrize("p, n", [(2, 8), (2, 63), (3, 10), (5, 7)])
+def test_find_low_weight_irreducible(p, n):
+    R = PolynomialRing(GF(p), 'x')
+
+    coeffs = find_low_weight_irreducible(p, n)
+    sage_poly = R(coeffs[::-1])
+
+    assert sage_poly.is_irreducible(), f"Многочлен {coeffs} приводим"
+
+    # Многочленов меньшего веса среди неприводимых нет
+    weight = sum(1 for c in coeffs if c)
+    for poly in R.polynomials(of_degree=n) if p ** n <= 1 << 16 else []:
+        if poly.is_monic() and len(poly.exponents()) < weight:
+            assert not poly.is_irreducible(), f"Найден многочлен меньшего веса: {poly}"
+
+
+@pytest.mark.parametrize("p, n, start", [(2, 7, 0), (3, 4, 50), (5, 3, 130)])
+def test_iter_irreducible_order(p, n, start):
+    R = PolynomialRing(GF(p), 'x')
+
+    with closing(iter_irreducible(p, n, start=start, with_index=True)) as hits:
+        first = list(itertools.islice(hits, 10))
+
+    indices = [index for index, _ in first]
+    assert indices == sorted(indices) and indices[0] >= start
+
+    for index, coeffs in first:
+        assert R(coeffs[::-1]).is_irreducible(), f"Многочлен {coeffs} приводим"
+
+    # Между найденными нет пропущенных неприводимых кандидатов
+    assert first == [hit for hit in iter_irreducible(p, n, start=start, stop=indices[-1] + 1, with_index=True)]
+
+
+@pytest.mark.parametrize("p, n, mode", [(2, 9, "lex"), (3, 5, "lex"), (3, 6, "primitive")])
+def test_resumable_search(p, n, mode, tmp_path):
+    db_path = str(tmp_path / 'search.db')
+    if mode == "lex":
+        full = list(iter_irreducible(p, n, with_index=True))
+    else:
+        full = [(index, coeffs) for index, coeffs in iter_irreducible(p, n, stop=p ** n, with_index=True)
+                if is_primitive(p, coeffs)]
+
+    # Прерванный поиск сохраняет ход в базе данных
+    with closing(iter_resumable(p, n, mode=mode, with_index=True, db_path=db_path)) as search:
+        assert list(itertools.islice(search, 25)) == full[:25]
+
+    # Продолжение выдаёт сохранённые находки порциями не больше chunk_hits и дальше совпадает с полным перебором
+    ranges = list(iter_resumable_ranges(p, n, mode=mode, db_path=db_path, chunk_hits=10))
+    assert all(len(hits) <= 10 for _, hits in ranges[:2])
+    assert [hit for _, hits in ranges for hit in hits] == full
+    scanned = [scanned_to for scanned_to, _ in ranges]
+    assert scanned == sorted(scanned)
+
+    # Повторный запуск берёт все находки из базы данных, в том числе с середины
+    middle = full[len(full) // 2][0]
+    assert list(iter_resumable(p, n, start=middle, mode=mode, with_index=True, db_path=db_path)) == \
+        [hit for hit in full if hit[0] >= middle]
+
+
+def _scan_squares(p, n, start, stop):
+    """Функция проверки диапазона для теста пула: находки - квадраты, время - фиксированное."""
+    return [index for index in range(start, stop) if int(index ** 0.5) ** 2 == index], 0.01
+
+
+def test_search_worker_pool():
+    pool = SearchWorkerPool(max_workers=2, target_seconds=0.5, min_chunk=8, max_chunk=1000)
+    try:
+        # Без замеров - наименьший диапазон, затем размер подстраивается под target_seconds
+        assert pool.chunk_size(_scan_squares, 2, 10) == 8
+        pool.record(_scan_squares, 2, 10, 100, 0.5)
+        assert pool.chunk_size(_scan_squares, 2, 10) == 100
+        pool.record(_scan_squares, 2, 10, 100, 0.005)
+        assert 100 < pool.chunk_size(_scan_squares, 2, 10) <= 1000
+        pool.record(_scan_squares, 2, 10, 1, 100.0)
+        assert pool.chunk_size(_scan_squares, 2, 10) == 8
+        assert pool.chunk_size(_scan_squares, 3, 10) == 8
+
+        assert pool.submit_range(_scan_squares, 2, 10, 0, 20).result()[0] == [0, 1, 4, 9, 16]
+
+        # Аварийно завершившийся процесс ломает пул; submit и map пересоздают его
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result()
+        assert pool.submit(abs, -5).result() == 5
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result()
+        assert list(pool.map(abs, [-1, -2, -3], chunksize=2)) == [1, 2, 3]
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.parametrize("p, n", [(2, 8), (3, 5)])
+def test_sharded_search(p, n, tmp_path):
+    R = PolynomialRing(GF(p), 'x')
+    shard_dir = str(tmp_path / 'shards')
+    db_path = str(tmp_path / 'catalog.db')
+
+    create_manifest(p, n, shard_dir, shard_size=50)
+    # Аренда "упавшего" воркера истекла: шард должен быть проверен заново
+    assert claim_shard(shard_dir, 'crashed', lease_seconds=-1) is not None
+
+    status = run_local_sharded_search(p, n, shard_dir, workers=3, shard_size=50, db_path=db_path)
+    assert set(status) == {'merged'}
+
+    saved = [list(map(int, coeffs_str.split(','))) for _, _, coeffs_str, _ in get_saved_polynomials(p, n, db_path=db_path)]
+    sage_count = sum(1 for poly in R.polynomials(of_degree=n) if poly.is_irreducible())
+    assert len(saved) == len(set(map(tuple, saved))) == sage_count
+    for coeffs in saved:
+        assert R(coeffs[::-1]).is_irreducible(), f"Многочлен {coeffs} приводим"
+
+    # В отметке о полном переборе хранится число унитарных многочленов
+    with closing(sqlite3.connect(db_path)) as conn:
+        (count,) = conn.execute("SELECT count FROM complete_enumerations WHERE p = ? AND n = ?", (p, n)).fetchone()
+    assert count == sage_count // (p - 1)
+
+
+def test_sharded_merge_failed_save(tmp_path, monkeypatch):
+    import core.sharded_search as sharded_search
+
+    p, n = 2, 6
+    shard_dir = str(tmp_path / 'shards')
+    db_path = str(tmp_path / 'catalog.db')
+    create_manifest(p, n, shard_dir, shard_size=50)
+    sharded_search.run_shard_worker(shard_dir)
+
+    # Шард, который не удалось записать в каталог, не отмечается перенесённым, а перебор - полным
+    monkeypatch.setattr(sharded_search, 'save_polynomials_to_db', lambda *args, **kwargs: False)
+    with pytest.raises(RuntimeError):
+        sharded_search.merge_shards(shard_dir, db_path=db_path)
+    assert sharded_search.shard_status(shard_dir) == {'done': 2}
+    with closing(sqlite3.connect(db_path)) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM complete_enumerations").fetchone() == (0,)
+
+    monkeypatch.undo()
+    assert sharded_search.merge_shards(shard_dir, db_path=db_path) == 9
+    assert sharded_search.shard_status(shard_dir) == {'merged': 2}
+
+
+@pytest.mark.parametrize("p, n", [(2, 6), (7, 3), (65521, 2)])
+def test_polynomial_buffer(p, n):
+    polys = [[1] + list(rest) for rest in itertools.islice(itertools.product(range(p), repeat=n), 40)]
+
+    # Ёмкость 2: при добавлении буфер несколько раз растёт; степень определяется по первому многочлену
+    buffer = PolynomialBuffer(p, capacity=2)
+    buffer.append(polys[0])
+    buffer.extend(polys[1:])
+    assert len(buffer) == 40 and list(buffer) == polys and buffer.array().shape == (40, n + 1)
+
+    # Отрицательные индексы отсчитываются от заполненной части, а не от ёмкости
+    assert buffer[-1] == polys[-1] and buffer[-40] == polys[0]
+    assert buffer.coefficients_string(-1) == buffer.coefficients_string(39) == ", ".join(map(str, polys[-1]))
+    for index in (40, -41):
+        with pytest.raises(IndexError):
+            buffer[index]
+
+    # Коэффициенты приводятся по модулю p, в том числе при проверке вхождения
+    assert [c + p for c in polys[5]] in buffer
+    assert [2] + [0] * n not in buffer and [1] * (n + 2) not in buffer
+    with pytest.raises(ValueError):
+        buffer.append([1] * (n + 2))
+
+    small = PolynomialBuffer(p, n, capacity=2)
+    small.append([1] * (n + 1))
+    assert small[-1] == small[0] == [1] * (n + 1) and len(small) == 1
+
+
+def test_background_search_cancel():
+    p, n = 3, 40
+    R = PolynomialRing(GF(p), 'x')
+
+    def steps():
+        for coeffs in iter_irreducible(p, n):
+            yield [coeffs], 1
+
+    search = BackgroundSearch(steps()).start()
+    time.sleep(1)
+    assert search.running
+
+    search.cancel()
+    assert search.join(timeout=10), "Поиск не остановился после отмены"
+    assert not search.exhausted
+
+    found, _ = search.snapshot()
+    for coeffs in found:
+        assert R(coeffs[::-1]).is_irreducible(), f"Многочлен {coeffs} приводим"
+
+
+@pytest.mark.parametrize("p, n", [(2, 9), (3, 5), (5, 3)])
+def test_iter_saved_polynomials_order(p, n, tmp_path):
+    R = PolynomialRing(GF(p), 'x')
+    db_path = str(tmp_path / 'catalog.db')
+
+    polys = [[int(c) for c in reversed(poly.list())]
+             for poly in R.polynomials(of_degree=n) if poly.is_irreducible()]
+    initialize_database(db_path)
+    # Сохраняются в порядке, отличном от лексикографического
+    save_polynomials_to_db(polys[::-1], p, n, datetime.now(), db_path=db_path)
+
+    # Страницы по 7 многочленов выдаются в лексикографическом порядке коэффициентов без пропусков и повторов
+    saved = [coeffs for coeffs, _ in iter_saved_polynomials(p, n, page_size=7, db_path=db_path)]
+    assert saved == sorted(polys)
+
+    # Страница с пропуском от известного многочлена совпадает с соответствующим срезом
+    page = get_saved_polynomials_page(p, n, after=saved[2], limit=5, offset=4, db_path=db_path)
+    assert [coeffs for coeffs, _ in page] == saved[7:12]
+
+
+@pytest.mark.parametrize("p, n", [(2, 10), (3, 6)])
+def test_catalog_file(p, n, tmp_path):
+    R = PolynomialRing(GF(p), 'x')
+    db_path = str(tmp_path / 'catalog.db')
+    catalog_path = str(tmp_path / 'catalog.gfc')
+
+    initialize_database(db_path)
+    irreducible = sieve_irreducible_polynomials(p, n, db_path=db_path)
+    save_polynomials_to_db(irreducible, p, n, datetime.now(), db_path=db_path)
+    assert export_catalog(catalog_path, p_range=[p], n_range=[n], db_path=db_path) == len(irreducible)
+
+    with CatalogFile(catalog_path) as catalog:
+        assert catalog.polynomials(p, n) == sorted(irreducible)
+
+        # Проверка принадлежности совпадает с Sage для всех унитарных многочленов степени n
+        for poly in R.polynomials(of_degree=n):
+            if poly.is_monic():
+                known = catalog.contains(p, [int(c) for c in reversed(poly.list())])
+                assert known is True if poly.is_irreducible() else known is None
+
+
+@pytest.mark.parametrize("spill_name", [None, 'log.jsonl', 'log.db'])
+def test_operation_log(spill_name, tmp_path):
+    log = OperationLog(capacity=10, spill_path=None if spill_name is None else str(tmp_path / spill_name))
+
+    for i in range(100):
+        log.log("Информация: нет элементов", LEVEL_INFO)
+        log.log(op="Умножение", operands=[i, 2], result=2 * i, duration=0.001)
+
+    # В памяти не больше capacity записей, одинаковые информационные сообщения не дублируются
+    assert len(log) == 10
+    assert sum(1 for entry in log if entry.level == LEVEL_INFO) == 1
+
+    entries = list(log.iter_all())
+    operations = [entry.result for entry in entries if entry.op == "Умножение"]
+    if spill_name is None:
+        assert operations == [str(2 * i) for i in range(91, 100)] and log.dropped > 0
+    else:
+        # Вытесненные записи сохранены на диске, выгрузка включает их
+        assert operations == [str(2 * i) for i in range(100)]
+        assert sum(entry.count for entry in entries if entry.level == LEVEL_INFO) == 100
+        assert len(log.export('jsonl').splitlines()) == len(entries)
+
+    # Повтор информационного сообщения не делает собранную выгрузку устаревшей, новая запись - делает
+    version = log.version
+    log.log("Информация: нет элементов", LEVEL_INFO)
+    assert log.version == version
+    log.log(op="Умножение", operands=[1, 2], result=2)
+    assert log.version == version + 1
+
+
+@pytest.mark.parametrize("p, n", [(2, 60), (3, 40), (7, 25), (65521, 12)])
+def test_factor_polynomial(p, n):
+    R = PolynomialRing(GF(p), 'x')
+
+    for _ in range(5):
+        # Случайный многочлен, домноженный на квадрат и p-ю степень, чтобы проверить кратности
+        poly = R.random_element(degree=n) * R.random_element(degree=3) ** 2 * R.random_element(degree=2) ** p \
+            if p < 10 else R.random_element(degree=n) * R.random_element(degree=3) ** 2
+        coeffs = [int(c) for c in reversed(poly.list())]
+
+        lead, factors = factor_polynomial(coeffs, p)
+
+        sage_factors = sorted(([int(c) for c in reversed(f.list())], e) for f, e in poly.factor())
+        assert sorted(factors) == sage_factors, f"Ошибка разложения многочлена {coeffs}"
+        assert lead == int(poly.leading_coefficient())
+
+    # Разложение через метод многочлена
+    field = GaloisFieldSimple(p)
+    lead, factors = field.create_polynom([5, 5, 0]).factor()
+    assert lead == 5 % p and [(str(f), e) for f, e in factors] == [("x", 1), ("x + 1", 1)]
+
+
+@pytest.mark.parametrize("p, modulus", [(2, [1, 0, 0, 0, 1, 1, 0, 1, 1]), (5, [1, 0, 3, 3])])
+def test_operation_memo(p, modulus):
+    field = GaloisFieldExtension(p, modulus)
+    elements = [field.create_element(list(c)) for c in itertools.product(range(p), repeat=3) if any(c)][:20]
+
+    def results():
+        return [str(a * b) + str(a / b) + str(b.inverse()) for a in elements[:5] for b in elements]
+
+    expected = results()
+    memo = enable_memo()
+    try:
+        # Результаты с кэшем совпадают с результатами без него, повторные вычисления берутся из кэша
+        assert results() == expected
+        misses = memo.stats()['misses']
+        assert results() == expected
+        assert memo.stats()['misses'] == misses and memo.stats()['hits'] >= misses
+
+        # Смена поля освобождает только записи прежнего поля
+        GaloisFieldSimple(p).create_polynom([1, 1]) * GaloisFieldSimple(p).create_polynom([1, 2])
+        memo.invalidate(memo_field_key(p, modulus))
+        assert len(memo) == 1
+    finally:
+        disable_memo()
+
+    # Вытеснение давно не использованных записей по числу записей и по объёму
+    memo = OperationMemo(max_entries=3)
+    for i in range(5):
+        memo.store(i, (i,))
+        memo.lookup(0)
+    assert len(memo) == 3 and memo.lookup(0)[0] and not memo.lookup(1)[0]
+
+    memo = OperationMemo(max_bytes=1000)
+    for i in range(100):
+        memo.store(i, tuple(range(10)))
+    assert 0 < memo.stats()['bytes'] <= 1000 and memo.stats()['evictions'] > 0
+
+
+IMPORT_TIME_BUDGET = 0.3
+
+
+def test_import_core_is_light():
+    # Импорт в отдельном процессе, чтобы не мешали уже загруженные модули (sage, streamlit и т.п.)
+    script = (
+        "import sys, time\n"
+        "path = list(sys.path)\n"
+        "start = time.perf_counter()\n"
+        "import core\n"
+        "elapsed = time.perf_counter() - start\n"
+        "heavy = sorted(name for name in ('sympy', 'streamlit', 'elements', 'pandas') if name in sys.modules)\n"
+        "print(elapsed, ','.join(heavy) or '-', sys.path == path)\n"
+    )
+    root = os.path.dirname(os.path.abspath(__file__))
+
+    timings = []
+    for _ in range(3):
+        output = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True,
+                                check=True).stdout.split()
+        elapsed, heavy, path_unchanged = float(output[0]), output[1], output[2]
+        assert heavy == "-", f"import core загружает лишние модули: {heavy}"
+        assert path_unchanged == "True", "import core изменяет sys.path"
+        timings.append(elapsed)
+
+    assert min(timings) < IMPORT_TIME_BUDGET, f"import core занимает {min(timings):.3f} с"
+
+
+@pytest.mark.parametrize("p, modulus", [(2, [1, 0, 0, 0, 1, 1, 0, 1, 1]), (3, [1, 0, 2, 1])])
+def test_cli_arith_and_verify(p, modulus, tmp_path):
+    n = len(modulus) - 1
+    R = PolynomialRing(GF(p), 'x')
+    F = R.quotient(R(list(reversed(modulus))))
+    elements = [list(c) for c in itertools.product(range(p), repeat=n) if any(c)][:30]
+
+    records = [{"p": p, "modulus": modulus, "op": op, "a": a, "b": b}
+               for a, b in zip(elements, reversed(elements)) for op in ("mul", "div", "inv")]
+    records.append({"p": p, "op": "div", "a": 1, "b": 0})
+    (tmp_path / "ops.jsonl").write_text("".join(json.dumps(record) + "\n" for record in records))
+
+    # Ошибочная запись не прерывает обработку остальных, но код выхода сообщает о ней
+    assert cli_main(["arith", "-i", str(tmp_path / "ops.jsonl"), "-o", str(tmp_path / "out.jsonl"),
+                     "--stats", "none"]) == 1
+    results = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text().splitlines()]
+    assert len(results) == len(records) and "error" in results[-1]
+
+    for record, result in zip(records[:-1], results):
+        a, b = F(R(list(reversed(record["a"])))), F(R(list(reversed(record["b"]))))
+        expected = {"mul": a * b, "div": a / b, "inv": a ** -1}[record["op"]]
+        assert result["result"] == [int(c) for c in reversed(expected.lift().list())]
+
+    # Проверка многочленов на неприводимость совпадает с Sage
+    candidates = [[1] + list(c) for c in itertools.product(range(p), repeat=n)]
+    (tmp_path / "polys.txt").write_text("".join(",".join(map(str, c)) + "\n" for c in candidates))
+    assert cli_main(["verify", "--format", "text", "--p", str(p), "-i", str(tmp_path / "polys.txt"),
+                     "-o", str(tmp_path / "verify.jsonl"), "--no-catalog", "--stats", "none"]) == 0
+    verdicts = [json.loads(line)["irreducible"] for line in (tmp_path / "verify.jsonl").read_text().splitlines()]
+    assert verdicts == [R(list(reversed(c))).is_irreducible() for c in candidates]
+
+
+def _post(connection, path, body):
+    connection.request("POST", path, json.dumps(body), {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_field_service():
+    p, modulus = 2, [1, 0, 0, 0, 1, 1, 0, 1, 1]
+    R = PolynomialRing(GF(p), 'x')
+    F = R.quotient(R(list(reversed(modulus))))
+
+    service = FieldService(port=0, batch_delay=0.01)
+    host, port = service.start_in_thread()
+    try:
+        with closing(http.client.HTTPConnection(host, port)) as connection:
+            status, field = _post(connection, "/fields", {"p": p, "modulus": modulus})
+            assert status == 200 and field["order"] == 256
+            assert _post(connection, "/fields", {"p": 5, "modulus": [1, 0, 2, 3]})[0] == 400
+
+        def client(k):
+            # Запросы одного клиента идут по одному соединению (keep-alive)
+            with closing(http.client.HTTPConnection(host, port)) as connection:
+                a = [int(bit) for bit in bin(k + 1)[2:]]
+                b = [int(bit) for bit in bin(255 - k)[2:]]
+                results = [_post(connection, "/arith", {"field": field["field"], "op": op, "a": a, "b": b})[1]
+                           for op in ("mul", "div")]
+                sock = connection.sock
+                results.append(_post(connection, "/inverse", {"field": field["field"], "a": a})[1])
+                assert connection.sock is sock
+                return a, b, results
+
+        with ThreadPoolExecutor(8) as executor:
+            responses = list(executor.map(client, range(64)))
+
+        for a, b, results in responses:
+            x, y = F(R(list(reversed(a)))), F(R(list(reversed(b))))
+            for result, expected in zip(results, (x * y, x / y, x ** -1)):
+                assert result["result"] == [int(c) for c in reversed(expected.lift().list())]
+
+        with closing(http.client.HTTPConnection(host, port)) as connection:
+            status, verdict = _post(connection, "/irreducible", {"p": 3, "coeffs": [1, 0, 2, 1], "primitive": True})
+            assert status == 200 and verdict["irreducible"] == R.change_ring(GF(3))([1, 2, 0, 1]).is_irreducible()
+            assert _post(connection, "/arith", {"p": 7, "op": "div", "a": 1, "b": 0})[0] == 400
+
+            # В простом поле многочлен вычисляется целиком, а не приводится по модулю x
+            status, value = _post(connection, "/evaluate", {"p": 5, "poly": [1, 2], "x": 3})
+            assert status == 200 and value["result"] == 0
+            status, value = _post(connection, "/evaluate", {"p": 7, "poly": [2, 0, 5, 1], "x": 2})
+            assert status == 200 and value["result"] == (2 * 8 + 5 * 2 + 1) % 7
+            # В GF(p^n) многочлен, как и в библиотеке, сначала приводится по модулю: x^3 = 1 в GF(4)
+            status, value = _post(connection, "/evaluate", {"p": 2, "modulus": [1, 1, 1], "poly": [1, 0, 0, 0], "x": [0]})
+            gf4 = GaloisFieldExtension(2, [1, 1, 1])
+            expected = gf4.create_element([1, 0, 0, 0]).calculate_value(gf4.create_element([0]))
+            assert status == 200 and value["result"] == [int(c) for c in expected.poly.coeffs] == [1]
+
+            connection.request("GET", "/metrics")
+            metrics = json.loads(connection.getresponse().read())
+            # Одновременные запросы к одному полю объединялись в порции
+            assert metrics["batches"]["arith"]["items"] > metrics["batches"]["arith"]["count"]
+            latency = metrics["latency"]["/arith"]
+            assert latency["count"] >= 128 and latency["buckets"][-1] == ["+Inf", latency["count"]]
+            assert latency["min"] <= latency["p50"] <= latency["p95"] <= latency["max"]
+    finally:
+        service.stop_thread()
+
+    # Сверх max_pending одновременных запросов сервис отвечает 503
+    service = FieldService(port=0, batch_delay=0.2, max_pending=1)
+    host, port = service.start_in_thread()
+    try:
+        def request(k):
+            with closing(http.client.HTTPConnection(host, port)) as connection:
+                return _post(connection, "/arith", {"p": 7, "op": "mul", "a": k, "b": 3})[0]
+
+        with ThreadPoolExecutor(4) as executor:
+            statuses = list(executor.map(request, range(4)))
+        assert statuses.count(200) >= 1 and 503 in statuses
+    finally:
+        service.stop_thread()
+
+
+@pytest.mark.parametrize("p, modulus", [(2, [1, 0, 0, 0, 1, 1, 0, 1, 1]), (5, [1, 0, 3, 3])])
+def test_expression_compiler(p, modulus):
+    R = PolynomialRing(GF(p), 'x')
+    F = R.quotient(R(list(reversed(modulus))))
+    field = GaloisFieldExtension(p, modulus)
+    n = len(modulus) - 1
+
+    expression = compile_expression("(a*b + c)/(a - d)^3 + inv(a - d)*(a*b) - a^-2", field)
+    counts = expression.counts()
+    # a*b и a - d вычисляются один раз, три обращения выполняются одним проходом
+    assert counts["operations"] < counts["requested"] and counts["inversion_batches"] == 1
+
+    elements = [list(c) for c in itertools.product(range(p), repeat=n)][1:]
+    rows = [(elements[k % len(elements)], elements[(7 * k) % len(elements)], elements[(3 * k + 1) % len(elements)],
+             elements[(5 * k + 2) % len(elements)]) for k in range(200)]
+    batch = expression.evaluate_batch({name: [row[i] for row in rows] for i, name in enumerate("abcd")})
+
+    for row, vectorized in zip(rows, batch):
+        a, b, c, d = (F(R(list(reversed(value)))) for value in row)
+        if a == d:
+            assert vectorized == "Деление на ноль"
+            with pytest.raises(ZeroDivisionError):
+                expression.evaluate(dict(zip("abcd", row)))
+            continue
+        expected = (a * b + c) / (a - d) ** 3 + (a - d) ** -1 * (a * b) - a ** -2
+        expected = [int(coef) for coef in reversed(expected.lift().list())] or [0]
+        assert vectorized[0] == expected
+        assert [int(coef) for coef in expression.evaluate(dict(zip("abcd", row))).poly.coeffs] == expected
+
+    prime = compile_expression("x^-1 + 2*x/(y + 1)", GaloisFieldSimple(13))
+    for x, y in itertools.product(range(1, 13), range(12)):
+        assert prime.evaluate(x=x, y=y).value == GF(13)(x) ** -1 + 2 * GF(13)(x) / (GF(13)(y) + 1)
+
+
+def test_operation_timings():
+    disable_timings()
+    field = GaloisFieldExtension(2, [1, 0, 0, 0, 1, 1, 0, 1, 1])
+    a, b = field.create_element([1, 1]), field.create_element([1, 0, 1, 1])
+    a * b
+    assert get_timings() is None
+
+    timings = enable_timings()
+    try:
+        for _ in range(10):
+            a * b
+            a / b
+        b.inverse()
+        sieve_irreducible_polynomials(2, 4, use_db=False)
+
+        summary = timings.summary()
+        assert summary["extension.mul"]["count"] == 10 and summary["extension.div"]["count"] == 10
+        assert summary["extension.inverse"]["count"] == 1 and summary["search.sieve"]["count"] >= 1
+        mul = summary["extension.mul"]
+        assert 0 < mul["min"] <= mul["p50"] <= mul["p99"] <= mul["max"]
+        assert mul["buckets"][-1] == ["+Inf", 10]
+        assert json.loads(timings.export_json())["extension.div"]["count"] == 10
+
+        prometheus = timings.export_prometheus().splitlines()
+        assert "# TYPE galois_operation_duration_seconds histogram" in prometheus
+        assert 'galois_operation_duration_seconds_count{op="extension.mul"} 10' in prometheus
+        assert 'galois_operation_duration_seconds_bucket{op="extension.mul",le="+Inf"} 10' in prometheus
+    finally:
+        disable_timings()
+
+
+@pytest.mark.parametrize("p, modulus", [(2, [1, 0, 0, 0, 1, 1, 0, 1, 1]), (7, [1, 0, 3, 0, 5])])
+def test_cost_model_planner(p, modulus, tmp_path):
+    R = PolynomialRing(GF(p), 'x')
+    F = R.quotient(R(list(reversed(modulus))))
+    field = GaloisFieldExtension(p, modulus)
+    n = len(modulus) - 1
+
+    # Оба алгоритма обращения и оба алгоритма умножения дают одинаковый результат
+    for k, coeffs in enumerate(itertools.product(range(p), repeat=n)):
+        if k % 7 or not any(coeffs):
+            continue
+        element = field.create_element(list(coeffs))
+        expected = [int(c) for c in reversed(F(R(list(reversed(coeffs)))).inverse().lift().list())]
+        for method in ("fermat", "euclid"):
+            inverse = inverse_polynomial(element.poly, p, field.modulus_polynomial, method=method)
+            assert [int(c) for c in inverse.coeffs] == expected, method
+        other = list(coeffs) * 3
+        assert multiply_polynomials(list(coeffs), other, p, "naive") == multiply_polynomials(list(coeffs), other, p,
+                                                                                              "karatsuba")
+
+    # Модель выбирает алгоритм по оценкам; при дорогом алгоритме Евклида элементы обращаются по Ферма
+    assert CostModel().choose_inversion(997, 50) == "euclid"
+    try:
+        model = set_cost_model(CostModel({"euclid": 1.0, "karatsuba": 1e-12}))
+        assert model.choose_inversion(p, n) == "fermat" and model.choose_multiplication(8) == "karatsuba"
+        a, b = field.create_element([1, 1]), field.create_element([1, 0, 1])
+        assert ((a * b) * b.inverse() - a).poly.coeffs.tolist() == [0]
+    finally:
+        set_cost_model(None)
+
+    # Допуск: полный перебор урезается до случайной выборки, слишком долгая проверка модуля отклоняется
+    planner = Planner(time_budget=1.0)
+    assert planner.plan_search(2, 10, 'all').algorithm == "sieve"
+    plan = planner.plan_search(2, 64, 'all')
+    assert plan.admitted and plan.downgraded and plan.algorithm == "random" and plan.count >= 1
+    with pytest.raises(PlanError):
+        planner.admit(planner.plan_field(997, [1] * 3001))
+    assert planner.plan_search(2, 64, 'lex', 10 ** 9).count < 10 ** 9
+
+    db_path = str(tmp_path / "planner.db")
+    assert cli_main(['search', '97', '200', '--mode', 'primitive', '-c', '5', '--budget', '0.001',
+                     '--db', db_path, '--stats', 'none']) == 2